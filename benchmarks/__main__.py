@@ -0,0 +1,145 @@
+"""Times each stage of infero over the synthetic workloads.
+
+    python -m benchmarks                         # runs and prints the timings
+    python -m benchmarks --save baseline.json    # records a baseline
+    python -m benchmarks --compare baseline.json # flags regressions
+
+Exits with status 1 when a stage is slower than the baseline by more than
+the tolerance.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+from benchmarks.generators import WORKLOADS
+from infero import __version__
+from infero.lexer import Lexer
+from infero.parser import Parser
+from infero.solver import ENGINES, solve_all
+
+
+def best(function, repeat: int, setup=None) -> tuple[float, object]:
+    """Returns the best wall time of `repeat` calls, and the last result.
+
+    Every call is cold: what the previous one built is dropped before the
+    next, so its sentences are no longer interned and their cached symbols,
+    compiled evaluation and normal form are gone. `setup`, if given, builds
+    the argument of each call, untimed.
+    """
+    timings = []
+    result = argument = None
+    for _ in range(repeat):
+        result = argument = None
+        gc.collect()
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = function() if setup is None else function(argument)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def measure(source: str, engine: str, repeat: int) -> dict[str, float]:
+    stages = {}
+    stages["lexer"], _ = best(lambda: sum(1 for _ in Lexer(source).tokens()), repeat)
+
+    def parse():
+        parser = Parser(source)
+        parser.start()
+        return parser
+
+    stages["parser"], _ = best(parse, repeat)
+
+    def run(parser):
+        return solve_all(
+            parser.program["rules"], parser.program["query"], parser.symhash, engine
+        )
+
+    # Cada repetição resolve um programa recém analisado, sem os caches das
+    # anteriores
+    stages["solve"], results = best(run, repeat, parse)
+    stages["render"], _ = best(
+        lambda: [str(step) for _, path in results for step in path], repeat
+    )
+    return stages
+
+
+def run(workloads: list[str], engine: str, repeat: int, scale: float) -> dict:
+    """Measures every size of the workloads. Cases the engine does not
+    support, as the truth table over too many symbols, are reported and
+    left out of the results."""
+    results = {}
+    for workload in workloads:
+        generator, sizes = WORKLOADS[workload]
+        for size in sizes:
+            size = max(1, int(size * scale))
+            case = f"{workload}/{size}"
+            try:
+                stages = measure(generator(size), engine, repeat)
+            except ValueError as error:
+                print(f"{case:<20} unsupported: {error}", flush=True)
+                continue
+            results[case] = stages
+            timings = "  ".join(f"{k} {v * 1000:9.2f}ms" for k, v in stages.items())
+            print(f"{case:<20} {timings}", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float) -> list:
+    """Returns the (case, stage, baseline, current) entries that regressed."""
+    regressions = []
+    for case, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(case, {}).get(stage)
+            if previous is None:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > floor:
+                regressions.append((case, stage, previous, current))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("workloads", nargs="*", default=list(WORKLOADS))
+    parser.add_argument("--engine", choices=list(ENGINES), default="rules")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies sizes")
+    parser.add_argument("--save", metavar="FILE", help="writes the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--floor", type=float, default=0.001, help="ignored slowdowns, in seconds"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.workloads, args.engine, args.repeat, args.scale)
+    report = {
+        "infero": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline["results"], args.tolerance, args.floor)
+        for case, stage, previous, current in regressions:
+            print(
+                f"REGRESSION {case} {stage}: "
+                f"{previous * 1000:.2f}ms -> {current * 1000:.2f}ms"
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
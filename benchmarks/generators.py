@@ -0,0 +1,85 @@
+"""Synthetic .ifo workloads, parameterized by size.
+
+Every generator returns the source of a complete program. Random workloads
+take a seed, so the same size always yields the same program.
+"""
+
+import random
+
+
+def name(i: int) -> str:
+    """Returns the i-th symbol name: A, B, ..., Z, BA, BB, ...
+
+    Names are uppercase so they never start with a keyword such as "end".
+    """
+    letters = ""
+    while True:
+        letters = chr(65 + i % 26) + letters
+        i //= 26
+        if not i:
+            return letters
+
+
+def program(rules: list[str], facts: list[str], queries: list[str]) -> str:
+    sections = []
+    for header, stmts in (("rules:", rules), ("facts:", facts), ("query:", queries)):
+        sections.append("\n".join([header, *stmts, "end"]))
+    return "\n\n".join(sections) + "\n"
+
+
+def chain(n: int) -> str:
+    """Implication chain x0 -> x1 -> ... -> xn, querying its last link."""
+    rules = [f"{name(i)} -> {name(i + 1)}" for i in range(n)]
+    return program(rules, [name(0)], [name(n)])
+
+
+def disjunctions(n: int) -> str:
+    """Wide set of disjunctions xi | yi resolved one by one by ~yi facts."""
+    rules = [f"{name(2 * i)} | {name(2 * i + 1)}" for i in range(n)]
+    rules += [f"{name(2 * i)} -> {name(2 * i + 2)}" for i in range(n - 1)]
+    facts = [f"~{name(2 * i + 1)}" for i in range(n)]
+    return program(rules, facts, [name(2 * n - 2)])
+
+
+def horn(n: int, seed: int = 0, width: int = 3) -> str:
+    """Random Horn base over n symbols with n rules of up to `width` premises."""
+    rng = random.Random(seed)
+    rules = []
+    for _ in range(n):
+        premises = rng.sample(range(n), rng.randint(1, width))
+        conclusion = rng.randrange(n)
+        antecedent = " & ".join(name(i) for i in premises)
+        rules.append(f"{antecedent} -> {name(conclusion)}")
+    facts = [name(i) for i in rng.sample(range(n), max(1, n // 10))]
+    return program(rules, facts, [name(rng.randrange(n))])
+
+
+def cnf3(n: int, seed: int = 0, ratio: float = 4.26) -> str:
+    """Random 3-CNF over n symbols near the satisfiability phase transition."""
+    rng = random.Random(seed)
+    rules = []
+    for _ in range(int(n * ratio)):
+        literals = [
+            ("~" if rng.random() < 0.5 else "") + name(i)
+            for i in rng.sample(range(n), 3)
+        ]
+        rules.append(" | ".join(literals))
+    return program(rules, [], [name(rng.randrange(n))])
+
+
+def nested(depth: int) -> str:
+    """A single rule whose antecedent nests `depth` parenthesized levels."""
+    formula = name(0)
+    for i in range(1, depth + 1):
+        operator = "&" if i % 2 else "|"
+        formula = f"(~{formula} {operator} {name(i)})"
+    return program([f"{formula} -> {name(depth + 1)}"], [name(0)], [name(depth + 1)])
+
+
+WORKLOADS = {
+    "chain": (chain, [100, 1000, 5000]),
+    "disjunctions": (disjunctions, [100, 1000, 5000]),
+    "horn": (horn, [100, 1000, 5000]),
+    "cnf3": (cnf3, [20, 50, 100]),
+    "nested": (nested, [25, 50, 100]),
+}
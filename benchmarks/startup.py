@@ -0,0 +1,109 @@
+"""Times the startup of infero in fresh interpreters and checks it against a
+budget.
+
+    python -m benchmarks.startup                 # prints the timings
+    python -m benchmarks.startup --budget 0.5    # fails above 0.5s per case
+
+Besides the time, checks that every case exits successfully, that the JSON
+output of the CLI parses, and that the library modules and the JSON output
+do not import the modules they should not need. The CLI runs on typer, which
+imports rich whenever it is installed, so rich is only checked for the
+library. Exits with status 1 when a case fails, is over the budget or imports
+any of them.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generators import chain
+
+# Importações que cada caso não deve fazer
+LIBRARY = ("infero.cli", "typer", "rich", "numpy")
+JSON = ("numpy", "multiprocessing", "asyncio")
+
+REPORT = "import sys, json; print(json.dumps(sorted(sys.modules)), file=sys.stderr)"
+
+
+def cases(source: Path) -> dict[str, tuple[list[str], tuple[str, ...], bool]]:
+    """Returns the command of each case, the modules it must not import and
+    whether its output must be JSON."""
+    cli = (
+        f"import atexit, runpy, sys; atexit.register(lambda: exec({REPORT!r})); "
+        f"sys.argv = ['infero', 'compile', {str(source)!r}, '--format', 'json']; "
+        "runpy.run_module('infero', run_name='__main__')"
+    )
+    return {
+        "python": (["-c", "pass"], (), False),
+        "import solver": (
+            ["-c", f"import infero.lexer, infero.parser, infero.solver; {REPORT}"],
+            LIBRARY,
+            False,
+        ),
+        "compile --format json": (["-c", cli], JSON, True),
+    }
+
+
+def measure(
+    args: list[str], repeat: int, env: dict, output: bool
+) -> tuple[float, list[str], str | None]:
+    """Returns the best wall time of `repeat` runs, the modules imported and
+    why the case failed, if it did.
+
+    A run fails when it exits with an error, does not report its modules or,
+    with `output`, does not write a JSON document to stdout.
+    """
+    timings = []
+    modules: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, *args], capture_output=True, text=True, env=env
+        )
+        timings.append(time.perf_counter() - start)
+        if done.returncode != 0:
+            return min(timings), [], f"exit status {done.returncode}\n{done.stderr}"
+        lines = done.stderr.strip().splitlines()
+        try:
+            modules = json.loads(lines[-1]) if lines else []
+            if output:
+                json.loads(done.stdout)
+        except json.JSONDecodeError as error:
+            return min(timings), [], f"invalid JSON: {error}\n{done.stderr}"
+    return min(timings), modules, None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=0.5, help="maximum seconds per case"
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "chain.ifo"
+        source.write_text(chain(20))
+        env = {**os.environ, "INFERO_CACHE_DIR": directory}
+        for case, (command, forbidden, output) in cases(source).items():
+            elapsed, modules, error = measure(command, args.repeat, env, output)
+            imported = [name for name in forbidden if name in modules]
+            over = elapsed > args.budget
+            failed = failed or over or bool(imported) or error is not None
+            status = "FAILED" if error else "OVER BUDGET" if over else "ok"
+            print(f"{case:<24} {elapsed * 1000:9.2f}ms  {status}", flush=True)
+            if error:
+                print(error.rstrip(), file=sys.stderr)
+            if imported:
+                print(f"{'':<24} imports {', '.join(imported)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
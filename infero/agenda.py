@@ -0,0 +1,187 @@
+from itertools import count
+from typing import Callable, Iterator
+
+from infero.sentences import Implication, Sentence
+
+
+class Entry:
+    __slots__ = ("round", "score", "order", "sentence", "index", "checked")
+
+    def __init__(self, round: int, score: float, order: int, sentence: Sentence):
+        self.round = round
+        self.score = score
+        self.order = order
+        self.sentence = sentence
+        self.index = -1
+        # Geração em que a regra foi adiada sem disparar
+        self.checked = -1
+
+    def __lt__(self, other):
+        return (self.round, self.score, self.order) < (
+            other.round,
+            other.score,
+            other.order,
+        )
+
+
+class Agenda:
+    """Indexed binary heap of the rules pending in the solver.
+
+    Rules are ranked by `score` and, on ties, by insertion order. Each entry
+    knows its position in the heap, so a rule can be re-scored in O(log n).
+    A symbol index keeps the entries that mention each symbol, by its id, so
+    when a symbol gets a value only those entries are re-scored.
+
+    A rule that cannot fire yet is deferred to the next round, behind every
+    entry of the current one, so it is not popped again ahead of the rules
+    that can make progress. A re-scored rule returns to the current round.
+    Each sentence is queued at most once: pushing one that is already in the
+    agenda returns its entry unchanged.
+
+    The agenda is settled when every entry in it was deferred since the last
+    call to `progress`, that is, a full pass found nothing new.
+    """
+
+    def __init__(self, score: Callable[[Sentence], float]):
+        self.score = score
+        self.heap: list[Entry] = []
+        self.order = count()
+        # Rodada da última entrada retirada
+        self.round = 0
+        # Entradas ainda não adiadas desde o último progresso
+        self.generation = 0
+        self.unchecked = 0
+        self.entries: dict[Sentence, Entry] = {}
+        self.watch: dict[int, set[Entry]] = {}
+        self.chains: dict[Sentence, set[Entry]] = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, sentence: Sentence) -> bool:
+        return sentence in self.entries
+
+    def __iter__(self) -> Iterator[tuple[Sentence, float]]:
+        for entry in sorted(self.heap):
+            yield entry.sentence, entry.score
+
+    def push(self, sentence: Sentence, round: int | None = None) -> Entry:
+        queued = self.entries.get(sentence)
+        if queued is not None:
+            return queued
+        round = self.round if round is None else round
+        entry = Entry(round, self.score(sentence), next(self.order), sentence)
+        self.entries[sentence] = entry
+        self.unchecked += 1
+        entry.index = len(self.heap)
+        self.heap.append(entry)
+        self.sift_up(entry.index)
+
+        for variable in sentence.variables():
+            self.watch.setdefault(variable, set()).add(entry)
+        if isinstance(sentence, Implication):
+            self.chains.setdefault(sentence.antecedent, set()).add(entry)
+        return entry
+
+    def defer(self, sentence: Sentence):
+        """Pushes a rule that could not fire to the next round, behind the
+        entries of the current one."""
+        if sentence in self.entries:
+            return
+        entry = self.push(sentence, self.round + 1)
+        entry.checked = self.generation
+        self.unchecked -= 1
+
+    def pop(self) -> tuple[Sentence, float]:
+        entry = self.heap[0]
+        self.round = entry.round
+        if entry.checked != self.generation:
+            self.unchecked -= 1
+        self.remove(entry)
+        return entry.sentence, entry.score
+
+    def remove(self, entry: Entry):
+        last = self.heap.pop()
+        if last is not entry:
+            last.index = entry.index
+            self.heap[entry.index] = last
+            self.sift_up(last.index)
+            self.sift_down(last.index)
+        entry.index = -1
+
+        sentence = entry.sentence
+        del self.entries[sentence]
+        for variable in sentence.variables():
+            self.watch[variable].discard(entry)
+        if isinstance(sentence, Implication):
+            self.chains[sentence.antecedent].discard(entry)
+
+    def progress(self):
+        """Marks that something new was derived, so every entry has to be
+        tried again before the agenda is settled."""
+        self.generation += 1
+        self.unchecked = len(self.heap)
+
+    def settled(self) -> bool:
+        return not self.unchecked
+
+    def chain(
+        self, consequent: Sentence, fresh: Callable[[Sentence], bool] | None = None
+    ) -> Sentence | None:
+        """Returns the best ranked implication whose antecedent is `consequent`,
+        the link used by the hypothetical syllogism. With `fresh`, only the
+        implications it accepts are considered."""
+        entries = self.chains.get(consequent, ())
+        if fresh is not None:
+            entries = [entry for entry in entries if fresh(entry.sentence)]
+        if not entries:
+            return None
+        return min(entries).sentence
+
+    def rescore(self, variables) -> int:
+        """Re-scores the entries that mention any of the symbols with the
+        given ids, returning how many were touched."""
+        touched: set[Entry] = set()
+        for variable in variables:
+            touched.update(self.watch.get(variable, ()))
+
+        for entry in touched:
+            before = (entry.round, entry.score)
+            entry.round = min(entry.round, self.round)
+            entry.score = self.score(entry.sentence)
+            if (entry.round, entry.score) < before:
+                self.sift_up(entry.index)
+            elif (entry.round, entry.score) > before:
+                self.sift_down(entry.index)
+        return len(touched)
+
+    def sift_up(self, index: int):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[index] = heap[parent]
+            heap[index].index = index
+            index = parent
+        heap[index] = entry
+        entry.index = index
+
+    def sift_down(self, index: int):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[index] = heap[child]
+            heap[index].index = index
+            index = child
+        heap[index] = entry
+        entry.index = index
@@ -0,0 +1,156 @@
+import glob
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Iterator
+
+from infero.budget import Budget
+from infero.parser import Parser
+from infero.solver import RESULTS, solve_all
+
+
+def find_files(pattern: str) -> list[str]:
+    """Returns the .ifo files of a directory (recursively) or of a glob."""
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(str(file) for file in path.rglob("*.ifo"))
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def compile_file(file: str, engine: str = "rules") -> dict:
+    """Parses and solves one file, returning a JSON serializable report."""
+    report: dict = {"file": file}
+    start = time.perf_counter()
+    try:
+        parser = Parser(Path(file).read_text())
+        parser.start()
+        parsed = time.perf_counter()
+        queries = parser.program["query"]
+        budget = Budget()
+        results = solve_all(
+            parser.program["rules"],
+            queries,
+            parser.symhash,
+            engine=engine,
+            budget=budget,
+        )
+        solved = time.perf_counter()
+    except Exception as error:
+        report["status"] = "error"
+        report["error"] = f"{type(error).__name__}: {error}"
+    else:
+        report["status"] = "ok"
+        report["queries"] = [
+            {"query": query.formula(), "result": RESULTS[finded], "proof": len(path)}
+            for query, (finded, path) in zip(queries, results)
+        ]
+        report["termination"] = budget.status
+        report["timings"] = {"parse": parsed - start, "solve": solved - parsed}
+    report["elapsed"] = time.perf_counter() - start
+    return report
+
+
+def work(connection: Connection, engine: str):
+    """Worker loop: compiles each file received, until the parent closes the
+    connection."""
+    while True:
+        try:
+            file = connection.recv()
+        except EOFError:
+            return
+        connection.send(compile_file(file, engine))
+
+
+class Worker:
+    """A worker process and the file it is compiling, if any."""
+
+    def __init__(self, engine: str):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=work, args=(child, engine), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.file: str | None = None
+        self.started = 0.0
+
+    def assign(self, file: str):
+        self.file = file
+        self.started = time.perf_counter()
+        self.connection.send(file)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def run(
+    files: list[str], engine: str = "rules", jobs: int | None = None, timeout: float = 0
+) -> Iterator[dict]:
+    """Compiles the files on a pool of worker processes, yielding the reports
+    in completion order. Each worker imports infero once and handles many
+    files.
+
+    The parent watches every worker: one that runs past `timeout` seconds on
+    a file is terminated, and one that dies (a crash or an OOM kill) has its
+    file reported as an error. Either way it is replaced by a fresh worker,
+    so the state of the others is never touched and the batch goes on.
+    """
+    pending = deque(files)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+    idle = [Worker(engine) for _ in range(jobs)]
+    busy: list[Worker] = []
+    try:
+        while pending or busy:
+            while pending and idle:
+                worker = idle.pop()
+                worker.assign(pending.popleft())
+                busy.append(worker)
+
+            wait_for = None
+            if timeout > 0:
+                first = min(worker.started for worker in busy)
+                wait_for = max(0.0, first + timeout - time.perf_counter())
+            ready = set(
+                wait(
+                    [worker.connection for worker in busy]
+                    + [worker.process.sentinel for worker in busy],
+                    wait_for,
+                )
+            )
+
+            for worker in list(busy):
+                elapsed = time.perf_counter() - worker.started
+                if worker.connection in ready:
+                    try:
+                        report = worker.connection.recv()
+                    except (EOFError, OSError):
+                        pass
+                    else:
+                        busy.remove(worker)
+                        idle.append(worker)
+                        yield report
+                        continue
+                # Sem relatório, a conexão pronta indica que o worker morreu
+                if worker.connection in ready or worker.process.sentinel in ready:
+                    worker.process.join()
+                    code = worker.process.exitcode
+                    error = f"worker exited with code {code}"
+                    report = {"file": worker.file, "status": "error", "error": error}
+                elif timeout > 0 and elapsed >= timeout:
+                    report = {"file": worker.file, "status": "timeout"}
+                else:
+                    continue
+                report["elapsed"] = elapsed
+                worker.stop()
+                busy.remove(worker)
+                if pending:
+                    idle.append(Worker(engine))
+                yield report
+    finally:
+        for worker in idle + busy:
+            worker.stop()
@@ -0,0 +1,65 @@
+import time
+from dataclasses import dataclass, field
+
+# Como terminou uma execução: todas as queries decididas, nada mais a derivar,
+# limite de passos atingido, tempo esgotado ou regras e fatos contraditórios
+DECIDED, FIXPOINT, EXHAUSTED, TIMEOUT = "decided", "fixpoint", "exhausted", "timeout"
+INCONSISTENT = "inconsistent"
+
+# Limite padrão de passos do laço de inferência
+MAX_STEPS = 100
+
+# Itens entre consultas ao relógio nas passadas que não gastam passos
+STRIDE = 64
+
+
+@dataclass
+class Budget:
+    """Limits of a solver run and how the run ended.
+
+    `max_steps` bounds the iterations of the inference loop and `timeout` its
+    wall time in seconds; None means no limit. The solver sets `status` when
+    it stops. Queries left undecided keep the steps derived so far about
+    their symbols. The deadline covers the whole run, from `start`, including
+    the passes before the inference loop, which check it every `STRIDE`
+    items with `expired`.
+    """
+
+    max_steps: int | None = MAX_STEPS
+    timeout: float | None = None
+    status: str | None = None
+    steps: int = 0
+    deadline: float | None = field(default=None, init=False, repr=False)
+
+    def start(self):
+        self.steps = 0
+        self.status = None
+        self.deadline = None
+        if self.timeout is not None:
+            self.deadline = time.perf_counter() + self.timeout
+
+    def spend(self) -> bool:
+        """Counts one step, returning False if the budget ran out."""
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            self.status = EXHAUSTED
+            return False
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.status = TIMEOUT
+            return False
+        self.steps += 1
+        return True
+
+    def expired(self, item: int = 0) -> bool:
+        """Checks the deadline on every `STRIDE`-th item of a pass, without
+        counting a step, returning True if the time ran out."""
+        if self.deadline is None or item % STRIDE:
+            return False
+        if self.status == TIMEOUT or time.perf_counter() >= self.deadline:
+            self.status = TIMEOUT
+            return True
+        return False
+
+    def complete(self, results: list[tuple[bool | None, list]]):
+        """Sets the status of an engine that always runs to completion."""
+        decided = all(finded is not None for finded, _ in results)
+        self.status = DECIDED if decided else FIXPOINT
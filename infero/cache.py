@@ -0,0 +1,276 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+
+from infero import __version__
+from infero.lexer import CHUNK, read_chunks
+from infero.parser import Parser
+from infero.sentences import UNKNOWN, And, Implication, Not, Or, Sentence, Symbol
+from infero.stats import Stats
+
+MAGIC = b"IFOC"
+FORMAT = 2
+# Gravado na ordem nativa, identifica arquivos de máquinas com outro endianness
+BYTE_ORDER = 0x01020304
+MAX_BYTES = 256 * 1024 * 1024
+SECTIONS = ("rules", "facts", "query")
+TAGS = {Symbol: 0, Not: 1, And: 2, Or: 3, Implication: 4}
+
+Program = tuple[dict[str, list], dict[str, bool | None]]
+
+
+def default_directory() -> Path:
+    """Returns $INFERO_CACHE_DIR, or the infero folder of the user cache."""
+    if "INFERO_CACHE_DIR" in os.environ:
+        return Path(os.environ["INFERO_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "infero"
+
+
+def hasher():
+    return hashlib.sha256(f"{__version__}\0{FORMAT}\0".encode())
+
+
+def key(source: str) -> str:
+    """Content address of a source: its hash together with the infero version."""
+    digest = hasher()
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def file_key(path: Path, size: int = CHUNK) -> str:
+    """Content address of a file, hashed in blocks of `size` bytes. It is the
+    key of its text for files in UTF-8."""
+    digest = hasher()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def padded(data: bytes) -> bytes:
+    return struct.pack("=I", len(data)) + data + b"\0" * (-len(data) % 4)
+
+
+def dump(program: dict[str, list], symhash: dict[str, bool | None]) -> bytes:
+    """Encodes a parsed program in the compact binary form of the cache.
+
+    Sentences are written as a DAG in post order, each node as its tag and
+    the indexes of its children, so shared subsentences are stored once.
+    """
+    names = list(symhash)
+    index = {name: i for i, name in enumerate(names)}
+    ints = array("I", [len(names)])
+    ints.extend(
+        UNKNOWN if symhash[name] is None else int(symhash[name]) for name in names
+    )
+
+    nodes: dict[Sentence, int] = {}
+    records = array("I")
+    for section in SECTIONS:
+        for root in program[section]:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in nodes:
+                    continue
+                if isinstance(node, Symbol):
+                    nodes[node] = len(nodes)
+                    records.extend((TAGS[Symbol], index[node.name]))
+                elif not expanded:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in reversed(node.children()))
+                else:
+                    children = node.children()
+                    nodes[node] = len(nodes)
+                    records.extend((TAGS[type(node)], len(children)))
+                    records.extend(nodes[child] for child in children)
+    ints.append(len(nodes))
+    ints.extend(records)
+    for section in SECTIONS:
+        ints.append(len(program[section]))
+        ints.extend(nodes[sentence] for sentence in program[section])
+
+    return b"".join(
+        [
+            MAGIC,
+            struct.pack("=III", BYTE_ORDER, FORMAT, 0),
+            padded(__version__.encode()),
+            padded("\n".join(names).encode()),
+            padded(ints.tobytes()),
+        ]
+    )
+
+
+def load(buffer) -> Program:
+    """Decodes a program written by `dump`, raising ValueError if the buffer
+    is not a valid entry of this version. The buffer is read through
+    memoryviews released on return, so it can be a mmap.
+
+    Loading skips the lexer and the parser, but every sentence is still
+    rebuilt, straight through `intern` since the children are already
+    sentences. Building the nodes is most of the cost, so a load still takes
+    a bit over half of a fresh parse on a Horn base of 20000 rules."""
+    views = [memoryview(buffer)]
+    try:
+        return decode(views)
+    finally:
+        for view in reversed(views):
+            view.release()
+
+
+def decode(views: list[memoryview]) -> Program:
+    view = views[0]
+    if bytes(view[:4]) != MAGIC:
+        raise ValueError("not an infero cache entry")
+    order, form, _ = struct.unpack_from("=III", view, 4)
+    if order != BYTE_ORDER or form != FORMAT:
+        raise ValueError("incompatible cache entry")
+
+    offset = 16
+    blocks = []
+    for _ in range(3):
+        (size,) = struct.unpack_from("=I", view, offset)
+        offset += 4
+        views.append(view[offset : offset + size])
+        blocks.append(views[-1])
+        offset += size + (-size % 4)
+    version, names, data = blocks
+    if bytes(version).decode() != __version__:
+        raise ValueError("cache entry of another infero version")
+
+    names = bytes(names).decode().split("\n") if len(names) else []
+    views.append(data.cast("I"))
+    ints = views[-1].tolist()
+    count = ints[0]
+    symhash = {
+        name: None if ints[1 + i] == UNKNOWN else bool(ints[1 + i])
+        for i, name in enumerate(names[:count])
+    }
+
+    # Os nós são montados direto por `intern`: os filhos já são sentenças
+    pos = 1 + count
+    nodes: list[Sentence] = []
+    append = nodes.append
+    for _ in range(ints[pos]):
+        tag, arg = ints[pos + 1], ints[pos + 2]
+        pos += 2
+        if tag == 0:
+            append(Symbol.intern(names[arg]))
+        elif tag == 1:
+            append(Not.intern(nodes[ints[pos + 1]]))
+        elif tag == 4:
+            append(Implication.intern(nodes[ints[pos + 1]], nodes[ints[pos + 2]]))
+        else:
+            children = tuple([nodes[i] for i in ints[pos + 1 : pos + 1 + arg]])
+            append((And if tag == 2 else Or).intern(children))
+        if tag:
+            pos += arg
+
+    program: dict[str, list] = {}
+    pos += 1
+    for section in SECTIONS:
+        size = ints[pos]
+        program[section] = [nodes[i] for i in ints[pos + 1 : pos + 1 + size]]
+        pos += 1 + size
+    return program, symhash
+
+
+def fetch(path: Path) -> Program | None:
+    """Loads an entry through mmap, evicting it if it is stale or corrupt."""
+    try:
+        with open(path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            program = load(buffer)
+    except FileNotFoundError:
+        return None
+    except (ValueError, IndexError, struct.error, OSError, UnicodeDecodeError):
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)
+    return program
+
+
+def store(path: Path, program: dict[str, list], symhash: dict[str, bool | None]):
+    """Writes an entry atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(dump(program, symhash))
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def evict(directory: Path, max_bytes: int = MAX_BYTES):
+    """Removes the least recently used entries until the cache fits in
+    `max_bytes`."""
+    entries = []
+    for path in directory.glob("*.ifoc"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def lookup(path: Path, stats: Stats | None) -> Program | None:
+    cached = fetch(path)
+    if cached is not None and stats is not None:
+        stats.count("cache_hits")
+    return cached
+
+
+def keep(path: Path, parser: Parser, stats: Stats | None) -> Program:
+    """Stores the program of a parser that just ran, ignoring a cache that
+    cannot be written."""
+    if stats is not None:
+        stats.count("tokens", parser.scanner.count)
+    try:
+        store(path, parser.program, parser.symhash)
+        evict(path.parent)
+    except OSError:
+        pass
+    return parser.program, parser.symhash
+
+
+def parse(
+    source: str, directory: Path | None = None, stats: Stats | None = None
+) -> Program:
+    """Parses a source, reusing the cached program when the same source was
+    already parsed by this infero version."""
+    path = (directory or default_directory()) / f"{key(source)}.ifoc"
+    cached = lookup(path, stats)
+    if cached is not None:
+        return cached
+    parser = Parser(source)
+    parser.start()
+    return keep(path, parser, stats)
+
+
+def parse_file(
+    file: Path, directory: Path | None = None, stats: Stats | None = None
+) -> Program:
+    """Like `parse`, for a file that is hashed and, if not cached, parsed in
+    blocks, so it is never in memory at once."""
+    path = (directory or default_directory()) / f"{file_key(file)}.ifoc"
+    cached = lookup(path, stats)
+    if cached is not None:
+        return cached
+    with open(file) as source:
+        parser = Parser(read_chunks(source))
+        parser.start()
+    return keep(path, parser, stats)
@@ -1,17 +1,57 @@
+import json
+import sys
+from contextlib import nullcontext
+from enum import Enum
+from functools import cache
 from pathlib import Path
 
-from rich.console import Console
-from rich.padding import Padding
-from rich.table import Table
 from typer import Argument, Context, Exit, Option, Typer, echo
 
 from infero import __app_name__, __version__
+from infero.budget import (
+    DECIDED,
+    EXHAUSTED,
+    FIXPOINT,
+    INCONSISTENT,
+    MAX_STEPS,
+    TIMEOUT,
+    Budget,
+)
+from infero.cache import parse_file
+from infero.lexer import read_chunks
 from infero.parser import Parser
-from infero.solver import solve
+from infero.solver import ENGINES, RESULTS, solve_all
+from infero.stats import Stats
 
-console = Console()
+# multiprocessing e asyncio são importados apenas pelos comandos que os usam,
+# para que chamadas curtas iniciem rápido; o rich, só pelos formatos de texto,
+# embora o typer já o importe quando está instalado
 app = Typer()
 
+Engine = Enum("Engine", {name: name for name in ENGINES}, type=str)
+Format = Enum("Format", {"text": "text", "json": "json"}, type=str)
+
+STATUS = {
+    DECIDED: "todas as queries decididas",
+    FIXPOINT: "ponto fixo, nada mais pode ser derivado",
+    EXHAUSTED: "limite de passos atingido",
+    TIMEOUT: "tempo esgotado",
+    INCONSISTENT: "regras e fatos contraditórios",
+}
+
+
+@cache
+def console():
+    from rich.console import Console
+
+    return Console()
+
+
+def show(renderable, indent: int = 2):
+    from rich.padding import Padding
+
+    console().print(Padding(renderable, pad=(0, 0, 0, indent)))
+
 
 def version_func(flag):
     if flag:
@@ -25,11 +65,12 @@ def main(
 ):
     message = """Forma de uso: [b]infero [SUBCOMANDO] [ARGUMENTOS][/]
 
- Existem 3 subcomandos disponíveis para essa aplicação
+ Existem 4 subcomandos disponíveis para essa aplicação
 
 - [b]compile[/]: Compila um arquivo .ifo, fornecendo a solução da derivação
-- [b]tokenize[/]: Fornece os tokens presentes no arquivo
-- [b]ast[/]: Fornece a árvore sintática do arquivo
+- [b]models[/]: Lista ou conta os modelos das regras e fatos de um arquivo .ifo
+- [b]batch[/]: Compila vários arquivos .ifo em paralelo, com saída em JSON
+- [b]serve[/]: Mantém bases de conhecimento em memória e responde requisições JSON
 
 [b]Exemplo de uso:[/]
 
@@ -39,51 +80,260 @@ infero compile examples/example.ifo
 """
     if ctx.invoked_subcommand:
         return
-    console.print(Padding(message, pad=(0, 0, 0, 2)))
+    show(message)
 
 
 @app.command()
-def compile(file: Path = Argument(help="arquivo .ifo a ser compilado")):
+def compile(
+    file: Path = Argument(
+        help="arquivo .ifo a ser compilado, ou - para a entrada padrão"
+    ),
+    engine: Engine = Option(Engine.rules, help="motor de inferência"),
+    cache: bool = Option(True, help="reutiliza o programa analisado em cache"),
+    stats: bool = Option(False, help="mostra tempos e contadores da execução"),
+    output: Format = Option(Format.text, "--format", help="formato da saída"),
+    prune: bool = Option(
+        None,
+        help="ignora as regras sem relação com as queries antes de resolver"
+        " (padrão: só no motor rules; em sat e table muda a resposta para"
+        " bases inconsistentes)",
+        show_default=False,
+    ),
+    max_steps: int = Option(
+        None,
+        min=0,
+        help=f"limite de passos do motor de regras (padrão: {MAX_STEPS}; 0 sem limite)",
+        show_default=False,
+    ),
+    timeout: float = Option(None, help="tempo máximo do motor de regras, em segundos"),
+):
+
+    if engine != Engine.rules and (max_steps is not None or timeout is not None):
+        echo("Erro: --max-steps e --timeout valem apenas para o motor rules")
+        raise Exit(1)
+
+    run = Stats() if stats else None
+    program, symhash = read_program(file, cache, run)
+
+    queries = program["query"]
+    if max_steps is None:
+        budget = Budget(timeout=timeout)
+    else:
+        budget = Budget(max_steps or None, timeout)
 
+    try:
+        results = solve_all(
+            program["rules"],
+            queries,
+            symhash,
+            engine=engine.value,
+            stats=run,
+            prune=prune,
+            budget=budget,
+        )
+    except (ValueError, ImportError) as error:
+        echo(f"Erro: {error}")
+        raise Exit(1)
+
+    with phase(run, "render"):
+        if output == Format.json:
+            report = json_report(queries, results, symhash, budget.status)
+        else:
+            render(queries, results, symhash, budget.status)
+
+    if output == Format.json:
+        if stats:
+            report["stats"] = run.as_dict()
+        echo(json.dumps(report, ensure_ascii=False))
+    elif stats:
+        print_stats(run)
+
+
+def phase(run: Stats | None, name: str):
+    """Times the block as the phase `name` of the run, if there is one."""
+    return nullcontext() if run is None else run.phase(name)
+
+
+def read_program(file: Path, cache: bool, run: Stats | None):
+    """Parses a .ifo file, or the standard input for -, into the program and
+    its symbol table."""
     extensao = ".ifo"
+    stdin = str(file) == "-"
 
-    if file.suffix != extensao:
+    if not stdin and file.suffix != extensao:
         echo("Erro: extensão de arquivo desconhecida")
         raise Exit(1)
 
-    data = file.read_text()
+    # Arquivos e a entrada padrão são lidos em blocos, conforme a análise
+    # avança; com o cache, o arquivo também é lido em blocos para o hash
+    if cache and not stdin:
+        with phase(run, "parse"):
+            program, symhash = parse_file(file, stats=run)
+    else:
+        with phase(run, "parse"), (
+            nullcontext(sys.stdin) if stdin else file.open()
+        ) as source:
+            parser = Parser(read_chunks(source))
+            parser.start()
+        program, symhash = parser.program, parser.symhash
+        if run is not None:
+            run.count("tokens", parser.scanner.count)
+    if run is not None:
+        run.program(program)
+    return program, symhash
 
-    parser = Parser(data)
-    parser.start()
 
-    query = parser.program["query"][0]
+def json_report(queries, results, symhash, status) -> dict:
+    return {
+        "queries": [
+            {
+                "query": query.formula(),
+                "result": RESULTS[finded],
+                "proof": [str(step) for step in path],
+            }
+            for query, (finded, path) in zip(queries, results)
+        ],
+        "symbols": symhash,
+        "termination": status,
+    }
 
-    finded, path = solve(parser.program["rules"], query, parser.symhash)
 
-    console.print(
-        Padding("\n[b]==+==+==+== SOLUTION ==+==+==+==[/]\n", pad=(0, 0, 0, 2))
-    )
+def render(queries, results, symhash, status=None):
+    from rich.table import Table
 
-    if finded is None:
-        console.print(
-            Padding(
-                "\n[b bright_yellow] Solution not finded :( [/]\n", pad=(0, 0, 0, 2)
-            )
-        )
-    elif finded is False:
-        console.print(
-            Padding("\n[b bright_red] Contradiction finded!! [/]\n", pad=(0, 0, 0, 2))
-        )
-    else:
-        for step in path:
-            console.print(Padding(str(step), pad=(0, 0, 0, 2)))
+    for query, (finded, path) in zip(queries, results):
+        show("\n[b]==+==+==+== SOLUTION ==+==+==+==[/]\n")
+
+        if finded is None:
+            # Derivação parcial: o que foi obtido sobre os símbolos da query
+            for step in path:
+                show(str(step))
+            show("\n[b bright_yellow] Solution not finded :( [/]\n")
+            if status in (EXHAUSTED, TIMEOUT, INCONSISTENT):
+                show(f"[i]{STATUS[status]}[/]\n")
+        elif finded is False:
+            show("\n[b bright_red] Contradiction finded!! [/]\n")
+        else:
+            for step in path:
+                show(str(step))
 
-        console.print(Padding(f"\n[b]Then[/] {query.formula()}\n", pad=(0, 0, 0, 2)))
+            show(f"\n[b]Then[/] {query.formula()}\n")
 
     table = Table()
 
-    for key in parser.symhash.keys():
+    for key in symhash.keys():
         table.add_column(key)
 
-    table.add_row(*list(map(str, parser.symhash.values())))
-    console.print(Padding(table, pad=(0, 0, 0, 1)))
+    table.add_row(*list(map(str, symhash.values())))
+    show(table, 1)
+
+
+def print_stats(run: Stats):
+    from rich.table import Table
+
+    table = Table(title="Estatísticas")
+    table.add_column("métrica")
+    table.add_column("valor", justify="right")
+
+    for name, elapsed in run.phases.items():
+        table.add_row(f"tempo: {name}", f"{elapsed * 1000:.3f} ms")
+    for name, value in run.counters.items():
+        table.add_row(name, str(value))
+    for name, value in run.firings.items():
+        table.add_row(f"regra: {name}", str(value))
+    if run.status is not None:
+        table.add_row("término", STATUS[run.status])
+    show(table, 1)
+
+
+@app.command()
+def models(
+    file: Path = Argument(
+        help="arquivo .ifo cujos modelos são listados, ou - para a entrada padrão"
+    ),
+    project: str = Option(
+        None, help="símbolos da projeção, separados por vírgula (padrão: desconhecidos)"
+    ),
+    limit: int = Option(None, help="número máximo de modelos listados"),
+    count: bool = Option(False, help="apenas conta os modelos, sem listá-los"),
+    cache: bool = Option(True, help="reutiliza o programa analisado em cache"),
+    stats: bool = Option(False, help="mostra tempos e contadores da execução"),
+    output: Format = Option(Format.text, "--format", help="formato da saída"),
+):
+    from itertools import islice
+
+    from infero.models import count_models, enumerate_models
+
+    run = Stats() if stats else None
+    program, symhash = read_program(file, cache, run)
+    names = None if project is None else [n.strip() for n in project.split(",")]
+
+    try:
+        if count:
+            with phase(run, "count"):
+                total = count_models(program["rules"], symhash, names, run)
+            if output == Format.json:
+                echo(json.dumps({"count": total}))
+            else:
+                echo(f"{total} modelo{'' if total == 1 else 's'}")
+        else:
+            # Cada modelo é escrito assim que encontrado
+            with phase(run, "models"):
+                found = enumerate_models(program["rules"], symhash, names)
+                for model in islice(found, limit):
+                    if run is not None:
+                        run.count("models")
+                    if output == Format.json:
+                        echo(json.dumps({"model": model}))
+                    else:
+                        echo(
+                            " ".join(
+                                name if value else f"~{name}"
+                                for name, value in model.items()
+                            )
+                        )
+    except ValueError as error:
+        echo(f"Erro: {error}")
+        raise Exit(1)
+
+    if stats:
+        if output == Format.json:
+            echo(json.dumps({"stats": run.as_dict()}, ensure_ascii=False))
+        else:
+            print_stats(run)
+
+
+@app.command()
+def batch(
+    pattern: str = Argument(help="diretório ou glob de arquivos .ifo"),
+    jobs: int = Option(None, "--jobs", "-j", help="processos (padrão: nº de CPUs)"),
+    timeout: float = Option(60.0, help="tempo máximo por arquivo, em segundos"),
+    engine: Engine = Option(Engine.rules, help="motor de inferência"),
+):
+    from infero import batch as batch_runner
+
+    files = batch_runner.find_files(pattern)
+    if not files:
+        echo("Erro: nenhum arquivo encontrado")
+        raise Exit(1)
+
+    failed = False
+    for report in batch_runner.run(files, engine.value, jobs, timeout):
+        echo(json.dumps(report, ensure_ascii=False))
+        failed = failed or report["status"] != "ok"
+
+    if failed:
+        raise Exit(1)
+
+
+@app.command()
+def serve(
+    files: list[Path] = Argument(None, help="programas .ifo carregados ao iniciar"),
+    socket: Path = Option(
+        None, help="socket Unix; sem ele usa a entrada e saída padrão"
+    ),
+    workers: int = Option(None, help="processos para as queries com motor"),
+):
+    from infero import server
+
+    server.serve(files or [], socket, workers)
@@ -0,0 +1,198 @@
+from math import prod
+from typing import Callable
+
+from infero.sentences import And, Implication, Not, Or, Sentence, Symbol
+
+Literal = tuple[str, bool]
+Clause = frozenset[Literal]
+
+# Maior número de cláusulas que a distribuição pode gerar em um nó antes que
+# seus operandos sejam trocados por variáveis auxiliares
+MAX_DISTRIBUTED = 64
+
+
+def clausify(
+    sentence: Sentence,
+    positive: bool = True,
+    fresh: Callable[[Sentence], str] | None = None,
+) -> list[Clause]:
+    """Returns the clauses over the sentence symbols equivalent to the sentence
+    (or to its negation), by negation normal form and distribution.
+
+    Unlike the Tseitin transform no auxiliary variables are added, which suits
+    the small rules of a knowledge base. Tautological clauses are dropped.
+
+    Distribution grows exponentially with the width of a disjunction of
+    conjunctions, so with `fresh`, when a node would give more than
+    `MAX_DISTRIBUTED` clauses, each operand with more than one clause is
+    replaced by an auxiliary variable named by `fresh` after the operand (in
+    its polarity). Only the clauses stating that the variable implies the
+    operand are added, as in the Plaisted-Greenbaum encoding, so the result is
+    no longer equivalent but has the same consequences over the symbols.
+    """
+    results: dict[tuple[Sentence, bool], list[Clause]] = {}
+    definitions: list[Clause] = []
+    stack: list[tuple[Sentence, bool, bool]] = [(sentence, positive, False)]
+    while stack:
+        node, sign, expanded = stack.pop()
+        if (node, sign) in results:
+            continue
+        if isinstance(node, Symbol):
+            results[node, sign] = [frozenset({(node.name, sign)})]
+            continue
+
+        # Operandos com a polaridade de cada um e se o nó, nessa polaridade,
+        # é uma conjunção
+        if isinstance(node, Not):
+            operands, conjunction = [(node.operand, not sign)], True
+        elif isinstance(node, Implication):
+            operands = [(node.antecedent, not sign), (node.consequent, sign)]
+            conjunction = not sign
+        elif isinstance(node, And):
+            operands = [(conjunct, sign) for conjunct in node.conjuncts]
+            conjunction = sign
+        elif isinstance(node, Or):
+            operands = [(disjunct, sign) for disjunct in node.disjuncts]
+            conjunction = not sign
+        else:
+            raise TypeError("must be a logical sentence")
+
+        if not expanded:
+            stack.append((node, sign, True))
+            stack.extend((operand, polarity, False) for operand, polarity in operands)
+            continue
+
+        if conjunction:
+            results[node, sign] = [c for key in operands for c in results[key]]
+            continue
+        if fresh is not None:
+            sizes = [len(results[key]) for key in operands]
+            if prod(sizes) > MAX_DISTRIBUTED:
+                for key, size in zip(operands, sizes):
+                    if size > 1:
+                        operand, polarity = key
+                        name = fresh(operand if polarity else Not(operand))
+                        definitions.extend(
+                            clause | {(name, False)} for clause in results[key]
+                        )
+                        results[key] = [frozenset({(name, True)})]
+        clauses: list[Clause] = [frozenset()]
+        for key in operands:
+            clauses = [
+                left | right
+                for left in clauses
+                for right in results[key]
+                if not any((name, not value) in left for name, value in right)
+            ]
+        results[node, sign] = clauses
+
+    return results[sentence, positive] + definitions
+
+
+class CNF:
+    """Clausal form of a set of sentences built with the Tseitin transform.
+
+    Symbols are numbered from 1 and literals are signed integers, as in the
+    DIMACS format. Every compound subsentence gets an auxiliary variable
+    defined by clauses equivalent to its connective; since sentences are
+    hash-consed, shared subsentences are encoded only once.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str | None] = [None]
+        self.clauses: list[list[int]] = []
+        self.cache: dict[Sentence, int] = {}
+
+    @property
+    def variables(self) -> int:
+        return len(self.names) - 1
+
+    def variable(self, name: str | None = None) -> int:
+        """Returns the variable of a symbol, or a fresh auxiliary variable."""
+        if name is not None and name in self.ids:
+            return self.ids[name]
+        var = len(self.names)
+        self.names.append(name)
+        if name is not None:
+            self.ids[name] = var
+        return var
+
+    def literal(self, sentence: Sentence) -> int:
+        """Returns a literal equivalent to the sentence, adding the defining
+        clauses of its subsentences."""
+        cache = self.cache
+        stack: list[tuple[Sentence, bool]] = [(sentence, False)]
+
+        while stack:
+            node, expanded = stack.pop()
+            if node in cache:
+                continue
+            if isinstance(node, Symbol):
+                cache[node] = self.variable(node.name)
+                continue
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children())
+                continue
+
+            lits = [cache[child] for child in node.children()]
+            if isinstance(node, Not):
+                cache[node] = -lits[0]
+            elif isinstance(node, And):
+                var = self.variable()
+                self.clauses.extend([-var, lit] for lit in lits)
+                self.clauses.append([var, *(-lit for lit in lits)])
+                cache[node] = var
+            elif isinstance(node, Or):
+                var = self.variable()
+                self.clauses.append([-var, *lits])
+                self.clauses.extend([var, -lit] for lit in lits)
+                cache[node] = var
+            elif isinstance(node, Implication):
+                var = self.variable()
+                antecedent, consequent = lits
+                self.clauses.append([-var, -antecedent, consequent])
+                self.clauses.append([var, antecedent])
+                self.clauses.append([var, -consequent])
+                cache[node] = var
+            else:
+                raise TypeError("must be a logical sentence")
+
+        return cache[sentence]
+
+    def add(self, sentence: Sentence):
+        """Adds clauses asserting the sentence.
+
+        The top level connectives are turned into clauses directly, so only
+        the nested subsentences need auxiliary variables.
+        """
+        stack = [sentence]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, And):
+                stack.extend(node.conjuncts)
+            elif isinstance(node, Or):
+                self.clauses.append([self.literal(d) for d in node.disjuncts])
+            elif isinstance(node, Implication):
+                self.clauses.append(
+                    [-self.literal(node.antecedent), self.literal(node.consequent)]
+                )
+            elif isinstance(node, Not) and isinstance(node.operand, Not):
+                stack.append(node.operand.operand)
+            elif isinstance(node, Not) and isinstance(node.operand, Or):
+                stack.extend(Not(d) for d in node.operand.disjuncts)
+            elif isinstance(node, Not) and isinstance(node.operand, Implication):
+                stack.append(node.operand.antecedent)
+                stack.append(Not(node.operand.consequent))
+            elif isinstance(node, Not) and isinstance(node.operand, And):
+                self.clauses.append([-self.literal(c) for c in node.operand.conjuncts])
+            else:
+                self.clauses.append([self.literal(node)])
+
+    def add_facts(self, symhash: dict[str, bool | None]):
+        """Adds a unit clause for every symbol with known value."""
+        for name, value in symhash.items():
+            var = self.variable(name)
+            if value is not None:
+                self.clauses.append([var if value else -var])
@@ -0,0 +1,170 @@
+from collections import deque
+
+from infero.budget import Budget
+from infero.justification import MODUS_PONENS, Justifications
+from infero.sentences import (
+    UNKNOWN,
+    And,
+    Implication,
+    Model,
+    Not,
+    Sentence,
+    Symbol,
+    literal,
+    variable,
+)
+from infero.stats import Stats
+
+Literal = tuple[str, bool]
+
+
+def literals(sentence: Sentence) -> list[Literal] | None:
+    """Returns the literals of a conjunction of literals, or None if the
+    sentence has any other shape."""
+    result = []
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            result.append((node.name, True))
+        elif isinstance(node, And):
+            stack.extend(reversed(node.conjuncts))
+        elif isinstance(node, Not):
+            # Sob uma negação só cabe um literal, entre negações e conjunções
+            # de um único termo
+            negated = False
+            while True:
+                if isinstance(node, Not):
+                    node, negated = node.operand, not negated
+                elif isinstance(node, And) and len(node.conjuncts) == 1:
+                    node = node.conjuncts[0]
+                else:
+                    break
+            if not isinstance(node, Symbol):
+                return None
+            result.append((node.name, not negated))
+        else:
+            return None
+    return result
+
+
+def signed(sentence: Sentence) -> list[int] | None:
+    """Returns the literals of a conjunction of literals as signed ints, or
+    None if the sentence has any other shape."""
+    found = literals(sentence)
+    if found is None:
+        return None
+    table = Symbol.table
+    return [literal(table[name], value) for name, value in found]
+
+
+def is_horn(rule: Sentence) -> bool:
+    """Checks if a rule is an implication between conjunctions of literals."""
+    return (
+        isinstance(rule, Implication)
+        and literals(rule.antecedent) is not None
+        and literals(rule.consequent) is not None
+    )
+
+
+def forward_chain(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    values: Model,
+    log: Justifications,
+    stats: Stats | None = None,
+    budget: Budget | None = None,
+) -> tuple[list[Sentence], dict[Sentence, int], int | None]:
+    """Saturates the known facts of the compact model `values` with the Horn
+    shaped rules.
+
+    Every rule keeps the count of its premises not yet satisfied and every
+    literal watches the rules that have it as premise, so each derived fact
+    only touches the rules that mention it and the whole derivation is linear
+    in the total size of the rules (Dowling-Gallier). Literals are signed
+    ints, as built by `literal`. Stops as soon as every query is decided or
+    the deadline of `budget` passes, and also when a rule concludes the
+    complement of a known literal, since the rules and facts are then
+    inconsistent.
+
+    The Modus Ponens steps applied are recorded in `log`. Returns the rules
+    that were not fired, for each decided query the number of steps in the
+    log when it was decided, and the step that concluded a contradiction, if
+    any.
+    """
+    horn: dict[Implication, list[int]] = {}
+    missing: dict[Implication, int] = {}
+    watch: dict[int, list[Implication]] = {}
+
+    for i, rule in enumerate(rules):
+        if budget is not None and budget.expired(i):
+            return rules, {}, None
+        if rule in horn or not isinstance(rule, Implication):
+            continue
+        premises = signed(rule.antecedent)
+        conclusions = signed(rule.consequent)
+        if premises is None or conclusions is None:
+            continue
+        horn[rule] = conclusions
+        premises = set(premises)
+        missing[rule] = len(premises)
+        for premise in premises:
+            watch.setdefault(premise, []).append(rule)
+
+    fired: set[Implication] = set()
+    decided: dict[Sentence, int] = {}
+    watching: dict[int, list[Sentence]] = {}
+    pending = 0
+    for query in set(queries):
+        if query.evaluate(values) is not None:
+            decided[query] = 0
+            continue
+        pending += 1
+        for index in query.variables():
+            watching.setdefault(index, []).append(query)
+
+    # Só os fatos que são premissas de alguma regra disparam algo, então a
+    # fila parte deles, na ordem dos ids, sem percorrer o modelo inteiro
+    queue = deque(
+        premise
+        for premise in sorted(watch, key=abs)
+        if values[variable(premise)] == (premise > 0)
+    )
+    if not pending:
+        queue.clear()
+
+    conflict = None
+    popped = 0
+    while queue:
+        if budget is not None and budget.expired(popped):
+            break
+        popped += 1
+        fact = queue.popleft()
+        for rule in watch.get(fact, ()):
+            missing[rule] -= 1
+            if missing[rule]:
+                continue
+            fired.add(rule)
+            step = log.record(MODUS_PONENS, rule)
+            if stats is not None:
+                stats.step(log.step(step))
+            for conclusion in horn[rule]:
+                index = variable(conclusion)
+                # O complemento já é conhecido: regras e fatos contraditórios
+                if values[index] == (conclusion < 0):
+                    conflict = step
+                    break
+                if values[index] != UNKNOWN:
+                    continue
+                values[index] = conclusion > 0
+                log.assign(index, step)
+                queue.append(conclusion)
+                for query in watching.pop(index, ()):
+                    if query not in decided and query.evaluate(values) is not None:
+                        decided[query] = len(log)
+                        pending -= 1
+            if conflict is not None or not pending:
+                queue.clear()
+                break
+
+    return [rule for rule in rules if rule not in fired], decided, conflict
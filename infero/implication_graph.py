@@ -0,0 +1,281 @@
+from collections import deque
+
+from infero.horn import signed
+from infero.justification import (
+    DISJUNCTIVE_LEFT,
+    DISJUNCTIVE_RIGHT,
+    HIPOTETICAL,
+    MODUS_PONENS,
+    MODUS_TOLLENS,
+    REFUTATION,
+)
+from infero.sentences import (
+    TRUE,
+    UNKNOWN,
+    Implication,
+    Model,
+    Not,
+    Or,
+    Sentence,
+    Symbol,
+    literal,
+    variable,
+)
+
+# Como cada aresta foi obtida: da implicação, da sua contrapositiva, de uma
+# disjunção negando o termo da esquerda ou o da direita, ou de um fato
+FORWARD, CONTRAPOSITIVE, LEFT, RIGHT, FACT = range(5)
+
+Edge = tuple[int, Sentence | None, int]
+# Passo de prova no formato de `Justifications.record`
+Step = tuple[int, Sentence, Sentence | None]
+
+
+class ImplicationGraph:
+    """Implication graph of the binary rules, as in 2-SAT.
+
+    Every literal is a vertex and each implication between two literals or
+    disjunction of two literals gives two edges, one the contrapositive of
+    the other: `a -> b` gives a => b and ~b => ~a, `a | b` gives ~a => b and
+    ~b => a. A known fact f is the edge ~f => f. The rules and facts are
+    inconsistent iff a literal is in the same strongly connected component as
+    its complement, literals of one component are equivalent, and a literal
+    is entailed iff its complement reaches it. Literals are signed ints, as
+    built by `literal`, and the facts are read from the compact model.
+
+    What the facts reach is searched once and shared by every query. The
+    search from a complement is bounded by the topological order of the
+    components, which on sparse graphs visits little beyond the path found;
+    a transitive closure of the condensation, even built on demand, cost more
+    than these searches unless the same queries are repeated many times.
+    """
+
+    def __init__(self, rules: list[Sentence], values: Model):
+        # Posição de cada Symbol.id entre as variáveis do grafo
+        self.ids: dict[int, int] = {}
+        self.variables: list[int] = []
+        self.edges: list[list[Edge]] = []
+        self.facts: list[int] = []
+
+        for rule in rules:
+            self.add_rule(rule)
+        for index in self.variables:
+            if values[index] != UNKNOWN:
+                fact = self.vertex(literal(index, values[index] == TRUE))
+                self.facts.append(fact)
+                self.edges[fact ^ 1].append((fact, None, FACT))
+
+        self.component = self.condense()
+        self.consistent = all(
+            self.component[v] != self.component[v ^ 1]
+            for v in range(0, len(self.edges), 2)
+        )
+        # Arestas pelas quais os literais foram alcançados a partir dos fatos
+        self.reached: dict | None = None
+        # Literais já provados por `decide`
+        self.proven: set[int] = set()
+
+    def vertex(self, literal: int) -> int:
+        """Returns the vertex of a literal: 2 * variable, plus 1 if negated."""
+        index = variable(literal)
+        if index not in self.ids:
+            self.ids[index] = len(self.variables)
+            self.variables.append(index)
+            self.edges.extend(([], []))
+        return 2 * self.ids[index] + (literal < 0)
+
+    def sentence(self, vertex: int) -> Sentence:
+        symbol = Symbol(Symbol.names[self.variables[vertex // 2]])
+        return Not(symbol) if vertex & 1 else symbol
+
+    def add_rule(self, rule: Sentence) -> bool:
+        """Adds the edges of a binary rule, returning False for other rules."""
+        if isinstance(rule, Implication):
+            operands, negated = (rule.antecedent, rule.consequent), True
+        elif isinstance(rule, Or) and len(rule.disjuncts) == 2:
+            operands, negated = rule.disjuncts, False
+        else:
+            return False
+        found = [signed(operand) for operand in operands]
+        if any(lits is None or len(lits) != 1 for lits in found):
+            return False
+
+        first, second = (self.vertex(lits[0]) for lits in found)
+        if negated:
+            self.edges[first].append((second, rule, FORWARD))
+            self.edges[second ^ 1].append((first ^ 1, rule, CONTRAPOSITIVE))
+        else:
+            self.edges[first ^ 1].append((second, rule, LEFT))
+            self.edges[second ^ 1].append((first, rule, RIGHT))
+        return True
+
+    def condense(self) -> list[int]:
+        """Tarjan's algorithm with an explicit stack. Returns the component of
+        each vertex, numbered in reverse topological order: a vertex only
+        reaches components with a number lower or equal to its own."""
+        size = len(self.edges)
+        index = [-1] * size
+        low = [0] * size
+        component = [-1] * size
+        stack: list[int] = []
+        counter = components = 0
+
+        for root in range(size):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            work = [(root, 0)]
+            while work:
+                v, i = work[-1]
+                edges = self.edges[v]
+                if i < len(edges):
+                    work[-1] = (v, i + 1)
+                    w = edges[i][0]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        work.append((w, 0))
+                    elif component[w] == -1:
+                        low[v] = min(low[v], index[w])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        component[w] = components
+                        if w == v:
+                            break
+                    components += 1
+        return component
+
+    def equivalent(self, first: int, second: int) -> bool:
+        """Checks if two literals imply each other."""
+        if variable(first) not in self.ids or variable(second) not in self.ids:
+            return first == second
+        return self.component[self.vertex(first)] == self.component[self.vertex(second)]
+
+    def search(self, sources: list[int], target: int | None = None) -> dict:
+        """Breadth first search from the sources, stopping at `target`.
+
+        Returns the edge through which each reached vertex was found. Vertices
+        whose component comes before the one of the target in topological
+        order cannot reach it and are not expanded.
+        """
+        parents: dict = {source: None for source in sources}
+        bound = -1 if target is None else self.component[target]
+        queue = deque(sources)
+        while queue and target not in parents:
+            v = queue.popleft()
+            for w, rule, kind in self.edges[v]:
+                if w not in parents and self.component[w] >= bound:
+                    parents[w] = (v, rule, kind)
+                    queue.append(w)
+        return parents
+
+    def path(self, parents: dict, target: int) -> list[tuple[int, int, Sentence, int]]:
+        edges = []
+        while parents[target] is not None:
+            source, rule, kind = parents[target]
+            edges.append((source, target, rule, kind))
+            target = source
+        return edges[::-1]
+
+    def entails(self, vertex: int) -> tuple[list[Step], set[int]] | None:
+        """Returns the proof steps of a literal and the literals they establish,
+        or None if it is not entailed. Literals already proven are not
+        derived again."""
+        if vertex in self.proven:
+            return [], set()
+        if self.reached is None:
+            self.reached = self.search(self.facts)
+        if vertex in self.reached:
+            path = self.path(self.reached, vertex)
+            edges = [edge for edge in path if edge[1] not in self.proven]
+            return self.derivation(edges), {edge[1] for edge in edges}
+
+        parents = self.search([vertex ^ 1], vertex)
+        if vertex in parents:
+            return self.refutation(self.path(parents, vertex)), {vertex}
+        return None
+
+    def derivation(self, edges: list) -> list[Step]:
+        """Steps deriving the last literal of a path from a fact.
+
+        Runs of implications are chained by hypothetical syllogism and then
+        applied once by modus ponens.
+        """
+        steps: list[Step] = []
+        chain = None
+        for _, _, rule, kind in edges:
+            if kind == FORWARD:
+                if chain is None:
+                    chain = rule
+                else:
+                    steps.append((HIPOTETICAL, chain, rule))
+                    chain = Implication(chain.antecedent, rule.consequent)
+                continue
+            if chain is not None:
+                steps.append((MODUS_PONENS, chain, None))
+                chain = None
+            if kind == CONTRAPOSITIVE:
+                steps.append((MODUS_TOLLENS, rule, None))
+            else:
+                disjunct = DISJUNCTIVE_RIGHT if kind == RIGHT else DISJUNCTIVE_LEFT
+                steps.append((disjunct, rule, None))
+        if chain is not None:
+            steps.append((MODUS_PONENS, chain, None))
+        return steps
+
+    def refutation(self, edges: list) -> list[Step]:
+        """Steps showing that the complement of the last literal of a path
+        implies it, so that the complement is unsatisfiable."""
+        steps: list[Step] = []
+        chain = None
+        for source, target, rule, kind in edges:
+            if kind != FORWARD:
+                rule = Implication(self.sentence(source), self.sentence(target))
+            if chain is None:
+                chain = rule
+            else:
+                steps.append((HIPOTETICAL, chain, rule))
+                chain = Implication(chain.antecedent, rule.consequent)
+        steps.append((REFUTATION, self.sentence(edges[0][0]), chain))
+        return steps
+
+    def decide(self, query: Sentence) -> tuple[bool | None, list[Step]]:
+        """Decides a literal or a conjunction of literals.
+
+        Returns True with the steps of every literal if all are entailed,
+        False with the steps of a refuted literal, and None otherwise. The
+        literals established are kept in `proven`, so the steps of later
+        queries build on the earlier ones.
+        """
+        found = signed(query)
+        if not self.consistent or not found:
+            return None, []
+        vertices = [self.vertex(lit) for lit in found if variable(lit) in self.ids]
+        for vertex in vertices:
+            refuted = self.entails(vertex ^ 1)
+            if refuted is not None:
+                self.proven |= refuted[1]
+                return False, refuted[0]
+        if len(vertices) < len(found):
+            return None, []
+
+        steps: list[Step] = []
+        proven = set(self.proven)
+        for vertex in vertices:
+            entailed = self.entails(vertex)
+            if entailed is None:
+                self.proven = proven
+                return None, []
+            steps.extend(entailed[0])
+            self.proven |= entailed[1]
+        return True, steps
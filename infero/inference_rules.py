@@ -1,4 +1,4 @@
-from infero.sentences import Implication, Not, Or
+from infero.sentences import Implication, Not, Or, Sentence
 
 
 class ModusPonens:
@@ -41,10 +41,12 @@ class ModusTollens:
 
 class DisjunctiveSyllogism:
 
-    def __init__(self, rule: Or, right: bool = False):
+    def __init__(self, rule: Or, position: int = 0):
+        # Nega o termo em `position` e conclui a disjunção dos demais
+        rest = rule.disjuncts[:position] + rule.disjuncts[position + 1 :]
         self.premise1 = rule
-        self.premise2 = Not(rule.disjuncts[int(right)])
-        self.conclusion = rule.disjuncts[1 - int(right)]
+        self.premise2 = Not(rule.disjuncts[position])
+        self.conclusion = rest[0] if len(rest) == 1 else Or(*rest)
 
     def __repr__(self):
         return (
@@ -74,3 +76,51 @@ class HipoteticalSyllogism:
 
     def apply(self):
         return Implication(self.premise1.antecedent, self.premise2.consequent)
+
+
+class Refutation:
+
+    def __init__(self, assumption: Sentence):
+        self.assumption = assumption
+
+    def __repr__(self):
+        return (
+            f"Refutation\nrules & facts\n"
+            f"{self.assumption.formula()}\n"
+            "------\n"
+            "unsatisfiable\n"
+        )
+
+
+class ModelCheck:
+
+    def __init__(self, query: Sentence, models: int, counterexamples: list[dict]):
+        self.query = query
+        self.models = models
+        self.counterexamples = counterexamples
+
+    def __repr__(self):
+        lines = [f"Model Checking\nrules & facts: {self.models} models"]
+        for model in self.counterexamples:
+            assignment = ", ".join(
+                name if value else f"~{name}" for name, value in model.items()
+            )
+            lines.append(f"counterexample: {assignment}")
+        return "\n".join(lines) + f"\n------\n{self.query.formula()}\n"
+
+
+class UnitResolution:
+
+    def __init__(self, rule: Sentence, premises: list[Sentence], conclusion: Sentence):
+        self.premise1 = rule
+        self.premises = premises
+        self.conclusion = conclusion
+
+    def __repr__(self):
+        premises = "".join(f"{premise.formula()}\n" for premise in self.premises)
+        return (
+            f"Unit Resolution\n{self.premise1.formula()}\n"
+            f"{premises}"
+            "------\n"
+            f"{self.conclusion.formula()}\n"
+        )
@@ -0,0 +1,175 @@
+from array import array
+from collections.abc import Sequence
+
+from infero.inference_rules import (
+    DisjunctiveSyllogism,
+    HipoteticalSyllogism,
+    ModusPonens,
+    ModusTollens,
+    Refutation,
+)
+from infero.sentences import Implication, Not, Or, Sentence
+
+# Regra de cada passo. Em DISJUNCTIVE_LEFT o termo da esquerda é negado e o
+# da direita concluído, e o contrário em DISJUNCTIVE_RIGHT; em DISJUNCTIVE,
+# de disjunções com mais termos, o segundo campo é o termo negado e a
+# conclusão é a disjunção dos demais
+MODUS_PONENS, MODUS_TOLLENS, DISJUNCTIVE_LEFT, DISJUNCTIVE_RIGHT = range(4)
+HIPOTETICAL, REFUTATION, DISJUNCTIVE = range(4, 7)
+# Segundo campo dos passos que usam uma única sentença
+NONE = -1
+
+
+class Justifications:
+    """Log of the derivation steps of a solver run.
+
+    Each step is three integers, the rule applied and the ids of the one or
+    two sentences it used, so the log stays small however long the run is.
+    The first step to give a value to each symbol and the step that derived
+    each intermediate sentence are its justifications. Proof steps are only
+    built on demand, by `proof`, walking back from a query to the steps that
+    support it.
+    """
+
+    def __init__(self):
+        self.sentences: list[Sentence] = []
+        self.ids: dict[Sentence, int] = {}
+        self.records = array("i")
+        # Passo que deu valor a cada símbolo e que derivou cada sentença
+        self.reasons: dict[int, int] = {}
+        self.origins: dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.records) // 3
+
+    def id(self, sentence: Sentence) -> int:
+        found = self.ids.get(sentence)
+        if found is None:
+            found = self.ids[sentence] = len(self.sentences)
+            self.sentences.append(sentence)
+        return found
+
+    def record(self, kind: int, rule: Sentence, other: Sentence | None = None) -> int:
+        """Logs a step, returning its index."""
+        index = len(self)
+        second = NONE if other is None else self.id(other)
+        self.records.extend((kind, self.id(rule), second))
+        return index
+
+    def assign(self, variable: int, step: int):
+        """Marks `step` as the justification of the value of a symbol, by its
+        id, unless the symbol already had one."""
+        self.reasons.setdefault(variable, step)
+
+    def derive(self, sentence: Sentence, step: int):
+        self.origins.setdefault(self.id(sentence), step)
+
+    def origin(self, sentence: Sentence) -> int | None:
+        """Returns the step that derived a sentence, if any, without adding
+        it to the log."""
+        found = self.ids.get(sentence)
+        return None if found is None else self.origins.get(found)
+
+    def unpack(self, index: int) -> tuple[int, Sentence, Sentence | None]:
+        kind, first, second = self.records[3 * index : 3 * index + 3]
+        other = None if second == NONE else self.sentences[second]
+        return kind, self.sentences[first], other
+
+    def conclusion(self, index: int) -> Sentence:
+        return self.conclude(*self.unpack(index))
+
+    @staticmethod
+    def conclude(kind: int, rule: Sentence, other: Sentence | None) -> Sentence:
+        """Returns what a step would conclude, without logging it."""
+        if kind == MODUS_PONENS:
+            return rule.consequent
+        if kind == MODUS_TOLLENS:
+            return Not(rule.antecedent)
+        if kind == DISJUNCTIVE_LEFT:
+            return rule.disjuncts[1]
+        if kind == DISJUNCTIVE_RIGHT:
+            return rule.disjuncts[0]
+        if kind == DISJUNCTIVE:
+            return Or(
+                *(disjunct for disjunct in rule.disjuncts if disjunct is not other)
+            )
+        if kind == HIPOTETICAL:
+            return Implication(rule.antecedent, other.consequent)
+        return Not(rule)
+
+    def step(self, index: int):
+        """Builds the inference rule object of a step."""
+        kind, rule, other = self.unpack(index)
+        if kind == MODUS_PONENS:
+            return ModusPonens(rule)
+        if kind == MODUS_TOLLENS:
+            return ModusTollens(rule)
+        if kind in (DISJUNCTIVE_LEFT, DISJUNCTIVE_RIGHT):
+            return DisjunctiveSyllogism(rule, int(kind == DISJUNCTIVE_RIGHT))
+        if kind == DISJUNCTIVE:
+            return DisjunctiveSyllogism(rule, rule.disjuncts.index(other))
+        if kind == HIPOTETICAL:
+            return HipoteticalSyllogism(rule, other)
+        return Refutation(rule)
+
+    def premises(self, index: int) -> list[int]:
+        """Returns the earlier steps a step depends on."""
+        kind, rule, other = self.unpack(index)
+        if kind == MODUS_PONENS:
+            facts = rule.antecedent.variables()
+        elif kind == MODUS_TOLLENS:
+            facts = rule.consequent.variables()
+        elif kind == DISJUNCTIVE_LEFT:
+            facts = rule.disjuncts[0].variables()
+        elif kind == DISJUNCTIVE_RIGHT:
+            facts = rule.disjuncts[1].variables()
+        elif kind == DISJUNCTIVE:
+            facts = other.variables()
+        else:
+            facts = ()
+        found = [self.reasons.get(variable, index) for variable in facts]
+        found.append(self.origins.get(self.ids[rule], index))
+        if other is not None and kind != DISJUNCTIVE:
+            found.append(self.origins.get(self.ids[other], index))
+        return [step for step in found if step < index]
+
+    def support(self, variables, end: int | None = None) -> list[int]:
+        """Returns, in order, the steps taken before `end` that the values of
+        the symbols with the given ids depend on."""
+        end = len(self) if end is None else end
+        reasons = self.reasons
+        stack = [reasons[v] for v in variables if reasons.get(v, end) < end]
+        needed: set[int] = set()
+        while stack:
+            index = stack.pop()
+            if index not in needed:
+                needed.add(index)
+                stack.extend(self.premises(index))
+        return sorted(needed)
+
+    def proof(self, query: Sentence, end: int | None = None) -> "Proof":
+        return Proof(self, query, len(self) if end is None else end)
+
+
+class Proof(Sequence):
+    """Steps of the proof of a query, found in the log and built only when
+    accessed."""
+
+    def __init__(self, log: Justifications, query: Sentence, end: int):
+        self.log = log
+        self.query = query
+        self.end = end
+        self.indexes: list[int] | None = None
+
+    def support(self) -> list[int]:
+        if self.indexes is None:
+            self.indexes = self.log.support(self.query.variables(), self.end)
+        return self.indexes
+
+    def __len__(self):
+        return len(self.support())
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.log.step(index) for index in self.support()[position]]
+        return self.log.step(self.support()[position])
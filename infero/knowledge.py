@@ -0,0 +1,230 @@
+from typing import Iterable
+
+from infero.cnf import Clause, Literal, clausify
+from infero.horn import literals
+from infero.inference_rules import UnitResolution
+from infero.parser import Parser
+from infero.sentences import Not, Sentence, Symbol
+
+# Justificativa de um fato afirmado diretamente com `tell`
+PREMISE = None
+
+
+class KnowledgeBase:
+    """Rules and facts kept in memory, with incremental updates.
+
+    Rules are turned into clauses over their symbols and facts are derived by
+    unit propagation: when every literal of a clause but one is false, the
+    remaining one is derived. Every derived fact records its justification,
+    the clause used and the facts that made it unit, as in a justification
+    based truth maintenance system. Telling a fact only propagates from it,
+    and retracting a fact only withdraws the facts that depend on it and looks
+    for another justification for them.
+
+    Rules whose clauses by distribution would blow up are clausified with
+    auxiliary variables, which take part in the propagation like symbols but
+    stay out of `symhash` and appear in the explanations as the subsentences
+    they stand for. Unit propagation over them may derive fewer facts than
+    over the full clausal form, which the base could not hold.
+    """
+
+    def __init__(self, rules: list[Sentence] = (), facts: list[Sentence] = ()):
+        self.rules: list[Sentence] = []
+        self.clauses: list[tuple[Sentence, Clause]] = []
+        self.watch: dict[str, list[int]] = {}
+        self.values: dict[str, bool | None] = {}
+        self.auxiliary: dict[str, Sentence] = {}
+        self.support: dict[str, tuple[int, tuple[str, ...]] | None] = {}
+        self.dependents: dict[str, set[str]] = {}
+        self.conflicts: set[int] = set()
+
+        for rule in rules:
+            self.add_rule(rule)
+        for fact in facts:
+            self.tell(fact)
+
+    @classmethod
+    def parse(cls, data: str | Iterable[str]) -> "KnowledgeBase":
+        """Builds a knowledge base from the source of a .ifo program."""
+        kb = cls()
+        kb.load(data)
+        return kb
+
+    def load(self, data: str | Iterable[str]) -> list[Sentence]:
+        """Adds the rules and facts of a .ifo source, given as a string or as
+        chunks of text, returning its queries.
+
+        Each statement is added as soon as it is parsed, so the source is never
+        held in memory as a whole.
+        """
+        queries = []
+        for kind, sentence in Parser(data).statements():
+            if kind == "rules":
+                self.add_rule(sentence)
+            elif kind == "facts":
+                self.tell(sentence)
+            else:
+                queries.append(sentence)
+        return queries
+
+    @property
+    def consistent(self) -> bool:
+        return not self.conflicts
+
+    @property
+    def symhash(self) -> dict[str, bool | None]:
+        """The values of the symbols, without the auxiliary variables."""
+        if not self.auxiliary:
+            return self.values
+        return {
+            name: value
+            for name, value in self.values.items()
+            if name not in self.auxiliary
+        }
+
+    def fresh(self, sentence: Sentence) -> str:
+        """Names a new auxiliary variable standing for the sentence; the name
+        cannot be written in a program, so it never clashes with a symbol."""
+        name = f"#{len(self.auxiliary)}"
+        self.auxiliary[name] = sentence
+        return name
+
+    def add_rule(self, rule: Sentence):
+        self.rules.append(rule)
+        for symbol in rule.symbols():
+            self.values.setdefault(symbol, None)
+        added = []
+        for clause in clausify(rule, fresh=self.fresh):
+            index = len(self.clauses)
+            self.clauses.append((rule, clause))
+            for name, _ in clause:
+                self.values.setdefault(name, None)
+                self.watch.setdefault(name, []).append(index)
+            added.append(index)
+        self.propagate(added)
+
+    def literal(self, fact: Sentence) -> Literal:
+        found = literals(fact)
+        if found is None or len(found) != 1:
+            raise ValueError("facts can only be atoms or atomic negations")
+        return found[0]
+
+    def tell(self, fact: Sentence):
+        """Asserts a literal fact and derives its consequences."""
+        name, value = self.literal(fact)
+        current = self.values.get(name)
+        if current is not None and current != value:
+            raise ValueError(f"{fact.formula()} contradicts the knowledge base")
+        if current is not None:
+            if self.support[name] is not PREMISE:
+                self.unlink(name)
+                self.support[name] = PREMISE
+            return
+        self.assign(name, value, PREMISE)
+        self.propagate(self.watch.get(name, ()))
+
+    def retract(self, fact: Sentence):
+        """Withdraws a fact asserted with `tell`, and every fact derived from
+        it that has no other justification."""
+        name, value = self.literal(fact)
+        if self.values.get(name) != value or self.support[name] is not PREMISE:
+            raise ValueError(f"{fact.formula()} was not told")
+
+        withdrawn = [name]
+        stack = [name]
+        while stack:
+            for dependent in self.dependents.pop(stack.pop(), ()):
+                if self.values[dependent] is not None:
+                    withdrawn.append(dependent)
+                    stack.append(dependent)
+                    self.unlink(dependent)
+                    self.values[dependent] = None
+        self.values[name] = None
+        del self.support[name]
+        for dependent in withdrawn[1:]:
+            del self.support[dependent]
+
+        touched = {index for name in withdrawn for index in self.watch.get(name, ())}
+        self.conflicts -= touched
+        self.propagate(sorted(touched))
+
+    def ask(self, query: Sentence) -> tuple[bool | None, list]:
+        """Evaluates the query over the current facts, along with the steps
+        that justify its symbols."""
+        model = self.values
+        if not self.values.keys() >= query.symbols():
+            model = {**dict.fromkeys(query.symbols()), **self.values}
+        finded = query.evaluate(model)
+        if finded is None:
+            return None, []
+        return finded, self.explain(query.symbols())
+
+    def premises(self) -> dict[str, bool | None]:
+        """The symbol table with only the facts asserted with `tell`."""
+        return {
+            name: value if self.support.get(name, 0) is PREMISE else None
+            for name, value in self.symhash.items()
+        }
+
+    def explain(self, names) -> list[UnitResolution]:
+        """Returns the derivation steps of the given symbols, premises first."""
+        steps: list[UnitResolution] = []
+        visited: set[str] = set()
+        stack: list[tuple[str, bool]] = [(name, False) for name in names]
+        while stack:
+            name, expanded = stack.pop()
+            support = self.support.get(name)
+            if support is PREMISE:
+                continue
+            if expanded:
+                index, antecedents = support
+                rule = self.clauses[index][0]
+                premises = [self.fact(other) for other in antecedents]
+                steps.append(UnitResolution(rule, premises, self.fact(name)))
+            elif name not in visited:
+                visited.add(name)
+                stack.append((name, True))
+                stack.extend((other, False) for other in support[1])
+        return steps
+
+    def fact(self, name: str) -> Sentence:
+        sentence = self.auxiliary.get(name) or Symbol(name)
+        return sentence if self.values[name] else Not(sentence)
+
+    def assign(self, name: str, value: bool, support):
+        self.values[name] = value
+        self.support[name] = support
+        if support is not PREMISE:
+            for antecedent in support[1]:
+                self.dependents.setdefault(antecedent, set()).add(name)
+
+    def unlink(self, name: str):
+        support = self.support.get(name)
+        if support is not PREMISE:
+            for antecedent in support[1]:
+                self.dependents.get(antecedent, set()).discard(name)
+
+    def propagate(self, pending):
+        """Unit propagation starting from the given clauses."""
+        queue = list(pending)
+        values = self.values
+        while queue:
+            index = queue.pop()
+            _, clause = self.clauses[index]
+            unassigned = None
+            free = 0
+            for name, value in clause:
+                current = values[name]
+                if current is None:
+                    unassigned = (name, value)
+                    free += 1
+                elif current == value:
+                    break
+            else:
+                if free == 0:
+                    self.conflicts.add(index)
+                elif free == 1:
+                    name, value = unassigned
+                    antecedents = tuple(n for n, _ in clause if n != name)
+                    self.assign(name, value, (index, antecedents))
+                    queue.extend(self.watch[name])
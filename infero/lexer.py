@@ -1,38 +1,105 @@
 import re
+from functools import partial
+from itertools import chain
+from typing import Iterable, Iterator, TextIO
 
 from infero.tokens import TOKENS, Token
 
+# Todas as expressões de TOKENS combinadas em um único padrão. A alternância
+# respeita a ordem de TOKENS, preservando a prioridade entre os tokens.
+PATTERN = re.compile("|".join(f"(?P<{tag}>{regex})" for tag, regex in TOKENS))
+
+# Tamanho dos blocos lidos de arquivos e da entrada padrão
+CHUNK = 64 * 1024
+
+# Token devolvido ao fim da entrada
+EOF = Token("", "")
+
+# Um resto do bloco mais curto que isto que não forma token pode ser o começo
+# de um operador, como o "-" de "->", e espera o próximo bloco
+PARTIAL = 8
+
+
+def read_chunks(file: TextIO, size: int = CHUNK) -> Iterator[str]:
+    """Yields the text of a file in blocks of `size` characters."""
+    return iter(partial(file.read, size), "")
+
 
 class Lexer:
-    def __init__(self, data):
-        if not data:
-            raise Exception("No data")
-        self.data: str = data
+    """Tokenizer of a program given as a string or as an iterable of text
+    chunks, such as `read_chunks(sys.stdin)`.
+
+    Chunks are consumed as tokens are requested and only the text of the
+    token being read is kept between chunks, so the input never needs to be
+    in memory at once, even when it has no line breaks.
+    """
+
+    def __init__(self, data: str | Iterable[str]):
+        if isinstance(data, str):
+            if not data:
+                raise Exception("No data")
+            data = (data,)
+        self.source: Iterable[str] = data
+        self.pos: int = 0
         self.line: int = 1
+        self.line_start: int = 0
         self.id_table: dict[str, Token] = {}
+        self.count: int = 0
+        self.stream: Iterator[Token] = self.tokens()
+
+    @property
+    def column(self) -> int:
+        return self.pos - self.line_start + 1
+
+    def tokens(self) -> Iterator[Token]:
+        """Yields the tokens of the input, skipping whitespaces and newlines."""
+        match = PATTERN.match
+        id_table = self.id_table
+        data = ""
+        # Posição absoluta do início de `data` na entrada
+        base = self.pos
+
+        for chunk in chain(self.source, [None]):
+            final = chunk is None
+            if not final:
+                data += chunk
+            end = len(data)
+            pos = 0
+
+            while pos < end:
+                found = match(data, pos)
+                if found is None:
+                    if not final and end - pos < PARTIAL:
+                        break
+                    raise SyntaxError(
+                        f"L{self.line}:{self.column}, Unexpected char: {data[pos]}"
+                    )
+                tag = found.lastgroup
+                start, stop = found.span()
+                # Antes do fim da entrada, um token que chega ao fim do bloco
+                # pode continuar no próximo, como um símbolo, e só é lido com
+                # ele; espaços podem ser divididos
+                if stop == end and not final and tag not in ("NEWLINE", "WHITESPACE"):
+                    break
+                pos = stop
+                self.pos = base + pos
+
+                if tag == "NEWLINE" or tag == "WHITESPACE":
+                    breaks = data.count("\n", start, pos)
+                    if breaks:
+                        self.line += breaks
+                        self.line_start = base + data.rindex("\n", start, pos) + 1
+                    continue
+
+                value = found.group()
+                token = Token(value, tag, self.line, base + start - self.line_start + 1)
+                if tag == "SYMBOL":
+                    id_table.setdefault(value, token)
+                self.count += 1
+                yield token
+
+            data = data[pos:]
+            base += pos
 
     def scan(self) -> Token:
-        if not self.data:
-            return Token("", "")
-
-        for token_type, regex in TOKENS:
-            match = re.match(regex, self.data)
-            if match:
-                value = match.group(0)
-                self.data = self.data[len(value) :]
-                if token_type != "WHITESPACE":
-                    if token_type == "NEWLINE":
-                        self.line += 1
-                        return self.scan()
-                    if token_type == "SYMBOL":
-                        finded = self.id_table.get(value)
-                        if finded:
-                            return finded
-                        else:
-                            self.id_table[value] = Token(value, token_type)
-                            return self.id_table[value]
-                    return Token(value, token_type)
-                else:
-                    return self.scan()
-        else:
-            raise SyntaxError(f"Unexpected char: {self.data[0]}")
+        return next(self.stream, EOF)
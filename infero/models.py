@@ -0,0 +1,201 @@
+from collections import Counter
+from typing import Iterator
+
+from infero.cnf import CNF
+from infero.relevance import find
+from infero.sat import SatSolver
+from infero.sentences import Sentence
+from infero.stats import Stats
+
+Clause = frozenset[int]
+
+
+def encode(
+    rules: list[Sentence],
+    symhash: dict[str, bool | None],
+    project: list[str] | None = None,
+) -> tuple[CNF, list[str]]:
+    """Returns the clauses of the rules and facts and the symbols the models
+    are taken over: the projected ones or, by default, every unknown one."""
+    cnf = CNF()
+    for rule in rules:
+        cnf.add(rule)
+    cnf.add_facts(symhash)
+    if project is None:
+        return cnf, [name for name, value in symhash.items() if value is None]
+    missing = [name for name in project if name not in symhash]
+    if missing:
+        raise ValueError(f"unknown symbols: {', '.join(missing)}")
+    return cnf, list(dict.fromkeys(project))
+
+
+def enumerate_models(
+    rules: list[Sentence],
+    symhash: dict[str, bool | None],
+    project: list[str] | None = None,
+) -> Iterator[dict[str, bool]]:
+    """Lazily yields the models of the rules and facts, as dicts over the
+    unknown symbols or over the `project` ones.
+
+    Models are found one at a time by the SAT solver, and each one is blocked
+    by a clause before the next search, so no table of assignments is ever
+    built and a projection yields each of its assignments once.
+    """
+    cnf, names = encode(rules, symhash, project)
+    variables = [cnf.ids[name] for name in names]
+    solver = SatSolver(cnf.clauses, cnf.variables)
+    while solver.solve():
+        model = solver.model
+        yield {name: model[var] for name, var in zip(names, variables)}
+        if not variables:
+            return
+        solver.add_clause([-var if model[var] else var for var in variables])
+
+
+def condition(clauses: list[Clause], literal: int) -> list[Clause] | None:
+    """Simplifies the clauses by a true literal, returning None on an empty
+    clause."""
+    result = []
+    for clause in clauses:
+        if literal in clause:
+            continue
+        if -literal in clause:
+            clause = clause - {-literal}
+            if not clause:
+                return None
+        result.append(clause)
+    return result
+
+
+def propagate(clauses: list[Clause]) -> tuple[list[Clause] | None, set[int]]:
+    """Applies unit propagation, returning the simplified clauses, or None on
+    a conflict, and the variables assigned."""
+    assigned: set[int] = set()
+    while clauses:
+        unit = next((clause for clause in clauses if len(clause) == 1), None)
+        if unit is None:
+            break
+        (literal,) = unit
+        assigned.add(abs(literal))
+        clauses = condition(clauses, literal)
+        if clauses is None:
+            return None, assigned
+    return clauses, assigned
+
+
+def components(clauses: list[Clause]) -> list[list[Clause]]:
+    """Splits the clauses into groups that share no variables."""
+    parent: dict[int, int] = {}
+    for clause in clauses:
+        first = abs(next(iter(clause)))
+        for literal in clause:
+            parent.setdefault(abs(literal), abs(literal))
+            a, b = find(parent, first), find(parent, abs(literal))
+            if a != b:
+                parent[b] = a
+    groups: dict[int, list[Clause]] = {}
+    for clause in clauses:
+        groups.setdefault(find(parent, abs(next(iter(clause)))), []).append(clause)
+    return list(groups.values())
+
+
+class ModelCounter:
+    """Exact model counter with component decomposition and caching.
+
+    After unit propagation the clauses are split into components that share
+    no variables, whose counts multiply, and each component is counted once:
+    its count is cached by its set of clauses, which recur often across
+    branches. Only the `projected` variables are branched on and counted;
+    a component left without them counts 1 if it is satisfiable, so the
+    auxiliary variables of the Tseitin transform, defined by the others, do
+    not change the count.
+
+    The search keeps its own stack of subproblems instead of recursing, so
+    its depth is limited only by memory.
+    """
+
+    def __init__(self, projected: set[int], stats: Stats | None = None):
+        self.projected = projected
+        self.stats = stats
+        self.cache: dict[frozenset[Clause], int] = {}
+
+    def count(self, clauses: list[Clause], variables: set[int]) -> int:
+        """Counts the assignments of the projected `variables` that extend to
+        models of the clauses."""
+        stack = [self.search(clauses, variables)]
+        value = None
+        while stack:
+            try:
+                request = stack[-1].send(value)
+            except StopIteration as done:
+                stack.pop()
+                value = done.value
+            else:
+                stack.append(self.search(*request))
+                value = None
+        return value
+
+    def search(self, clauses: list[Clause] | None, variables: set[int]):
+        """Counts like `count`, yielding each subproblem as (clauses,
+        variables) and receiving its count."""
+        if clauses is None:
+            return 0
+        clauses, assigned = propagate(clauses)
+        if clauses is None:
+            return 0
+        remaining = {abs(literal) for clause in clauses for literal in clause}
+        # Variáveis que sumiram das cláusulas sem receber valor são livres
+        free = (variables - assigned - remaining) & self.projected
+        total = 1 << len(free)
+        for component in components(clauses):
+            key = frozenset(component)
+            found = self.cache.get(key)
+            if found is None:
+                found = yield from self.split(component)
+                self.cache[key] = found
+            elif self.stats is not None:
+                self.stats.count("component_hits")
+            total *= found
+            if not total:
+                return 0
+        return total
+
+    def split(self, component: list[Clause]):
+        """Counts a component by branching on its most frequent variable."""
+        if self.stats is not None:
+            self.stats.count("components")
+        occurrences = Counter(
+            abs(literal) for clause in component for literal in clause
+        )
+        variables = set(occurrences)
+        chosen = variables & self.projected
+        var = max(chosen or variables, key=occurrences.__getitem__)
+        rest = variables - {var}
+        if self.stats is not None:
+            self.stats.count("decisions")
+        first = yield (condition(component, var), rest)
+        if not chosen:
+            # Sem variáveis projetadas basta saber se o componente é satisfatível
+            if first:
+                return 1
+            return (yield (condition(component, -var), rest))
+        return first + (yield (condition(component, -var), rest))
+
+
+def count_models(
+    rules: list[Sentence],
+    symhash: dict[str, bool | None],
+    project: list[str] | None = None,
+    stats: Stats | None = None,
+) -> int:
+    """Counts the models of the rules and facts over the unknown symbols, or
+    over the `project` ones, without enumerating them."""
+    cnf, names = encode(rules, symhash, project)
+    clauses = []
+    for clause in map(frozenset, cnf.clauses):
+        if not clause:
+            return 0
+        if not any(-literal in clause for literal in clause):
+            clauses.append(clause)
+    counter = ModelCounter({cnf.ids[name] for name in names}, stats)
+    return counter.count(clauses, set(range(1, cnf.variables + 1)))
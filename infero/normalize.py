@@ -0,0 +1,129 @@
+from infero.budget import Budget
+from infero.sentences import And, Implication, Not, Or, Sentence, Symbol
+
+# Conjunção e disjunção vazias, os valores constantes verdadeiro e falso
+TAUTOLOGY = And()
+CONTRADICTION = Or()
+
+
+def negate(sentence: Sentence) -> Sentence:
+    return sentence.operand if isinstance(sentence, Not) else Not(sentence)
+
+
+def order(sentence: Sentence) -> tuple:
+    """Sort key of the operands: literals first, by symbol and the positive
+    before the negative, then the other sentences by formula."""
+    atom = sentence.operand if isinstance(sentence, Not) else sentence
+    if isinstance(atom, Symbol):
+        return (0, atom.name, atom is not sentence)
+    return (1, sentence.formula(), False)
+
+
+def simplify(node: Sentence, children: list[Sentence]) -> Sentence:
+    """Rebuilds a node over its already normalized children."""
+    if isinstance(node, Symbol):
+        return node
+    if isinstance(node, Not):
+        (operand,) = children
+        if operand is TAUTOLOGY:
+            return CONTRADICTION
+        if operand is CONTRADICTION:
+            return TAUTOLOGY
+        if isinstance(operand, Not):
+            return operand.operand
+        if operand is node.operand:
+            return node
+        return Not(operand)
+    if isinstance(node, Implication):
+        antecedent, consequent = children
+        if (
+            antecedent is CONTRADICTION
+            or consequent is TAUTOLOGY
+            or antecedent is consequent
+        ):
+            return TAUTOLOGY
+        if antecedent is TAUTOLOGY:
+            return consequent
+        if consequent is CONTRADICTION:
+            return negate(antecedent)
+        if (antecedent, consequent) == node.children():
+            return node
+        return Implication(antecedent, consequent)
+
+    kind = type(node)
+    if kind is And:
+        unit, zero = TAUTOLOGY, CONTRADICTION
+    else:
+        unit, zero = CONTRADICTION, TAUTOLOGY
+    # Filhos do mesmo conectivo já estão achatados, então basta um nível; o
+    # elemento neutro é o conectivo vazio e some ao ser achatado
+    operands: dict[Sentence, None] = {}
+    for child in children:
+        flat = child.children() if type(child) is kind else (child,)
+        operands.update(dict.fromkeys(flat))
+    if zero in operands:
+        return zero
+    for operand in operands:
+        if isinstance(operand, Not) and operand.operand in operands:
+            return zero
+    if not operands:
+        return unit
+    if len(operands) == 1:
+        return next(iter(operands))
+    operands = tuple(sorted(operands, key=order))
+    if operands == node.children():
+        return node
+    return kind(*operands)
+
+
+def normalize(sentence: Sentence) -> Sentence:
+    """Returns the normal form of a sentence.
+
+    Chains of conjunctions and of disjunctions are flattened into a single
+    n-ary node whose operands have no duplicates and are sorted by `order`,
+    double negations are folded, and operands that decide the node, as a
+    literal next to its complement, turn it into a constant: TAUTOLOGY, the
+    empty conjunction, or CONTRADICTION, the empty disjunction. Equivalent
+    sentences that differ only in these ways become the same node.
+
+    The normal form is cached in each node, so shared subsentences and
+    sentences normalized before are not visited again.
+    """
+    # Normaliza de baixo para cima apenas os nós ainda sem cache
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        missing = [child for child in node.children() if child._normal is None]
+        if missing:
+            stack.extend(missing)
+            continue
+        stack.pop()
+        if node._normal is None:
+            children = [child._normal for child in node.children()]
+            normal = simplify(node, children)
+            object.__setattr__(node, "_normal", normal)
+            if normal._normal is None:
+                object.__setattr__(normal, "_normal", normal)
+    return sentence._normal
+
+
+def normalize_rules(
+    rules: list[Sentence], budget: Budget | None = None
+) -> list[Sentence]:
+    """Normalizes the rules, dropping duplicates and tautologies.
+
+    A rule that is a contradiction has no normal form the engines accept as
+    a rule, so it is kept as written. If the deadline of `budget` passes, the
+    rules not yet normalized are also kept as written.
+    """
+    result: dict[Sentence, None] = {}
+    for i, rule in enumerate(rules):
+        if budget is not None and budget.expired(i):
+            result.update(dict.fromkeys(rules[i:]))
+            break
+        normal = normalize(rule)
+        if normal is CONTRADICTION:
+            result[rule] = None
+        elif normal is not TAUTOLOGY:
+            result[normal] = None
+    return list(result)
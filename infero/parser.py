@@ -1,10 +1,19 @@
+from typing import Iterable, Iterator
+
 from infero.lexer import Lexer
 from infero.sentences import And, Implication, Not, Or, Sentence, Symbol
 from infero.tokens import Token
 
 
 class Parser:
-    def __init__(self, data: str):
+    """Recursive descent parser of .ifo programs.
+
+    `start` parses the whole program into `program`, while `statements`
+    yields each statement as soon as it is parsed, for consumers that do not
+    need to keep the program in memory.
+    """
+
+    def __init__(self, data: str | Iterable[str]):
         self.scanner: Lexer = Lexer(data)
         self.lookahead: Token = self.scanner.scan()
         self.symtable: dict[str, Sentence] = {}
@@ -15,34 +24,44 @@ class Parser:
             "query": [],
         }
 
+    @classmethod
+    def sentence(cls, data: str) -> Sentence:
+        """Parses a single sentence, as written in a section of a program."""
+        parser = cls(data)
+        sentence = parser.expr()
+        if parser.lookahead.value:
+            raise SyntaxError(
+                f"L{parser.scanner.line}, {parser.lookahead.value} inesperado"
+            )
+        return sentence
+
     def start(self):
-        self.rules_section()
-        self.facts_section()
-        self.query_section()
-        self.semantic_analysis()
-
-    def semantic_analysis(self):
-        for rule in self.program["rules"]:
-            if (
-                isinstance(rule, And)
-                or isinstance(rule, Not)
-                or isinstance(rule, Symbol)
-            ):
-                raise SyntaxError(
-                    f"L{self.scanner.line}, regras podem ser apenas implicações ou disjunções"
-                )
-        for fact in self.program["facts"]:
-            symbols = list(fact.symbols())
+        for kind, sentence in self.statements():
+            self.program[kind].append(sentence)
+        if not self.program["query"]:
+            raise SyntaxError(f"L{self.scanner.line}, query vazia")
+
+    def statements(self) -> Iterator[tuple[str, Sentence]]:
+        """Yields the section and the sentence of each statement, already
+        checked, in the order of the source."""
+        yield from self.rules_section()
+        yield from self.facts_section()
+        yield from self.query_section()
+
+    def semantic_analysis(self, kind: str, sentence: Sentence):
+        if kind == "rules" and isinstance(sentence, (And, Not, Symbol)):
+            raise SyntaxError(
+                f"L{self.scanner.line}, regras podem ser apenas implicações ou disjunções"
+            )
+        if kind == "facts":
+            symbols = list(sentence.symbols())
             if len(symbols) > 1:
                 raise SyntaxError(
                     f"L{self.scanner.line}, fatos podem ser apenas átomos ou negações atômicas"
                 )
             self.symhash[symbols[0]] = True
-            if isinstance(fact, Not):
-                self.symhash[symbols[0]] = fact.evaluate(self.symhash)
-        query = self.program["query"]
-        if len(query) > 1:
-            raise SyntaxError(f"L{self.scanner.line}, query deve ser única")
+            if isinstance(sentence, Not):
+                self.symhash[symbols[0]] = sentence.evaluate(self.symhash)
 
     def match(self, value: str):
         if self.lookahead.value == value:
@@ -56,7 +75,7 @@ class Parser:
         """
         if not self.match("rules:"):
             raise SyntaxError(f"L{self.scanner.line}, 'rules:' esperado")
-        self.stmts("rules")
+        yield from self.stmts("rules")
 
     def facts_section(self):
         """
@@ -64,7 +83,7 @@ class Parser:
         """
         if not self.match("facts:"):
             raise SyntaxError(f"L{self.scanner.line}, 'facts:' esperado")
-        self.stmts("facts")
+        yield from self.stmts("facts")
 
     def query_section(self):
         """
@@ -72,76 +91,89 @@ class Parser:
         """
         if not self.match("query:"):
             raise SyntaxError(f"L{self.scanner.line}, 'query:' esperado")
-        self.stmts("query")
+        yield from self.stmts("query")
 
     def stmts(self, kind: str):
         """
         <stmts> ::= <stmt> <stmts>
         <stmt> ::= <expr>
         """
-        stmts_list: list = self.program[kind]
         while not self.match("end"):
             expr = self.expr()
-            stmts_list.append(expr)
+            self.semantic_analysis(kind, expr)
+            yield kind, expr
 
-    def expr(self):
+    def expr(self) -> Sentence:
         """
         <expr> ::= <term> <imp>
         <imp> ::= "->" <term> | empty
-        """
-        left = self.term()
-        if self.lookahead.value == "->":
-            self.match("->")
-            right = self.term()
-            return Implication(left, right)
-        else:
-            return left
-
-    def term(self):
-        """
         <term> ::= <fact> <binary_op>
         <binary_op> ::= "&" <fact> | "|" <fact> | empty
+        <fact> ::= "(" <expr> ")" | "~" <fact> | <symbol>
         """
-        left = self.fact()
+        # Cada parêntese aberto empilha uma expressão em andamento, no lugar
+        # da recursão, então a profundidade é limitada apenas pela memória:
+        # [negações do parêntese, antecedente, operandos do termo, operador]
+        stack: list[list] = [[0, None, [], None]]
         while True:
-            if self.lookahead.value == "&":
-                self.match("&")
-                right = self.fact()
-                left = And(left, right)
-            elif self.lookahead.value == "|":
-                self.match("|")
-                right = self.fact()
-                left = Or(left, right)
-            else:
-                break
-        return left
-
-    def fact(self):
+            negations = 0
+            while self.lookahead.value in ("(", "~"):
+                if self.match("~"):
+                    negations += 1
+                else:
+                    self.match("(")
+                    stack.append([negations, None, [], None])
+                    negations = 0
+            sentence = self.symbol()
+            while negations:
+                sentence = Not(sentence)
+                negations -= 1
+
+            while True:
+                frame = stack[-1]
+                _, antecedent, operands, operator = frame
+                operands.append(sentence)
+                value = self.lookahead.value
+                if value == "&" or value == "|":
+                    self.match(value)
+                    connective = And if value == "&" else Or
+                    # Uma sequência do mesmo operador forma um único nó n-ário
+                    if operator is not None and operator is not connective:
+                        frame[2] = [operator(*operands)]
+                    frame[3] = connective
+                    break
+                term = operands[0] if operator is None else operator(*operands)
+                if value == "->" and antecedent is None:
+                    self.match("->")
+                    frame[1:] = [term, [], None]
+                    break
+
+                sentence = term
+                if antecedent is not None:
+                    sentence = Implication(antecedent, sentence)
+                if len(stack) == 1:
+                    return sentence
+                if not self.match(")"):
+                    raise SyntaxError(f"L{self.scanner.line}, ')' esperado")
+                negations = stack.pop()[0]
+                while negations:
+                    sentence = Not(sentence)
+                    negations -= 1
+
+    def symbol(self) -> Sentence:
         """
-        <fact> ::= "(" <expr> ")" | "~" <fact> | <symbol>
         <symbol> ::= a-zA-Z
         """
-        if self.lookahead.value == "(":
-            self.match("(")
-            expr = self.expr()
-            if not self.match(")"):
-                raise SyntaxError(f"L{self.scanner.line}, ')' esperado")
-            return expr
-        else:
-            if self.lookahead.value == "~":
-                self.match("~")
-                operand = self.fact()
-                return Not(operand)
-            symbol: str = self.lookahead.value
-            if not symbol.isalpha():
-                raise SyntaxError(
-                    f"L{self.scanner.line}, {symbol} simbolos precisam ser letras"
-                )
-            finded = self.symtable.get(symbol)
-            self.lookahead = self.scanner.scan()
-            if finded:
-                return finded
+        symbol: str = self.lookahead.value
+        if not symbol.isalpha():
+            raise SyntaxError(
+                f"L{self.scanner.line}, {symbol} simbolos precisam ser letras"
+            )
+        finded = self.symtable.get(symbol)
+        self.lookahead = self.scanner.scan()
+        if finded:
+            return finded
 
-            self.symtable[symbol] = Symbol(symbol)
-            self.symhash[symbol] = None
-            return self.symtable[symbol]
+        self.symtable[symbol] = Symbol(symbol)
+        self.symhash[symbol] = None
+        return self.symtable[symbol]
@@ -0,0 +1,55 @@
+from infero.budget import Budget
+from infero.sentences import Sentence
+
+
+def find(parent: dict[str, str], name: str) -> str:
+    root = name
+    while parent[root] != root:
+        root = parent[root]
+    while parent[name] != root:
+        parent[name], name = root, parent[name]
+    return root
+
+
+def relevant(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    budget: Budget | None = None,
+) -> tuple[list[Sentence], dict[str, bool | None]]:
+    """Keeps only the cone of influence of the queries.
+
+    Symbols are joined when they appear in the same rule, with union-find, and
+    a rule is kept only if its symbols are joined to a symbol of a query.
+    Modus tollens and disjunctive syllogism propagate values against the
+    direction of the rules, so the dependencies are taken in both directions.
+    Returns the kept rules and the values of the symbols they and the queries
+    mention, in the order of `symhash`. If the deadline of `budget` passes,
+    nothing is pruned.
+    """
+    parent: dict[str, str] = {}
+    for i, sentence in enumerate((*rules, *queries)):
+        if budget is not None and budget.expired(i):
+            return rules, symhash
+        names = sentence.symbols()
+        for name in names:
+            parent.setdefault(name, name)
+        first = next(iter(names), None)
+        for name in names:
+            a, b = find(parent, first), find(parent, name)
+            if a != b:
+                parent[b] = a
+
+    roots = {find(parent, name) for query in queries for name in query.symbols()}
+    kept = []
+    for i, rule in enumerate(rules):
+        if budget is not None and budget.expired(i):
+            return rules, symhash
+        if any(find(parent, name) in roots for name in rule.symbols()):
+            kept.append(rule)
+    scope = {
+        name: value
+        for name, value in symhash.items()
+        if name in parent and find(parent, name) in roots
+    }
+    return kept, scope
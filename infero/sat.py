@@ -0,0 +1,384 @@
+from heapq import heapify, heappop, heappush
+
+from infero.budget import Budget
+from infero.cnf import CNF
+from infero.inference_rules import Refutation
+from infero.sentences import Not, Sentence
+from infero.stats import Stats
+
+UNDEF = -1
+
+
+def luby(i: int) -> int:
+    """Returns the i-th element (from 0) of the Luby restart sequence."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 1 << seq
+
+
+class SatSolver:
+    """CDCL solver with two watched literals, first-UIP clause learning,
+    VSIDS decisions, phase saving and Luby restarts.
+
+    Clauses use DIMACS literals (signed integers). Internally the variable
+    `v` has the literals `2 * (v - 1)` (positive) and `2 * (v - 1) + 1`
+    (negative), so the negation of a literal is `lit ^ 1`.
+    """
+
+    restart_base = 100
+
+    def __init__(self, clauses: list[list[int]] = (), variables: int = 0):
+        self.vars = 0
+        self.values: list[int] = []
+        self.level: list[int] = []
+        self.reason: list[list[int] | None] = []
+        self.activity: list[float] = []
+        self.phase: list[int] = []
+        self.watches: list[list[list[int]]] = []
+        self.order: list[tuple[float, int]] = []
+        self.trail: list[int] = []
+        self.trail_lim: list[int] = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.learnts: list[list[int]] = []
+        self.lbd: dict[int, int] = {}
+        self.max_learnts = 2000
+        self.ok = True
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.model: list[bool] = []
+
+        self.reserve(variables)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def reserve(self, variables: int):
+        """Makes sure variables 1..`variables` exist."""
+        while self.vars < variables:
+            var = self.vars
+            self.vars += 1
+            self.values.extend((UNDEF, UNDEF))
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(1)
+            self.watches.extend(([], []))
+            heappush(self.order, (0.0, var))
+
+    @staticmethod
+    def internal(lit: int) -> int:
+        return 2 * (abs(lit) - 1) + (lit < 0)
+
+    def add_clause(self, clause: list[int]) -> bool:
+        """Adds a clause at decision level 0, simplifying it by the current
+        top level assignment. Returns False if the formula became UNSAT."""
+        if not self.ok:
+            return False
+        self.reserve(max((abs(lit) for lit in clause), default=0))
+        self.backtrack(0)
+
+        lits: list[int] = []
+        present: set[int] = set()
+        for lit in map(self.internal, clause):
+            value = self.values[lit]
+            if value == 1 or lit ^ 1 in present:
+                return True
+            if value == UNDEF and lit not in present:
+                present.add(lit)
+                lits.append(lit)
+
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self.enqueue(lits[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watches[lits[0]].append(lits)
+            self.watches[lits[1]].append(lits)
+        return self.ok
+
+    def enqueue(self, lit: int, reason: list[int] | None):
+        values = self.values
+        values[lit] = 1
+        values[lit ^ 1] = 0
+        var = lit >> 1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self) -> list[int] | None:
+        """Unit propagation over the two watched literals. Returns the
+        conflicting clause, if any."""
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            watching = watches[false_lit]
+            kept = 0
+            i = 0
+            size = len(watching)
+
+            while i < size:
+                clause = watching[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if values[first] == 1:
+                    watching[kept] = clause
+                    kept += 1
+                    continue
+
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if values[lit] != 0:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    watching[kept] = clause
+                    kept += 1
+                    if values[first] == 0:
+                        while i < size:
+                            watching[kept] = watching[i]
+                            kept += 1
+                            i += 1
+                        del watching[kept:]
+                        self.qhead = len(trail)
+                        return clause
+                    self.enqueue(first, clause)
+
+            del watching[kept:]
+        return None
+
+    def bump(self, var: int):
+        activity = self.activity
+        activity[var] += self.var_inc
+        if activity[var] > 1e100:
+            for v in range(self.vars):
+                activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+            self.order = [(-activity[v], v) for v in range(self.vars)]
+            heapify(self.order)
+        elif self.values[2 * var] == UNDEF:
+            heappush(self.order, (-activity[var], var))
+
+    def analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        """First-UIP conflict analysis. Returns the learnt clause, with the
+        asserting literal first, and the level to backjump to."""
+        level = self.level
+        reason = self.reason
+        trail = self.trail
+        current = len(self.trail_lim)
+        seen: set[int] = set()
+        learnt = [0]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = conflict
+
+        while True:
+            for q in clause if lit is None else clause[1:]:
+                var = q >> 1
+                if var not in seen and level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if level[var] >= current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while trail[index] >> 1 not in seen:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            clause = reason[lit >> 1]
+            seen.discard(lit >> 1)
+            pending -= 1
+            if pending == 0:
+                break
+
+        learnt[0] = lit ^ 1
+        self.var_inc /= 0.95
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def backtrack(self, target: int):
+        if len(self.trail_lim) <= target:
+            return
+        values = self.values
+        activity = self.activity
+        start = self.trail_lim[target]
+        for lit in self.trail[start:]:
+            var = lit >> 1
+            values[lit] = UNDEF
+            values[lit ^ 1] = UNDEF
+            self.reason[var] = None
+            self.phase[var] = lit & 1
+            heappush(self.order, (-activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = start
+        if len(self.order) > 4 * self.vars + 1024:
+            self.order = [
+                (-activity[var], var)
+                for var in range(self.vars)
+                if values[2 * var] == UNDEF
+            ]
+            heapify(self.order)
+
+    def pick(self) -> int | None:
+        values = self.values
+        order = self.order
+        while order:
+            _, var = heappop(order)
+            if values[2 * var] == UNDEF:
+                return 2 * var + self.phase[var]
+        return None
+
+    def reduce(self):
+        """Drops half of the learnt clauses, keeping the ones with low literal
+        block distance and the ones that are reasons of the trail."""
+        locked = {id(self.reason[lit >> 1]) for lit in self.trail}
+        self.learnts.sort(key=lambda c: self.lbd[id(c)])
+        half = len(self.learnts) // 2
+        keep, drop = self.learnts[:half], []
+        for clause in self.learnts[half:]:
+            if self.lbd[id(clause)] <= 2 or id(clause) in locked:
+                keep.append(clause)
+            else:
+                drop.append(id(clause))
+        if drop:
+            dropped = set(drop)
+            for key in drop:
+                del self.lbd[key]
+            for watching in self.watches:
+                watching[:] = [c for c in watching if id(c) not in dropped]
+        self.learnts = keep
+        self.max_learnts = int(self.max_learnts * 1.1)
+
+    def solve(self, assumptions: list[int] = ()) -> bool:
+        """Checks satisfiability under the given assumption literals. On SAT
+        the assignment is left in `model`, indexed by variable."""
+        if not self.ok:
+            return False
+        self.reserve(max((abs(lit) for lit in assumptions), default=0))
+        assumptions = [self.internal(lit) for lit in assumptions]
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restarts = 0
+        budget = self.restart_base * luby(restarts)
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    budget -= 1
+                    if not self.trail_lim:
+                        self.ok = False
+                        return False
+                    learnt, target = self.analyze(conflict)
+                    self.backtrack(target)
+                    if len(learnt) == 1:
+                        self.enqueue(learnt[0], None)
+                    else:
+                        self.watches[learnt[0]].append(learnt)
+                        self.watches[learnt[1]].append(learnt)
+                        self.learnts.append(learnt)
+                        self.lbd[id(learnt)] = len({self.level[q >> 1] for q in learnt})
+                        self.enqueue(learnt[0], learnt)
+                    continue
+
+                if budget <= 0:
+                    restarts += 1
+                    budget = self.restart_base * luby(restarts)
+                    self.backtrack(0)
+                    continue
+                if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                    self.reduce()
+
+                lit = None
+                while len(self.trail_lim) < len(assumptions):
+                    assumed = assumptions[len(self.trail_lim)]
+                    if self.values[assumed] == 1:
+                        self.trail_lim.append(len(self.trail))
+                    elif self.values[assumed] == 0:
+                        return False
+                    else:
+                        lit = assumed
+                        break
+
+                if lit is None:
+                    lit = self.pick()
+                    if lit is None:
+                        self.model = [False] + [
+                            self.values[2 * var] == 1 for var in range(self.vars)
+                        ]
+                        return True
+                    self.decisions += 1
+
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(lit, None)
+        finally:
+            self.backtrack(0)
+
+
+def entails(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    stats: Stats | None = None,
+    budget: Budget | None = None,
+):
+    """Decides each query by refutation.
+
+    A query is derived if rules & facts & ~query is unsatisfiable and is a
+    contradiction if rules & facts & query is, which includes the case of an
+    inconsistent knowledge base. Otherwise it is inconclusive. All queries
+    are checked with assumptions on one solver, which keeps its learnt
+    clauses between them. The search always runs to completion; `budget`
+    only records how it ended.
+    """
+    cnf = CNF()
+    for rule in rules:
+        cnf.add(rule)
+    cnf.add_facts(symhash)
+    goals = [cnf.literal(query) for query in queries]
+
+    solver = SatSolver(cnf.clauses, cnf.variables)
+    results = []
+    for query, goal in zip(queries, goals):
+        if not solver.solve([goal]):
+            results.append((False, [Refutation(query)]))
+        elif not solver.solve([-goal]):
+            results.append((True, [Refutation(Not(query))]))
+        else:
+            results.append((None, []))
+        if stats is not None and results[-1][1]:
+            stats.step(results[-1][1][0])
+    if stats is not None:
+        stats.count("variables", cnf.variables)
+        stats.count("clauses", len(cnf.clauses))
+        stats.count("conflicts", solver.conflicts)
+        stats.count("decisions", solver.decisions)
+        stats.count("propagations", solver.propagations)
+    if budget is not None:
+        budget.complete(results)
+    return results
@@ -1,16 +1,349 @@
+from itertools import count
+from typing import Callable, Iterator
+from weakref import WeakValueDictionary
+
+# Profundidade máxima das sentenças compiladas, abaixo do limite de parênteses
+# aninhados do compilador do Python; sentenças mais profundas são interpretadas
+MAX_COMPILED_DEPTH = 64
+
+# Valores de um símbolo no modelo compacto, um byte por símbolo, e o valor
+# lógico de cada um
+FALSE, TRUE, UNKNOWN = 0, 1, 2
+VALUES = (False, True, None)
+
+
+def literal(variable: int, value: bool) -> int:
+    """Returns the signed literal of a variable: its id plus one, negative
+    when the value is false."""
+    return variable + 1 if value else -variable - 1
+
+
+def variable(literal: int) -> int:
+    return abs(literal) - 1
+
+
+class SparseModel(dict):
+    """Compact model whose ids are too spread out for a bytearray: the value
+    code of each symbol by `Symbol.id`, UNKNOWN for the ids not set."""
+
+    __slots__ = ()
+
+    def __missing__(self, index: int) -> int:
+        return UNKNOWN
+
+
+# Modelos compactos, indexados por Symbol.id e avaliados pelas sentenças
+# compiladas; os demais modelos são dicts por nome
+Model = bytearray | SparseModel
+COMPACT = (bytearray, SparseModel)
+
+# Um modelo compacto é um bytearray enquanto tiver até este número de posições
+# por símbolo; acima disso, por ids vindos de outros programas, é esparso
+DENSITY = 4
+
+
 class Sentence:
+    """Base class of the logical sentences.
+
+    Sentences are immutable and hash-consed: building a sentence returns the
+    already existing node when a structurally equal one is alive, so equality
+    and hashing are identity based and take O(1). Since nodes never change,
+    their size and depth are computed on creation and their symbols, formula
+    and compiled evaluation are cached on first use.
+
+    No operation recurses over the tree: traversals use explicit stacks, so
+    the depth of a sentence is limited only by memory.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "size",
+        "depth",
+        "_symbols",
+        "_variables",
+        "_formula",
+        "_compiled",
+        # Forma normal, preenchida por infero.normalize
+        "_normal",
+    )
+
+    _nodes: WeakValueDictionary = WeakValueDictionary()
+    # Slots que identificam o nó, na ordem dos argumentos de `intern`
+    fields: tuple[str, ...] = ()
+
+    # Valor inicial da avaliação, combinado com o valor de cada filho por `step`
+    initial: bool | int | None = None
+
+    def __new__(cls, *args):
+        raise TypeError("Sentence is abstract")
+
+    @classmethod
+    def intern(cls, *values):
+        """Returns the unique node of `cls` whose `fields` have the given
+        values."""
+        key = (cls, *values)
+        node = Sentence._nodes.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for name, value in zip(cls.fields, values):
+                object.__setattr__(node, name, value)
+            node.setup()
+            Sentence._nodes[key] = node
+        return node
+
+    def setup(self):
+        """Initializes the metadata of a newly created node."""
+        size, depth = 1, 0
+        for child in self.children():
+            size += child.size
+            if child.depth > depth:
+                depth = child.depth
+        object.__setattr__(self, "size", size)
+        object.__setattr__(self, "depth", depth + 1)
+        object.__setattr__(self, "_symbols", None)
+        object.__setattr__(self, "_variables", None)
+        object.__setattr__(self, "_formula", None)
+        object.__setattr__(self, "_compiled", None)
+        object.__setattr__(self, "_normal", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), self.args())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def args(self) -> tuple:
+        """Returns the arguments that rebuild the sentence."""
+        return ()
+
+    def children(self) -> tuple:
+        """Returns the subsentences of the logical sentence."""
+        return ()
+
+    def postorder(
+        self, expand: Callable[["Sentence"], bool] | None = None
+    ) -> Iterator["Sentence"]:
+        """Yields each distinct node of the sentence after its children.
+
+        Nodes for which `expand` is false are skipped along with their
+        subsentences.
+        """
+        visited = set()
+        stack: list[tuple[Sentence, bool]] = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                yield node
+            elif node not in visited and (expand is None or expand(node)):
+                visited.add(node)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children()))
+
+    def write(self, expand: Callable[["Sentence"], list]) -> str:
+        """Joins the text of the sentence, where `expand` returns the pieces
+        of a node: strings and the subsentences to be written in their place.
+        """
+        pieces: list[str] = []
+        stack: list = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                pieces.append(item)
+            else:
+                stack.extend(reversed(expand(item)))
+        return "".join(pieces)
 
     def evaluate(self, model) -> bool | None:
-        """Evaluates the logical sentence."""
+        """Evaluates the logical sentence.
+
+        `model` is either a dict by symbol name or a compact model indexed by
+        `Symbol.id`, as built by `model`; compact models go through the
+        compiled evaluation.
+        """
+        if isinstance(model, COMPACT):
+            return self.compile()(model)
+        return self.interpret(model)
+
+    def interpret(self, model) -> bool | None:
+        """Evaluates the logical sentence walking its tree.
+
+        Children are evaluated in order and each value is combined by `step`,
+        which also tells when the result is already known, so the remaining
+        children are skipped as in the short-circuit of Python.
+        """
+        # [nó, filhos ainda não avaliados, resultado parcial]
+        stack = [[self, iter(self.children()), self.initial]]
+        while True:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            if child is None:
+                value = frame[2]
+            elif not child.children():
+                frame[2], done = frame[0].step(frame[2], child.interpret(model))
+                if not done:
+                    continue
+                value = frame[2]
+            else:
+                stack.append([child, iter(child.children()), child.initial])
+                continue
+
+            stack.pop()
+            while stack:
+                parent = stack[-1]
+                parent[2], done = parent[0].step(parent[2], value)
+                if not done:
+                    break
+                value = parent[2]
+                stack.pop()
+            else:
+                return value
+
+    def step(self, result, value: bool | None) -> tuple:
+        """Combines the partial result with the value of the next child,
+        returning the new result and whether it is final."""
         raise Exception("nothing to evaluate")
 
-    def formula(self) -> str | None:
-        """Returns string formula representing logical sentence."""
-        return ""
+    def code(self, temps: Iterator[str]) -> list:
+        """Returns the pieces of a Python expression giving the value code
+        (FALSE, TRUE or UNKNOWN) of the sentence over a compact model `m`,
+        using names from `temps` for intermediate values."""
+        raise Exception("nothing to evaluate")
+
+    def compile(self) -> Callable[[Model], bool | None]:
+        """Returns a function evaluating the sentence over a compact model
+        indexed by `Symbol.id`.
+
+        The sentence is turned into a single Python expression over the value
+        codes, with the same tri-state semantics as `interpret`,
+        short-circuiting where it can.
+        Formulas too deep for the Python compiler fall back to `interpret`.
+        """
+        if self._compiled is None and self.depth > MAX_COMPILED_DEPTH:
+            object.__setattr__(self, "_compiled", self.interpret)
+        if self._compiled is None:
+            temps = (f"t{i}" for i in count())
+            try:
+                code = self.write(lambda node: node.code(temps))
+                source = f"def evaluate(m):\n    return VALUES[{code}]\n"
+                namespace: dict = {"VALUES": VALUES}
+                exec(compile(source, f"<{type(self).__name__}>", "exec"), namespace)
+                compiled = namespace["evaluate"]
+            except (RecursionError, SyntaxError, MemoryError):
+                compiled = self.interpret
+            object.__setattr__(self, "_compiled", compiled)
+        return self._compiled
 
-    def symbols(self) -> set:
+    @classmethod
+    def model(cls, symhash: dict[str, bool | None]) -> Model:
+        """Builds the compact model of a symhash: one value code per symbol,
+        indexed by `Symbol.id`.
+
+        Ids are global to the process, so the symbols of a program can have
+        ids far apart. The model is a bytearray up to the largest id of the
+        symhash while that takes at most `DENSITY` bytes per symbol, and a
+        `SparseModel` otherwise, so its size depends only on the program."""
+        ids = [Symbol(name).id for name in symhash]
+        size = max(ids, default=-1) + 1
+        if size <= DENSITY * len(ids) + 64:
+            values = bytearray([UNKNOWN]) * size
+        else:
+            values = SparseModel.fromkeys(ids, UNKNOWN)
+        for index, value in zip(ids, symhash.values()):
+            if value is not None:
+                values[index] = TRUE if value else FALSE
+        return values
+
+    @classmethod
+    def restore(cls, symhash: dict[str, bool | None], values: Model):
+        """Writes the values of a compact model back to a symhash."""
+        for name in symhash:
+            symhash[name] = VALUES[values[Symbol.table[name]]]
+
+    def render(self) -> list:
+        """Returns the pieces of the formula of the logical sentence."""
+        return []
+
+    def formula(self) -> str:
+        """Returns string formula representing logical sentence."""
+        if self._formula is None:
+            formula = self.write(
+                lambda node: node.render() if node._formula is None else [node._formula]
+            )
+            object.__setattr__(self, "_formula", formula)
+        return self._formula
+
+    def atomic(self) -> bool:
+        """Checks if the formula is empty or a single symbol."""
+        node = self
+        while isinstance(node, (And, Or)) and len(node.children()) == 1:
+            node = node.children()[0]
+        if isinstance(node, Symbol):
+            return node.name.isalpha()
+        return not node.children()
+
+    def parenthesized(self) -> str:
+        """Returns the formula parenthesized when it is not atomic."""
+        if self.atomic():
+            return self.formula()
+        return f"({self.formula()})"
+
+    def wrapped(self) -> list:
+        """Returns the pieces of the parenthesized formula."""
+        if isinstance(self, Symbol):
+            return [self.parenthesized()]
+        if self.atomic():
+            return [self]
+        return ["(", self, ")"]
+
+    def symbols(self) -> frozenset:
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        if self._symbols is None:
+            # Calcula de baixo para cima apenas os nós ainda sem cache
+            stack = [self]
+            while stack:
+                node = stack[-1]
+                missing = [c for c in node.children() if c._symbols is None]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                stack.pop()
+                sets = [child._symbols for child in node.children()]
+                symbols = sets[0] if len(sets) == 1 else frozenset().union(*sets)
+                object.__setattr__(node, "_symbols", symbols)
+        return self._symbols
+
+    def variables(self) -> frozenset:
+        """Returns the ids of the symbols in the logical sentence."""
+        if self._variables is None:
+            table = Symbol.table
+            variables = frozenset(table[name] for name in self.symbols())
+            object.__setattr__(self, "_variables", variables)
+        return self._variables
+
+    def show(self) -> list:
+        """Returns the pieces of the representation of the sentence."""
+        return []
+
+    @staticmethod
+    def joined(separator: str, groups) -> list:
+        """Joins groups of pieces with a separator."""
+        pieces: list = []
+        for group in groups:
+            pieces.append(separator)
+            pieces.extend(group)
+        return pieces[1:]
+
+    def __repr__(self):
+        return self.write(lambda node: node.show())
 
     @classmethod
     def validate(cls, sentence):
@@ -20,9 +353,9 @@ class Sentence:
     @classmethod
     def apply_demorgan(cls, sentence):
         if isinstance(sentence, And):
-            return Or(Not(sentence.conjuncts[0]), Not(sentence.conjuncts[1]))
+            return Or(*(Not(conjunct) for conjunct in sentence.conjuncts))
         elif isinstance(sentence, Or):
-            return And(Not(sentence.disjuncts[0]), Not(sentence.disjuncts[1]))
+            return And(*(Not(disjunct) for disjunct in sentence.disjuncts))
         elif isinstance(sentence, Implication):
             return And(sentence.antecedent, Not(sentence.consequent))
         else:
@@ -55,144 +388,210 @@ class Sentence:
 
 
 class Symbol(Sentence):
+    __slots__ = ("name", "id")
+    fields = ("name",)
+
+    # Ids densos e permanentes: o mesmo nome recebe o mesmo id mesmo depois
+    # que seu nó é coletado, e os nomes só voltam a ser usados para exibição
+    table: dict[str, int] = {}
+    names: list[str] = []
+
+    def __new__(cls, name):
+        return cls.intern(name)
 
-    def __init__(self, name):
-        self.name = name
+    def setup(self):
+        super().setup()
+        index = Symbol.table.setdefault(self.name, len(Symbol.names))
+        if index == len(Symbol.names):
+            Symbol.names.append(self.name)
+        object.__setattr__(self, "id", index)
+        object.__setattr__(self, "_symbols", frozenset((self.name,)))
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def args(self):
+        return (self.name,)
 
     def __repr__(self):
         return self.name
 
-    def evaluate(self, model):
+    def show(self):
+        return [self.name]
+
+    def interpret(self, model):
         try:
+            if isinstance(model, COMPACT):
+                return VALUES[model[self.id]]
             if model[self.name] is None:
                 return None
             return bool(model[self.name])
-        except KeyError:
+        except (KeyError, IndexError):
             raise Exception(f"variable {self.name} not in model")
 
-    def formula(self):
-        return self.name
+    def code(self, temps):
+        return [f"m[{self.id}]"]
 
-    def symbols(self):
-        return {self.name}
+    def render(self):
+        return [self.name]
 
+    def parenthesized(self):
+        return Sentence.parenthesize(self.name)
 
-class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+class Not(Sentence):
+    __slots__ = ("operand",)
+    fields = __slots__
 
-    def __repr__(self):
-        return f"Not({self.operand})"
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern(operand)
 
-    def evaluate(self, model):
-        if self.operand.evaluate(model) is None:
-            return None
-        return not self.operand.evaluate(model)
+    def args(self):
+        return (self.operand,)
 
-    def formula(self):
-        return "~" + Sentence.parenthesize(self.operand.formula())
+    def children(self):
+        return (self.operand,)
 
-    def symbols(self):
-        return self.operand.symbols()
+    def show(self):
+        return ["Not(", self.operand, ")"]
 
+    def step(self, result, value):
+        return (None if value is None else not value), True
 
-class And(Sentence):
-    def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+    def code(self, temps):
+        t = next(temps)
+        return [f"({t} if ({t} := ", self.operand, f") == {UNKNOWN} else 1 - {t})"]
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+    def render(self):
+        return ["~", *self.operand.wrapped()]
 
-    def __repr__(self):
-        conjunctions = ", ".join([str(conjunct) for conjunct in self.conjuncts])
-        return f"And({conjunctions})"
 
-    def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+class And(Sentence):
+    __slots__ = ("conjuncts",)
+    fields = __slots__
 
-    def evaluate(self, model):
-        if all(conjunct.evaluate(model) for conjunct in self.conjuncts):
-            return True
-        elif any(conjunct.evaluate(model) is False for conjunct in self.conjuncts):
-            return False
-        return None
+    initial = True
 
-    def formula(self):
+    def __new__(cls, *conjuncts):
+        for conjunct in conjuncts:
+            Sentence.validate(conjunct)
+        return cls.intern(conjuncts)
+
+    def args(self):
+        return self.conjuncts
+
+    def children(self):
+        return self.conjuncts
+
+    def show(self):
+        return [
+            "And(",
+            *Sentence.joined(", ", [[conjunct] for conjunct in self.conjuncts]),
+            ")",
+        ]
+
+    def step(self, result, value):
+        if value is False:
+            return False, True
+        return (None if value is None else result), False
+
+    def code(self, temps):
+        names = [next(temps) for _ in self.conjuncts]
+        pieces: list = ["("]
+        for t, conjunct in zip(names, self.conjuncts):
+            pieces.extend((f"{FALSE} if ({t} := ", conjunct, f") == {FALSE} else "))
+        unknown = " or ".join(f"{t} == {UNKNOWN}" for t in names) or "False"
+        pieces.append(f"{UNKNOWN} if ({unknown}) else {TRUE})")
+        return pieces
+
+    def render(self):
         if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " & ".join(
-            [Sentence.parenthesize(conjunct.formula()) for conjunct in self.conjuncts]
+            return [self.conjuncts[0]]
+        return Sentence.joined(
+            " & ", [conjunct.wrapped() for conjunct in self.conjuncts]
         )
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __repr__(self):
-        disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
-        return f"Or({disjuncts})"
+    __slots__ = ("disjuncts",)
+    fields = __slots__
 
-    def evaluate(self, model):
-        if any(disjunct.evaluate(model) for disjunct in self.disjuncts):
-            return True
-        elif any(disjunct.evaluate(model) is None for disjunct in self.disjuncts):
-            return None
-        return False
+    initial = False
 
-    def formula(self):
+    def __new__(cls, *disjuncts):
+        for disjunct in disjuncts:
+            Sentence.validate(disjunct)
+        return cls.intern(disjuncts)
+
+    def args(self):
+        return self.disjuncts
+
+    def children(self):
+        return self.disjuncts
+
+    def show(self):
+        return [
+            "Or(",
+            *Sentence.joined(", ", [[disjunct] for disjunct in self.disjuncts]),
+            ")",
+        ]
+
+    def step(self, result, value):
+        if value:
+            return True, True
+        return (None if value is None else result), False
+
+    def code(self, temps):
+        names = [next(temps) for _ in self.disjuncts]
+        pieces: list = ["("]
+        for t, disjunct in zip(names, self.disjuncts):
+            pieces.extend((f"{TRUE} if ({t} := ", disjunct, f") == {TRUE} else "))
+        unknown = " or ".join(f"{t} == {UNKNOWN}" for t in names) or "False"
+        pieces.append(f"{UNKNOWN} if ({unknown}) else {FALSE})")
+        return pieces
+
+    def render(self):
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " | ".join(
-            [Sentence.parenthesize(disjunct.formula()) for disjunct in self.disjuncts]
+            return [self.disjuncts[0]]
+        return Sentence.joined(
+            " | ", [disjunct.wrapped() for disjunct in self.disjuncts]
         )
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (
-            isinstance(other, Implication)
-            and self.antecedent == other.antecedent
-            and self.consequent == other.consequent
-        )
-
-    def __repr__(self):
-        return f"Implication({self.antecedent}, {self.consequent})"
+    __slots__ = ("antecedent", "consequent")
+    fields = __slots__
 
-    def evaluate(self, model):
-        return (not self.antecedent.evaluate(model)) or self.consequent.evaluate(model)
+    # Posição do filho avaliado em seguida
+    initial = 0
 
-    def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} -> {consequent}"
-
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def __new__(cls, antecedent, consequent):
+        Sentence.validate(antecedent)
+        Sentence.validate(consequent)
+        return cls.intern(antecedent, consequent)
+
+    def args(self):
+        return (self.antecedent, self.consequent)
+
+    def children(self):
+        return (self.antecedent, self.consequent)
+
+    def show(self):
+        return ["Implication(", self.antecedent, ", ", self.consequent, ")"]
+
+    def step(self, result, value):
+        # (not antecedent) or consequent
+        if result == 0:
+            return (True, True) if not value else (1, False)
+        return value, True
+
+    def code(self, temps):
+        # Como em `step`, um antecedente desconhecido torna a implicação verdadeira
+        return [
+            f"({TRUE} if ",
+            self.antecedent,
+            f" != {TRUE} else ",
+            self.consequent,
+            ")",
+        ]
+
+    def render(self):
+        return [*self.antecedent.wrapped(), " -> ", *self.consequent.wrapped()]
@@ -0,0 +1,373 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import stat
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from infero import cache
+from infero.knowledge import KnowledgeBase
+from infero.parser import Parser
+from infero.sentences import Sentence
+from infero.solver import ENGINES, RESULTS, solve
+
+# Tamanho máximo de uma linha de requisição, que pode trazer um programa inteiro
+MAX_LINE = 64 * 1024 * 1024
+
+
+def message(header: dict, payload: bytes = b"") -> bytes:
+    """Frames a message to or from a worker: a JSON header on one line,
+    followed by the payload in the binary form of the cache."""
+    return json.dumps(header).encode() + b"\n" + payload
+
+
+def unframe(data: bytes) -> tuple[dict, bytes]:
+    header, _, payload = data.partition(b"\n")
+    return json.loads(header), payload
+
+
+def encode(rules: list[Sentence], symhash: dict[str, bool | None]) -> bytes:
+    return cache.dump({"rules": rules, "facts": [], "query": []}, symhash)
+
+
+def work(connection):
+    """Main loop of a worker process. It keeps its own copy of the rules and
+    told facts of every knowledge base, kept in step by the messages of the
+    server, and answers the asks with them."""
+    bases: dict[str, tuple[int, list[Sentence], dict[str, bool | None]]] = {}
+    while True:
+        try:
+            header, payload = unframe(connection.recv_bytes())
+        except EOFError:
+            return
+        op, name = header["op"], header.get("kb")
+        if op == "close":
+            return
+        if op == "load":
+            program, symhash = cache.load(payload)
+            bases[name] = header["version"], program["rules"], symhash
+        elif op in ("tell", "retract"):
+            _, rules, symhash = bases[name]
+            symhash[header["symbol"]] = header["value"] if op == "tell" else None
+            bases[name] = header["version"], rules, symhash
+        elif op == "ask":
+            try:
+                version, rules, symhash = bases[name]
+                if version != header["version"]:
+                    raise RuntimeError(f"stale copy of knowledge base {name}")
+                query = cache.load(payload)[0]["query"][0]
+                scope = {**dict.fromkeys(query.symbols()), **symhash}
+                finded, path = solve(rules, query, scope, header["engine"])
+                response = {
+                    "query": query.formula(),
+                    "result": RESULTS[finded],
+                    "proof": [str(step) for step in path],
+                }
+            except Exception as error:
+                response = {"error": f"{type(error).__name__}: {error}"}
+            connection.send_bytes(message({"id": header["id"], **response}))
+
+
+class WorkerError(Exception):
+    """An error raised while a worker solved a query, already formatted."""
+
+
+class Worker:
+    """A worker process and the threads that talk to it. Messages are written
+    by a thread of its own, so sending a large base to a busy worker does not
+    hold the server, and answers are read by another."""
+
+    def __init__(self, context, messages: list[bytes]):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=work, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.running = True
+        self.pending: dict[int, Future] = {}
+        self.outbox: queue.SimpleQueue = queue.SimpleQueue()
+        for data in messages:
+            self.outbox.put(data)
+        threading.Thread(target=self.write, daemon=True).start()
+        threading.Thread(target=self.read, daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        return self.running and self.process.is_alive()
+
+    def write(self):
+        try:
+            while (data := self.outbox.get()) is not None:
+                self.connection.send_bytes(data)
+            # O worker sai ao ler o aviso, e o leitor vê o fim da conexão
+            self.connection.send_bytes(message({"op": "close"}))
+        except OSError:
+            pass
+
+    def read(self):
+        try:
+            while True:
+                header, _ = unframe(self.connection.recv_bytes())
+                future = self.pending.pop(header.pop("id"), None)
+                if future is None:
+                    continue
+                if "error" in header:
+                    future.set_exception(WorkerError(header["error"]))
+                else:
+                    future.set_result(header)
+        except (EOFError, OSError):
+            pass
+        self.connection.close()
+        self.running = False
+        for id in list(self.pending):
+            self.fail(id)
+
+    def fail(self, id: int):
+        # Quem tira o future do dicionário primeiro é quem o encerra
+        future = self.pending.pop(id, None)
+        if future is not None:
+            future.set_exception(RuntimeError("worker process exited"))
+
+    def send(self, data: bytes):
+        self.outbox.put(data)
+
+    def submit(self, id: int, data: bytes) -> Future:
+        future = Future()
+        self.pending[id] = future
+        self.send(data)
+        if not self.running:
+            self.fail(id)
+        return future
+
+    def close(self):
+        self.outbox.put(None)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class Server:
+    """Keeps knowledge bases parsed in memory and answers JSON requests.
+
+    Each request is a JSON object on one line with an `op`, the name of a
+    knowledge base in `kb` and an optional `id` that is copied to the
+    response:
+
+    - `load`: parses the program in `source`, or in the file `path`, into a
+      new knowledge base, answering the queries it declares.
+    - `tell` and `retract`: assert or withdraw the literal in `fact`.
+    - `ask`: decides `query`. By default it is evaluated over the facts kept
+      up to date by the knowledge base; with `engine` the chosen engine runs
+      on a worker process, over its copy of the rules and told facts.
+
+    Requests are applied one at a time by a thread of their own, off the
+    event loop, since parsing and sentences are not shared between threads.
+    Workers start on the first ask with an engine and receive every base
+    once; afterwards a load sends them the new base, tell and retract only
+    the literal and an ask only the query, each tagged with the version of
+    the base it applies to. Requests of one client are applied in order, but
+    the responses of asks sent to the workers come as they finish.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.bases: dict[str, KnowledgeBase] = {}
+        self.versions: dict[str, int] = {}
+        self.workers = workers
+        self.pool: list[Worker] = []
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="infero-kb")
+        self.ids = itertools.count()
+
+    def load(self, name: str, source: str) -> list[dict]:
+        kb = KnowledgeBase()
+        queries = kb.load(source)
+        self.bases[name] = kb
+        self.versions[name] = self.versions.get(name, 0) + 1
+        if self.pool:
+            self.broadcast(self.snapshot(name))
+        return [self.answer(query, *kb.ask(query)) for query in queries]
+
+    def snapshot(self, name: str) -> bytes:
+        kb = self.bases[name]
+        header = {"op": "load", "kb": name, "version": self.versions[name]}
+        return message(header, encode(kb.rules, kb.premises()))
+
+    def broadcast(self, data: bytes):
+        for worker in self.pool:
+            worker.send(data)
+
+    def start(self):
+        """Starts the missing workers, replacing the ones that exited, and
+        sends them every base."""
+        context = multiprocessing.get_context("spawn")
+        snapshots = [self.snapshot(name) for name in self.bases]
+        self.pool = [worker for worker in self.pool if worker.alive]
+        while len(self.pool) < (self.workers or os.cpu_count()):
+            self.pool.append(Worker(context, snapshots))
+
+    def base(self, request: dict) -> KnowledgeBase:
+        name = request.get("kb")
+        if name not in self.bases:
+            raise ValueError(f"unknown knowledge base: {name}")
+        return self.bases[name]
+
+    @staticmethod
+    def answer(query: Sentence, finded: bool | None, path: list) -> dict:
+        return {
+            "query": query.formula(),
+            "result": RESULTS[finded],
+            "proof": [str(step) for step in path],
+        }
+
+    def dispatch(self, request: dict):
+        """Applies a request, returning its response, or a future of it for
+        the asks sent to the workers."""
+        op = request.get("op")
+        if op == "load":
+            if "source" in request:
+                source = request["source"]
+            else:
+                source = Path(request["path"]).read_text()
+            return {"answers": self.load(request["kb"], source)}
+        if op in ("tell", "retract"):
+            kb = self.base(request)
+            fact = Parser.sentence(request["fact"])
+            getattr(kb, op)(fact)
+            name = request["kb"]
+            self.versions[name] += 1
+            if self.pool:
+                symbol, value = kb.literal(fact)
+                header = {"op": op, "kb": name, "version": self.versions[name]}
+                self.broadcast(message({**header, "symbol": symbol, "value": value}))
+            return {"consistent": kb.consistent}
+        if op == "ask":
+            kb = self.base(request)
+            query = Parser.sentence(request["query"])
+            engine = request.get("engine")
+            if engine is None:
+                return self.answer(query, *kb.ask(query))
+            if engine not in ENGINES:
+                raise ValueError(f"unknown engine: {engine}")
+            if not self.pool or not all(worker.alive for worker in self.pool):
+                self.start()
+            id = next(self.ids)
+            name = request["kb"]
+            header = {"op": "ask", "kb": name, "version": self.versions[name]}
+            payload = cache.dump(
+                {"rules": [], "facts": [], "query": [query]},
+                dict.fromkeys(query.symbols()),
+            )
+            worker = min(self.pool, key=lambda worker: len(worker.pending))
+            data = message({**header, "id": id, "engine": engine}, payload)
+            return worker.submit(id, data)
+        raise ValueError(f"unknown op: {op}")
+
+    @staticmethod
+    def reply(request, response: dict | None = None, error=None) -> str:
+        if error is None:
+            response = {"ok": True, **response}
+        elif isinstance(error, WorkerError):
+            response = {"ok": False, "error": str(error)}
+        else:
+            response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        if isinstance(request, dict) and "id" in request:
+            response = {"id": request["id"], **response}
+        return json.dumps(response, ensure_ascii=False)
+
+    async def handle(self, line: bytes):
+        """Applies a request line, returning the response or, for the asks
+        sent to the workers, a coroutine that gives it."""
+        loop = asyncio.get_running_loop()
+        request = None
+        try:
+            request = await loop.run_in_executor(self.executor, json.loads, line)
+            response = await loop.run_in_executor(self.executor, self.dispatch, request)
+        except Exception as error:
+            return self.reply(request, error=error)
+        if isinstance(response, Future):
+            return self.later(request, asyncio.wrap_future(response))
+        return self.reply(request, response)
+
+    async def later(self, request: dict, work) -> str:
+        try:
+            return self.reply(request, await work)
+        except Exception as error:
+            return self.reply(request, error=error)
+
+    async def session(self, lines, send):
+        """Answers the requests of one client, one per line."""
+        tasks: set[asyncio.Task] = set()
+
+        async def deliver(work):
+            await send(await work)
+
+        async for line in lines:
+            if not line.strip():
+                continue
+            response = await self.handle(line)
+            if isinstance(response, str):
+                await send(response)
+                continue
+            task = asyncio.create_task(deliver(response))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def send(text: str):
+            writer.write(text.encode() + b"\n")
+            await writer.drain()
+
+        try:
+            await self.session(reader, send)
+        finally:
+            writer.close()
+
+    async def serve_unix(self, path: Path):
+        if path.exists() and stat.S_ISSOCK(path.stat().st_mode):
+            path.unlink()
+        server = await asyncio.start_unix_server(
+            self.client, path=str(path), limit=MAX_LINE
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def serve_stdio(self):
+        async def lines():
+            while line := await asyncio.to_thread(sys.stdin.buffer.readline):
+                yield line
+
+        async def send(text: str):
+            sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+
+        await self.session(lines(), send)
+
+    def close(self):
+        for worker in self.pool:
+            worker.close()
+        self.executor.shutdown()
+
+
+def serve(
+    files: list[Path] = (), socket: Path | None = None, workers: int | None = None
+):
+    """Loads the given programs, named after their files, and serves requests
+    on a Unix socket or, without one, on stdin and stdout."""
+    server = Server(workers)
+    for file in files:
+        server.load(Path(file).stem, Path(file).read_text())
+    try:
+        if socket is None:
+            asyncio.run(server.serve_stdio())
+        else:
+            asyncio.run(server.serve_unix(Path(socket)))
+    finally:
+        server.close()
@@ -1,115 +1,354 @@
-from infero.inference_rules import (
-    DisjunctiveSyllogism,
-    HipoteticalSyllogism,
-    ModusPonens,
-    ModusTollens,
+from infero import truth_table
+from infero.agenda import Agenda
+from infero.budget import DECIDED, FIXPOINT, INCONSISTENT, TIMEOUT, Budget
+from infero.horn import forward_chain
+from infero.implication_graph import ImplicationGraph
+from infero.justification import (
+    DISJUNCTIVE,
+    DISJUNCTIVE_LEFT,
+    DISJUNCTIVE_RIGHT,
+    HIPOTETICAL,
+    MODUS_PONENS,
+    MODUS_TOLLENS,
+    Justifications,
 )
-from infero.sentences import And, Implication, Not, Or, Sentence, Symbol
+from infero.normalize import normalize, normalize_rules
+from infero.relevance import relevant
+from infero.sat import entails
+from infero.sentences import (
+    FALSE,
+    TRUE,
+    UNKNOWN,
+    And,
+    Implication,
+    Model,
+    Not,
+    Or,
+    Sentence,
+    Symbol,
+)
+from infero.stats import Stats
 
+# Nome de cada resultado nas saídas em JSON
+RESULTS = {True: "derived", False: "contradiction", None: "inconclusive"}
 
-def solve(rules: list[Sentence], query: Sentence, symhash: dict[str, bool | None]):
 
-    finded: bool | None = None
-    path: list = []
-    iterations: int = 0
+def solve(
+    rules: list[Sentence],
+    query: Sentence,
+    symhash: dict[str, bool | None],
+    engine: str = "rules",
+    stats: Stats | None = None,
+    prune: bool | None = None,
+    budget: Budget | None = None,
+):
+    """Decides the query with the chosen engine.
 
-    def calc_score(sentence):
-        symbols = sentence.symbols()
-        facts = sum(symhash[symbol] is not None for symbol in symbols)
-        derive = isinstance(sentence, Implication) and sentence.consequent == query
-        return len(symbols) - facts - 0.5 * derive
-
-    score_list = list(
-        sorted(
-            [(sentence, calc_score(sentence)) for sentence in rules], key=lambda x: x[1]
-        )
-    )
+    Returns True if the query is derived, False if it is contradicted and None
+    if inconclusive, along with the proof steps.
+    """
+    return solve_all(rules, [query], symhash, engine, stats, prune, budget)[0]
+
+
+def solve_all(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    engine: str = "rules",
+    stats: Stats | None = None,
+    prune: bool | None = None,
+    budget: Budget | None = None,
+) -> list[tuple[bool | None, list]]:
+    """Decides many queries from a single run of the chosen engine.
 
-    def process_sentence(sentence):
+    Returns one (result, proof steps) pair per query, in order. If `stats` is
+    given, the engine fills its counters and reports each step to its tracer.
+    With `prune`, the engine only sees the rules and symbols in the cone of
+    influence of the queries, so a contradiction among unrelated rules does
+    not decide them. By default only the rules engine prunes: sat and table
+    decide entailment by the whole base, where an inconsistent base entails
+    every query, and pruning them changes that answer. `budget` bounds the
+    steps and time of the rules engine and tells how the run ended; it is
+    started here, so its deadline also covers normalization and pruning.
+
+    Rules and queries are normalized first, so the engines see flat n-ary
+    conjunctions and disjunctions without duplicated or complementary
+    operands, and rules that always hold are dropped.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine}")
+    # O prazo vale para a execução inteira, passadas prévias incluídas
+    budget = Budget() if budget is None else budget
+    budget.start()
+    size = sum(rule.size for rule in rules)
+    rules = normalize_rules(rules, budget)
+    queries = [normalize(query) for query in queries]
+    if stats is not None:
+        stats.count("simplified", size - sum(rule.size for rule in rules))
+    scope = symhash
+    if prune is None:
+        prune = engine == "rules"
+    if prune:
+        kept, scope = relevant(rules, queries, symhash, budget)
+        if stats is not None:
+            stats.count("pruned", len(rules) - len(kept))
+        rules = kept
+    if budget.status == TIMEOUT:
+        if stats is not None:
+            stats.status = budget.status
+        return [(None, []) for _ in queries]
+    if stats is None:
+        results = ENGINES[engine](rules, queries, scope, budget=budget)
+    else:
+        with stats.phase("solve"):
+            results = ENGINES[engine](rules, queries, scope, stats, budget)
+        stats.status = budget.status
+    # Valores derivados pelo motor voltam à tabela de símbolos completa
+    symhash.update(scope)
+    return results
+
+
+def assume(rules: list[Sentence], values: Model) -> list[Sentence]:
+    """Writes to the compact model the literals asserted by the rules that
+    are not implications or disjunctions, returning the other rules and the
+    implications and disjunctions found inside the asserted ones."""
+    kept = [rule for rule in rules if isinstance(rule, (Implication, Or))]
+    stack = [
+        rule for rule in reversed(rules) if not isinstance(rule, (Implication, Or))
+    ]
+    while stack:
+        sentence = stack.pop()
         if isinstance(sentence, Symbol):
-            symhash[sentence.name] = True
+            values[sentence.id] = TRUE
         elif isinstance(sentence, Not):
             if isinstance(sentence.operand, Not):
-                process_sentence(sentence.operand.operand)
-            elif len(sentence.symbols()) == 1:
-                symhash[sentence.operand.name] = False
+                stack.append(sentence.operand.operand)
+            elif isinstance(sentence.operand, Symbol):
+                values[sentence.operand.id] = FALSE
             else:
-                process_sentence(Sentence.apply_demorgan(sentence.operand))
+                stack.append(Sentence.apply_demorgan(sentence.operand))
         elif isinstance(sentence, And):
-            process_sentence(sentence.conjuncts[0])
-            process_sentence(sentence.conjuncts[1])
+            stack.extend(reversed(sentence.conjuncts))
         else:
-            # Implication or Or
-            score_list.append((sentence, 0))
+            kept.append(sentence)
+    return kept
 
-    def update_scores():
-        return list(
-            sorted(
-                [(sentence, calc_score(sentence)) for sentence, _ in score_list],
-                key=lambda x: x[1],
-            )
+
+def infer(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    stats: Stats | None = None,
+    budget: Budget | None = None,
+) -> list[tuple[bool | None, list]]:
+    """Applies inference rules to the rules and facts until every query is
+    decided, nothing new can be derived or the budget runs out.
+
+    All queries share one derivation, kept as a log of justifications. The
+    proof of each query is built from the log on demand, with only the steps
+    that its symbols depend on. Undecided queries get the steps derived so
+    far about their symbols.
+
+    If the Horn rules contradict a known fact, the run stops there with
+    status INCONSISTENT, since nothing derived after it could be trusted.
+
+    The run works on the compact model of `symhash`, indexed by symbol id,
+    and writes the values derived back to it at the end. `budget` is expected
+    to be started, as `solve_all` does.
+    """
+
+    budget = Budget() if budget is None else budget
+    iterations: int = 0
+    log = Justifications()
+    decided: dict[Sentence, tuple[bool, int]] = {}
+
+    # Modelo indexado por Symbol.id, avaliado pelas sentenças compiladas
+    values = Sentence.model(symhash)
+
+    # Regras que a normalização reduziu a literais ou conjunções, como
+    # (a | ~a) -> b, que vira b, valem como fatos desde o início
+    rules = assume(rules, values)
+
+    # Regras de Horn são saturadas primeiro por encadeamento para frente
+    premises = rules
+    rules, chained, conflict = forward_chain(rules, queries, values, log, stats, budget)
+    for query, steps in chained.items():
+        decided[query] = (query.evaluate(values), steps)
+    # Uma regra de Horn contradisse um fato: a derivação pára nesse passo
+    if conflict is not None:
+        budget.status = INCONSISTENT
+        rules = []
+
+    pending = [query for query in dict.fromkeys(queries) if query not in decided]
+    goals = set(queries)
+
+    def calc_score(sentence):
+        variables = sentence.variables()
+        facts = sum(values[index] != UNKNOWN for index in variables)
+        derive = isinstance(sentence, Implication) and sentence.consequent in goals
+        return len(variables) - facts - 0.5 * derive
+
+    agenda = Agenda(calc_score)
+    given = set(rules)
+    for i, sentence in enumerate(rules):
+        if budget.expired(i):
+            break
+        agenda.push(sentence)
+
+    # Símbolos que receberam valor desde a última atualização da agenda
+    changed: list[int] = []
+
+    def known(sentence):
+        # Regra dada, na agenda ou já derivada: o log reaproveita o seu id
+        return (
+            sentence in given or sentence in agenda or log.origin(sentence) is not None
         )
 
-    while score_list and iterations < 100:
+    def process_sentence(sentence, step):
+        stack = [sentence]
+        while stack:
+            sentence = stack.pop()
+            if isinstance(sentence, Symbol):
+                values[sentence.id] = TRUE
+                changed.append(sentence.id)
+                log.assign(sentence.id, step)
+            elif isinstance(sentence, Not):
+                if isinstance(sentence.operand, Not):
+                    stack.append(sentence.operand.operand)
+                elif isinstance(sentence.operand, Symbol):
+                    values[sentence.operand.id] = FALSE
+                    changed.append(sentence.operand.id)
+                    log.assign(sentence.operand.id, step)
+                else:
+                    stack.append(Sentence.apply_demorgan(sentence.operand))
+            elif isinstance(sentence, And):
+                stack.extend(reversed(sentence.conjuncts))
+            elif not known(sentence):
+                # Implication or Or
+                log.derive(sentence, step)
+                agenda.push(sentence)
+
+    def record(kind, rule, other=None):
+        conclusion = log.conclude(kind, rule, other)
+        if isinstance(conclusion, (Implication, Or)) and known(conclusion):
+            return
+        step = log.record(kind, rule, other)
+        if stats is not None:
+            stats.step(log.step(step))
+        process_sentence(log.conclusion(step), step)
+        update_scores()
+
+    def update_scores():
+        touched = agenda.rescore(changed)
+        if stats is not None:
+            stats.count("rescores")
+            stats.count("rescored", touched)
+        changed.clear()
+
+    def negated(sentence):
+        value = sentence.evaluate(values)
+        return None if value is None else not value
+
+    while pending and agenda:
+        # Uma passada inteira pela agenda sem nada novo é um ponto fixo
+        if agenda.settled():
+            break
+        if not budget.spend():
+            break
         iterations += 1
-        s, score = score_list.pop(0)
+        progress = len(log.reasons) + len(log.origins)
+        s, score = agenda.pop()
         # Se implicação, uso modus ponens e tollens
         if isinstance(s, Implication):
-            mp = ModusPonens(s)
-            if mp.evaluate(symhash):
-                path.append(mp)
-                process_sentence(mp.conclusion)
-                score_list = update_scores()
-            mt = ModusTollens(s)
-            if mt.evaluate(symhash):
-                path.append(mt)
-                process_sentence(mt.conclusion)
-                score_list = update_scores()
+            if s.antecedent.evaluate(values):
+                record(MODUS_PONENS, s)
+            if negated(s.consequent):
+                record(MODUS_TOLLENS, s)
 
             # Se nao for possivel avaliar ainda,
             # tento aplicar Silogismo Hipotético
-            if mp.evaluate(symhash) is None and mt.evaluate(symhash) is None:
-                # Silogismo Hipotetico
-                for t, _ in score_list:
-                    if isinstance(t, Implication):
-                        if t.antecedent == s.consequent:
-                            hs = HipoteticalSyllogism(s, t)
-                            path.append(hs)
-                            process_sentence(hs.apply())
-                            score_list = update_scores()
-                            break
+            if s.antecedent.evaluate(values) is None and negated(s.consequent) is None:
+                # Silogismo Hipotetico, com um elo que leve a uma implicação
+                # nova; num ciclo de implicações os elos acabam
+                t = agenda.chain(
+                    s.consequent,
+                    lambda t: not known(Implication(s.antecedent, t.consequent)),
+                )
+                if t is not None:
+                    record(HIPOTETICAL, s, t)
                 # se nao funcionar, volto a lista de regras
                 else:
-                    if not score_list:
+                    if not agenda:
                         break
-                    score_list.append((s, score))
+                    agenda.defer(s)
+
+        # Se disjunção de mais de dois termos, elimino um termo falso e a
+        # disjunção dos demais volta à lista de regras; com um termo
+        # verdadeiro a regra já está satisfeita
+        elif isinstance(s, Or) and len(s.disjuncts) > 2:
+            negations = [negated(disjunct) for disjunct in s.disjuncts]
+            if True in negations and False not in negations:
+                record(DISJUNCTIVE, s, s.disjuncts[negations.index(True)])
+            elif all(negation is None for negation in negations):
+                agenda.defer(s)
 
         # Se disjunção, aplico silogismo a esquerda e a direita
         elif isinstance(s, Or):
-            ls = DisjunctiveSyllogism(s)
-            if ls.evaluate(symhash):
-                path.append(ls)
-                process_sentence(ls.conclusion)
-                score_list = update_scores()
-
-            rs = DisjunctiveSyllogism(s, right=True)
-            if rs.evaluate(symhash):
-                path.append(rs)
-                process_sentence(rs.conclusion)
-                score_list = update_scores()
+            left, right = s.disjuncts
+            if negated(left):
+                record(DISJUNCTIVE_LEFT, s)
+            if negated(right):
+                record(DISJUNCTIVE_RIGHT, s)
 
             # Se nao for possivel avaliar ainda, retorno regra a lista de regras
-            if ls.evaluate(symhash) is None and rs.evaluate(symhash) is None:
-                score_list.append((s, score))
+            if negated(left) is None and negated(right) is None:
+                agenda.defer(s)
         else:
-            break
+            raise TypeError(f"unsupported rule: {s.formula()}")
+
+        if len(log.reasons) + len(log.origins) > progress:
+            agenda.progress()
+
+        for query in pending:
+            querying = query.evaluate(values)
+            if querying is not None:
+                decided[query] = (querying, len(log))
+        pending = [query for query in pending if query not in decided]
+
+    # O que a agenda não decidiu ainda pode ser decidido pelas regras binárias
+    # no grafo de implicações, como em 2-SAT, se ainda houver orçamento
+    if pending and budget.status is None:
+        graph = ImplicationGraph(premises, values)
+        for query in pending:
+            finded, steps = graph.decide(query)
+            if finded is not None:
+                for step in steps:
+                    record(*step)
+                decided[query] = (finded, len(log))
+        pending = [query for query in pending if query not in decided]
+    Sentence.restore(symhash, values)
+
+    if conflict is not None:
+        budget.status = INCONSISTENT
+    elif not pending:
+        budget.status = DECIDED
+    elif budget.status is None:
+        budget.status = FIXPOINT
+    if stats is not None:
+        stats.count("iterations", iterations)
+
+    results = []
+    for query in queries:
+        if query in decided:
+            finded, end = decided[query]
+            results.append((finded, log.proof(query, end)))
+        else:
+            results.append((None, log.proof(query)))
+    return results
 
-        querying = query.evaluate(symhash)
-        if querying is True:
-            finded = True
-            break
-        elif querying is False:
-            finded = False
-            break
 
-    return finded, path
+ENGINES = {
+    "rules": infer,
+    "sat": entails,
+    "table": truth_table.entails,
+}
@@ -0,0 +1,55 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+from infero.sentences import Sentence
+
+
+@dataclass
+class Stats:
+    """Timings and counters of a run, filled by the phases that receive it.
+
+    `tracer`, if given, is called with every proof step as soon as the solver
+    applies it.
+    """
+
+    tracer: Callable[[object], None] | None = None
+    phases: dict[str, float] = field(default_factory=dict)
+    counters: Counter = field(default_factory=Counter)
+    firings: Counter = field(default_factory=Counter)
+    status: str | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Adds the wall time of the block to the phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def step(self, step):
+        """Records a proof step applied by the solver."""
+        self.firings[type(step).__name__] += 1
+        if self.tracer is not None:
+            self.tracer(step)
+
+    def program(self, program: dict[str, list[Sentence]]):
+        """Records the size and depth of the sentences of a program."""
+        sentences = [s for section in program.values() for s in section]
+        self.counters["nodes"] = sum(sentence.size for sentence in sentences)
+        self.counters["depth"] = max((s.depth for s in sentences), default=0)
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "firings": dict(self.firings),
+            "status": self.status,
+        }
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 TOKENS = [
     ("RULES_SECTION", r"rules:"),  # Identifica o início da seção de regras
@@ -21,6 +21,8 @@ TOKENS = [
 class Token:
     value: str
     tag: str
+    line: int = field(default=0, compare=False)
+    column: int = field(default=0, compare=False)
 
     def __repr__(self):
         return f"<{self.value}, {self.tag}>"
@@ -0,0 +1,186 @@
+from infero.budget import Budget
+from infero.inference_rules import ModelCheck
+from infero.sentences import And, Implication, Not, Or, Sentence, Symbol
+from infero.stats import Stats
+
+MAX_SYMBOLS = 25
+WORD = 64
+
+# numpy é opcional, usado apenas por este motor, e importado só quando ele é
+# usado, pois sua importação sozinha custa mais que resolver um programa pequeno
+np = None
+
+
+def load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("the truth table engine requires numpy") from None
+
+
+class TruthTable:
+    """Truth table over the given symbols, packed one bit per model.
+
+    Model `r` assigns True to the i-th symbol iff bit `i` of `r` is set. Each
+    symbol is a column of 2**n bits stored in uint64 words, and sentences are
+    evaluated with whole-array bitwise operations, 64 models per word.
+    """
+
+    # Padrões das colunas dos 6 primeiros símbolos dentro de uma palavra
+    PATTERNS = [
+        0xAAAAAAAAAAAAAAAA,
+        0xCCCCCCCCCCCCCCCC,
+        0xF0F0F0F0F0F0F0F0,
+        0xFF00FF00FF00FF00,
+        0xFFFF0000FFFF0000,
+        0xFFFFFFFF00000000,
+    ]
+
+    def __init__(self, symbols: list[str], constants: dict | None = None):
+        load_numpy()
+        if len(symbols) > MAX_SYMBOLS:
+            raise ValueError(
+                f"too many unknown symbols for a truth table: {len(symbols)}"
+                f" (max {MAX_SYMBOLS})"
+            )
+        self.symbols = list(symbols)
+        self.constants = constants or {}
+        self.rows = 1 << len(self.symbols)
+        self.words = max(1, self.rows // WORD)
+        self.ones = np.full(self.words, np.uint64(2**64 - 1))
+        if self.rows < WORD:
+            self.ones[0] = np.uint64((1 << self.rows) - 1)
+        self.zeros = np.zeros(self.words, dtype=np.uint64)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+        self.columns: dict[str, "np.ndarray"] = {}
+
+    def column(self, name: str) -> "np.ndarray":
+        if name in self.constants:
+            return self.ones if self.constants[name] else self.zeros
+        if name not in self.columns:
+            i = self.index[name]
+            if i < 6:
+                column = np.full(self.words, np.uint64(self.PATTERNS[i]))
+                column &= self.ones
+            else:
+                blocks = np.arange(self.words, dtype=np.uint64) >> np.uint64(i - 6)
+                column = (blocks & np.uint64(1)) * np.uint64(2**64 - 1)
+            self.columns[name] = column
+        return self.columns[name]
+
+    def evaluate(self, sentence: Sentence) -> "np.ndarray":
+        """Returns the packed set of models in which the sentence holds."""
+        values: dict[Sentence, np.ndarray] = {}
+        stack: list[tuple[Sentence, bool]] = [(sentence, False)]
+
+        while stack:
+            node, expanded = stack.pop()
+            if node in values:
+                continue
+            if isinstance(node, Symbol):
+                values[node] = self.column(node.name)
+                continue
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children())
+                continue
+
+            operands = [values[child] for child in node.children()]
+            if isinstance(node, Not):
+                values[node] = ~operands[0] & self.ones
+            elif isinstance(node, And):
+                result = self.ones.copy()
+                for operand in operands:
+                    result &= operand
+                values[node] = result
+            elif isinstance(node, Or):
+                result = self.zeros.copy()
+                for operand in operands:
+                    result |= operand
+                values[node] = result
+            elif isinstance(node, Implication):
+                antecedent, consequent = operands
+                values[node] = (~antecedent | consequent) & self.ones
+            else:
+                raise TypeError("must be a logical sentence")
+
+        return values[sentence]
+
+    def count(self, models: "np.ndarray") -> int:
+        return int(np.unpackbits(models.view(np.uint8)).sum())
+
+    def models(self, models: "np.ndarray", limit: int | None = None):
+        """Yields the models of a packed set as dicts, up to `limit`."""
+        found = 0
+        for word in np.flatnonzero(models):
+            bits = int(models[word])
+            while bits:
+                if limit is not None and found >= limit:
+                    return
+                low = bits & -bits
+                row = int(word) * WORD + low.bit_length() - 1
+                bits ^= low
+                found += 1
+                yield {name: bool(row >> i & 1) for i, name in enumerate(self.symbols)}
+
+
+def check(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    limit: int = 10,
+) -> list[tuple[bool | None, int, list[dict[str, bool]]]]:
+    """Checks each query in every model of the unknown symbols.
+
+    For each query, returns whether it is derived, contradicted (which
+    includes an inconsistent knowledge base) or inconclusive, the number of
+    models of the rules and facts, and up to `limit` of those models in which
+    the query is false. The rules are evaluated only once for all queries.
+    """
+    unknown = [name for name, value in symhash.items() if value is None]
+    constants = {name: value for name, value in symhash.items() if value is not None}
+    table = TruthTable(unknown, constants)
+
+    knowledge = table.ones.copy()
+    for rule in rules:
+        knowledge &= table.evaluate(rule)
+    count = table.count(knowledge)
+
+    results = []
+    for query in queries:
+        holds = table.evaluate(query)
+        refuting = knowledge & ~holds
+        counterexamples = list(table.models(refuting, limit))
+        if not knowledge.any() or not (knowledge & holds).any():
+            finded = False
+        elif not refuting.any():
+            finded = True
+        else:
+            finded = None
+        results.append((finded, count, counterexamples))
+    return results
+
+
+def entails(
+    rules: list[Sentence],
+    queries: list[Sentence],
+    symhash: dict[str, bool | None],
+    stats: Stats | None = None,
+    budget: Budget | None = None,
+):
+    """Truth table engine, with the same result form as `solve_all`."""
+    results = []
+    for query, (finded, count, counterexamples) in zip(
+        queries, check(rules, queries, symhash)
+    ):
+        step = ModelCheck(query, count, counterexamples)
+        if stats is not None:
+            stats.step(step)
+        results.append((finded, [step]))
+    if stats is not None:
+        stats.count("symbols", sum(value is None for value in symhash.values()))
+    if budget is not None:
+        budget.complete(results)
+    return results
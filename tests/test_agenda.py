@@ -0,0 +1,96 @@
+from infero.agenda import Agenda
+from infero.parser import Parser
+from infero.sentences import Sentence
+
+a, b, c = (Parser.sentence(name) for name in "abc")
+
+
+def size(sentence: Sentence) -> float:
+    return len(sentence.variables())
+
+
+def test_pops_by_score_then_insertion_order():
+    agenda = Agenda(size)
+    rules = [Parser.sentence(text) for text in ("a | b | c", "a -> b", "b | c")]
+    for rule in rules:
+        agenda.push(rule)
+    assert [agenda.pop()[0] for _ in rules] == [rules[1], rules[2], rules[0]]
+    assert not agenda
+
+
+def test_deferred_rule_goes_behind_pending_entries():
+    agenda = Agenda(size)
+    low, high = Parser.sentence("a -> b"), Parser.sentence("a | b | c")
+    agenda.push(low)
+    agenda.push(high)
+    sentence, _ = agenda.pop()
+    assert sentence is low
+    agenda.defer(low)
+    assert agenda.pop()[0] is high
+    assert agenda.pop()[0] is low
+
+
+def test_rescore_brings_deferred_rule_back_to_current_round():
+    known: set[int] = set()
+
+    def unknown(sentence: Sentence) -> float:
+        return len(sentence.variables() - known)
+
+    agenda = Agenda(unknown)
+    first, second = Parser.sentence("a -> b"), Parser.sentence("b | c")
+    agenda.push(first)
+    agenda.push(second)
+    assert agenda.pop()[0] is first
+    agenda.defer(first)
+    known.add(a.id)
+    assert agenda.rescore([a.id]) == 1
+    assert agenda.pop()[0] is first
+    assert agenda.pop()[0] is second
+
+
+def test_chain_finds_implication_by_antecedent():
+    agenda = Agenda(size)
+    rule = Parser.sentence("b -> c")
+    agenda.push(rule)
+    assert agenda.chain(b) is rule
+    assert agenda.chain(a) is None
+    agenda.pop()
+    assert agenda.chain(b) is None
+
+
+def test_settled_after_a_full_pass_without_progress():
+    agenda = Agenda(size)
+    rules = [Parser.sentence(text) for text in ("a -> b", "b | c", "a | b | c")]
+    for rule in rules:
+        agenda.push(rule)
+    agenda.defer(agenda.pop()[0])
+    agenda.progress()
+    for _ in rules:
+        assert not agenda.settled()
+        agenda.defer(agenda.pop()[0])
+    assert agenda.settled()
+    agenda.push(Parser.sentence("c -> a"))
+    assert not agenda.settled()
+
+
+def test_sentence_is_queued_once():
+    agenda = Agenda(size)
+    rule = Parser.sentence("a -> b")
+    entry = agenda.push(rule)
+    agenda.progress()
+    assert agenda.push(rule) is entry
+    assert len(agenda) == 1 and rule in agenda
+    agenda.defer(agenda.pop()[0])
+    assert agenda.settled()
+    agenda.pop()
+    assert rule not in agenda
+
+
+def test_chain_skips_rejected_links():
+    agenda = Agenda(size)
+    first, second = Parser.sentence("b -> c"), Parser.sentence("b -> a | c")
+    agenda.push(first)
+    agenda.push(second)
+    assert agenda.chain(b) is first
+    assert agenda.chain(b, lambda rule: rule is not first) is second
+    assert agenda.chain(b, lambda rule: False) is None
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from infero import batch
+
+PROGRAM = """
+rules:
+  a -> b
+end
+
+facts:
+  a
+end
+
+query:
+  b
+end
+"""
+
+
+def compile_or_fail(file: str, engine: str = "rules") -> dict:
+    # Substitui compile_file nos workers, herdado pelo fork
+    if file.endswith("crash.ifo"):
+        os._exit(3)
+    if file.endswith("slow.ifo"):
+        time.sleep(60)
+    return COMPILE(file, engine)
+
+
+COMPILE = batch.compile_file
+
+
+@pytest.fixture
+def files(tmp_path):
+    names = ["a.ifo", "crash.ifo", "b.ifo", "slow.ifo", "c.ifo"]
+    for name in names:
+        (tmp_path / name).write_text(PROGRAM)
+    return [str(tmp_path / name) for name in names]
+
+
+def test_reports_every_file(files):
+    reports = list(batch.run(files, jobs=2))
+    assert sorted(report["file"] for report in reports) == sorted(files)
+    assert all(report["status"] == "ok" for report in reports)
+    assert reports[0]["queries"] == [{"query": "b", "result": "derived", "proof": 1}]
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="workers must be forked"
+)
+def test_dead_and_stuck_workers_are_replaced(files, monkeypatch):
+    monkeypatch.setattr(batch, "compile_file", compile_or_fail)
+    start = time.perf_counter()
+    reports = {
+        os.path.basename(report["file"]): report
+        for report in batch.run(files, jobs=2, timeout=1)
+    }
+    assert time.perf_counter() - start < 30
+    assert reports["crash.ifo"]["status"] == "error"
+    assert "code 3" in reports["crash.ifo"]["error"]
+    assert reports["slow.ifo"]["status"] == "timeout"
+    for name in ("a.ifo", "b.ifo", "c.ifo"):
+        assert reports[name]["status"] == "ok"
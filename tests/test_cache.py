@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from infero import cache
+from infero.parser import Parser
+from infero.stats import Stats
+
+SOURCE = """
+rules:
+  (a & b) -> c
+  ~c | (a & b)
+  d -> ~(a & b)
+end
+
+facts:
+  a
+  ~d
+end
+
+query:
+  c
+  a & b
+end
+"""
+
+
+def parsed(source: str = SOURCE):
+    parser = Parser(source)
+    parser.start()
+    return parser.program, parser.symhash
+
+
+def test_dump_and_load_round_trip():
+    program, symhash = parsed()
+    loaded, symbols = cache.load(cache.dump(program, symhash))
+    assert symbols == symhash
+    for section in cache.SECTIONS:
+        assert loaded[section] == program[section]
+
+
+def test_load_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        cache.load(b"not a cache entry at all")
+
+
+def test_parse_hits_the_cache_on_the_same_source(tmp_path):
+    first = Stats()
+    program, _ = cache.parse(SOURCE, tmp_path, first)
+    second = Stats()
+    again, _ = cache.parse(SOURCE, tmp_path, second)
+    assert "cache_hits" not in first.counters
+    assert second.counters["cache_hits"] == 1
+    assert again == program
+
+
+def test_corrupt_entry_is_evicted(tmp_path):
+    cache.parse(SOURCE, tmp_path)
+    (entry,) = tmp_path.glob("*.ifoc")
+    entry.write_bytes(b"IFOC" + b"\0" * 12)
+    assert cache.fetch(entry) is None
+    assert not entry.exists()
+
+
+def test_file_key_matches_the_key_of_its_text(tmp_path):
+    path = tmp_path / "program.ifo"
+    path.write_text(SOURCE)
+    assert cache.file_key(path, size=7) == cache.key(SOURCE)
+    program, _ = cache.parse_file(path, tmp_path)
+    assert program == parsed()[0]
+
+
+def test_failed_store_leaves_no_temporary_file(tmp_path, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("dump failed")
+
+    monkeypatch.setattr(cache, "dump", broken)
+    with pytest.raises(RuntimeError):
+        cache.store(tmp_path / "entry.ifoc", *parsed())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_evict_keeps_the_most_recent_entries(tmp_path):
+    for name, size in (("old", 60), ("new", 60)):
+        (tmp_path / f"{name}.ifoc").write_bytes(b"\0" * size)
+    old = tmp_path / "old.ifoc"
+    stat = old.stat()
+    os.utime(old, (stat.st_atime, stat.st_mtime - 100))
+    cache.evict(tmp_path, max_bytes=100)
+    assert [path.name for path in tmp_path.iterdir()] == ["new.ifoc"]
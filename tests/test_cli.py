@@ -0,0 +1,206 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from infero.cli import app
+
+runner = CliRunner()
+
+# Modelos de (a | b) & (c -> a): a verdadeiro com b e c quaisquer, ou só b
+MODELS = """
+rules:
+  a | b
+  c -> a
+end
+
+facts:
+end
+
+query:
+  a
+end
+"""
+
+
+@pytest.fixture
+def program(tmp_path):
+    path = tmp_path / "models.ifo"
+    path.write_text(MODELS)
+    return str(path)
+
+
+def models(*args: str) -> list[dict]:
+    result = runner.invoke(app, ["models", *args, "--no-cache", "--format", "json"])
+    assert result.exit_code == 0, result.output
+    return [json.loads(line) for line in result.output.splitlines()]
+
+
+def test_models_lists_every_model(program):
+    found = [line["model"] for line in models(program)]
+    assert len(found) == 5
+    assert len({tuple(sorted(model.items())) for model in found}) == 5
+    for model in found:
+        assert (model["a"] or model["b"]) and (not model["c"] or model["a"])
+
+
+def test_models_limit(program):
+    assert len(models(program, "--limit", "2")) == 2
+
+
+@pytest.mark.parametrize("project", ["a", "a,b", "b,c", "a,b,c"])
+def test_projection_lists_each_assignment_once(program, project):
+    found = [line["model"] for line in models(program, "--project", project)]
+    assert all(list(model) == project.split(",") for model in found)
+    assignments = [tuple(model.values()) for model in found]
+    assert len(assignments) == len(set(assignments))
+    (counted,) = models(program, "--project", project, "--count")
+    assert counted == {"count": len(found)}
+
+
+def test_count_matches_the_enumeration(program):
+    (counted,) = models(program, "--count")
+    assert counted == {"count": len(models(program))}
+    result = runner.invoke(app, ["models", program, "--no-cache", "--count"])
+    assert result.output == "5 modelos\n"
+
+
+@pytest.mark.parametrize("count", [[], ["--count"]])
+def test_unknown_projected_symbol(program, count):
+    result = runner.invoke(
+        app, ["models", program, "--no-cache", "--project", "a,z", *count]
+    )
+    assert result.exit_code == 1
+    assert "unknown symbols: z" in result.output
+
+
+MULTIPLE = """
+rules:
+  a -> b
+  b -> c
+  x -> y
+  y -> z
+  z -> ~u
+  u | w
+end
+
+facts:
+  a
+  x
+end
+
+query:
+  c
+  w
+  v
+end
+"""
+
+
+def compile_json(tmp_path, source: str, *args: str) -> dict:
+    path = tmp_path / "program.ifo"
+    path.write_text(source)
+    result = runner.invoke(
+        app, ["compile", str(path), "--no-cache", "--format", "json", *args]
+    )
+    assert result.exit_code == 0, result.output
+    (line,) = result.output.splitlines()
+    return json.loads(line)
+
+
+def test_compile_json_answers_every_query(tmp_path):
+    assert compile_json(tmp_path, MULTIPLE) == {
+        "queries": [
+            {
+                "query": "c",
+                "result": "derived",
+                "proof": [
+                    "Modus Ponens\na -> b\na\n------\nb\n",
+                    "Modus Ponens\nb -> c\nb\n------\nc\n",
+                ],
+            },
+            {
+                "query": "w",
+                "result": "derived",
+                "proof": [
+                    "Modus Ponens\nx -> y\nx\n------\ny\n",
+                    "Modus Ponens\ny -> z\ny\n------\nz\n",
+                    "Modus Ponens\nz -> (~u)\nz\n------\n~u\n",
+                    "Disjunctive Syllogism\nu | w\n~u\n------\nw\n",
+                ],
+            },
+            {"query": "v", "result": "inconclusive", "proof": []},
+        ],
+        "symbols": {
+            "a": True,
+            "b": True,
+            "c": True,
+            "x": True,
+            "y": True,
+            "z": True,
+            "u": False,
+            "w": True,
+            "v": None,
+        },
+        "termination": "fixpoint",
+    }
+
+
+def test_compile_json_stats(tmp_path):
+    report = compile_json(tmp_path, MULTIPLE, "--stats")
+    stats = report.pop("stats")
+    assert report == compile_json(tmp_path, MULTIPLE)
+    assert list(stats) == ["phases", "counters", "firings", "status"]
+    assert list(stats["phases"]) == ["parse", "solve", "render"]
+    assert all(elapsed >= 0 for elapsed in stats["phases"].values())
+    assert {"tokens": 30, "nodes": 24, "depth": 3}.items() <= stats["counters"].items()
+    # Cada regra dispara uma vez, embora x -> y esteja em duas provas
+    assert stats["firings"] == {"ModusPonens": 5, "DisjunctiveSyllogism": 1}
+    assert stats["status"] == "fixpoint"
+
+
+def test_models_json_stats(program):
+    *found, last = models(program, "--stats")
+    assert len(found) == 5
+    assert list(last) == ["stats"]
+    assert list(last["stats"]) == ["phases", "counters", "firings", "status"]
+
+
+@pytest.mark.parametrize("engine", ["sat", "table"])
+@pytest.mark.parametrize(
+    "option", [["--max-steps", "5"], ["--max-steps", "100"], ["--timeout", "1"]]
+)
+def test_budget_options_only_for_the_rules_engine(tmp_path, engine, option):
+    path = tmp_path / "program.ifo"
+    path.write_text(MULTIPLE)
+    result = runner.invoke(
+        app, ["compile", str(path), "--no-cache", "--engine", engine, *option]
+    )
+    assert result.exit_code == 1
+    assert "Erro: --max-steps e --timeout valem apenas para o motor rules" in (
+        result.output
+    )
+
+
+def test_max_steps_zero_lifts_the_limit(tmp_path):
+    # Cada disjunção elimina um termo por passo: mais que o limite padrão
+    n = 150
+    names = ["p" + "".join(chr(97 + int(d)) for d in str(i)) for i in range(n + 1)]
+    rules = "\n".join(f"  {names[i]} | ~{names[i + 1]} | q" for i in range(n))
+    facts = f"  {names[n]}\n  ~q"
+    source = f"rules:\n{rules}\nend\nfacts:\n{facts}\nend\nquery:\n  {names[0]}\nend\n"
+    report = compile_json(tmp_path, source)
+    assert report["termination"] == "exhausted"
+    report = compile_json(tmp_path, source, "--max-steps", "0")
+    assert report["termination"] == "decided"
+    assert report["queries"][0]["result"] == "derived"
+
+
+def test_compile_json_reports_an_inconsistent_base(tmp_path):
+    source = "rules:\n  a -> b\nend\nfacts:\n  a\n  ~b\nend\nquery:\n  c\nend\n"
+    report = compile_json(tmp_path, source, "--no-prune")
+    assert report["termination"] == "inconsistent"
+    assert report["queries"] == [{"query": "c", "result": "inconclusive", "proof": []}]
+    path = tmp_path / "program.ifo"
+    result = runner.invoke(app, ["compile", str(path), "--no-cache", "--no-prune"])
+    assert "regras e fatos contraditórios" in result.output
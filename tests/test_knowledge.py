@@ -0,0 +1,151 @@
+import random
+
+import pytest
+
+from infero.knowledge import KnowledgeBase
+from infero.parser import Parser
+
+RULES = """
+rules:
+  a -> c
+  b -> c
+  c -> d
+  (d & e) -> f
+end
+
+facts:
+end
+
+query:
+  f
+end
+"""
+
+
+def sentence(text: str):
+    return Parser.sentence(text)
+
+
+def known(kb: KnowledgeBase) -> dict[str, bool]:
+    return {name: value for name, value in kb.symhash.items() if value is not None}
+
+
+def test_load_returns_the_queries():
+    kb = KnowledgeBase()
+    assert kb.load(RULES) == [sentence("f")]
+    assert len(kb.rules) == 4
+
+
+def test_tell_derives_and_ask_explains():
+    kb = KnowledgeBase.parse(RULES)
+    kb.tell(sentence("a"))
+    kb.tell(sentence("e"))
+    finded, steps = kb.ask(sentence("f"))
+    assert finded is True
+    assert [step.conclusion for step in steps] == [
+        sentence(name) for name in ("c", "d", "f")
+    ]
+
+
+def test_retract_withdraws_only_what_depends_on_the_fact():
+    kb = KnowledgeBase.parse(RULES)
+    kb.tell(sentence("a"))
+    kb.tell(sentence("e"))
+    kb.retract(sentence("a"))
+    assert kb.ask(sentence("d")) == (None, [])
+    assert kb.ask(sentence("e"))[0] is True
+
+
+def test_retract_keeps_facts_with_another_justification():
+    kb = KnowledgeBase.parse(RULES)
+    kb.tell(sentence("a"))
+    kb.tell(sentence("b"))
+    kb.retract(sentence("a"))
+    finded, steps = kb.ask(sentence("d"))
+    assert finded is True
+    assert sentence("b") in steps[0].premises
+
+
+def test_told_fact_becomes_a_premise_when_already_derived():
+    kb = KnowledgeBase.parse(RULES)
+    kb.tell(sentence("a"))
+    kb.tell(sentence("c"))
+    kb.retract(sentence("a"))
+    assert kb.ask(sentence("d"))[0] is True
+    assert kb.premises()["c"] is True
+
+
+def test_contradictions():
+    kb = KnowledgeBase.parse(RULES)
+    kb.tell(sentence("a"))
+    with pytest.raises(ValueError):
+        kb.tell(sentence("~c"))
+    with pytest.raises(ValueError):
+        kb.retract(sentence("c"))
+    with pytest.raises(ValueError):
+        kb.tell(sentence("a & b"))
+    kb.tell(sentence("~f"))
+    with pytest.raises(ValueError):
+        kb.tell(sentence("e"))
+
+
+def test_conflict_is_cleared_by_retract():
+    kb = KnowledgeBase([sentence("a -> c"), sentence("a -> ~c")])
+    kb.tell(sentence("a"))
+    assert not kb.consistent
+    kb.retract(sentence("a"))
+    assert kb.consistent
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_updates_match_a_fresh_base(seed):
+    rng = random.Random(seed)
+    names = [f"p{chr(97 + i)}" for i in range(8)]
+
+    def literal():
+        return ("" if rng.random() < 0.5 else "~") + rng.choice(names)
+
+    rules = [sentence(f"({literal()} & {literal()}) -> {literal()}") for _ in range(10)]
+    rules += [sentence(f"{literal()} | {literal()}") for _ in range(3)]
+    kb = KnowledgeBase(rules)
+    told: list[str] = []
+    for _ in range(30):
+        if told and rng.random() < 0.4:
+            fact = told.pop(rng.randrange(len(told)))
+            kb.retract(sentence(fact))
+        else:
+            fact = literal()
+            try:
+                kb.tell(sentence(fact))
+            except ValueError:
+                continue
+            if fact not in told:
+                told.append(fact)
+        fresh = KnowledgeBase(rules, [sentence(fact) for fact in told])
+        if kb.consistent and fresh.consistent:
+            assert known(kb) == known(fresh)
+
+
+def test_wide_antecedent_is_clausified_with_auxiliary_variables():
+    # Por distribuição, a regra daria 2^40 cláusulas
+    n = 40
+    names = [chr(97 + i // 26) + chr(97 + i % 26) for i in range(n)]
+    pairs = [(f"a{name}", f"b{name}") for name in names]
+    antecedent = " & ".join(f"({a} | {b})" for a, b in pairs)
+    kb = KnowledgeBase([sentence(f"({antecedent}) -> z")])
+    assert len(kb.clauses) < 10 * n
+
+    for i, (a, b) in enumerate(pairs):
+        kb.tell(sentence(a if i % 2 else b))
+    finded, steps = kb.ask(sentence("z"))
+    assert finded is True
+    assert set(kb.symhash) == {"z", *(name for pair in pairs for name in pair)}
+    # Variáveis auxiliares aparecem nas provas como as sentenças que nomeiam
+    for step in steps:
+        for fact in (*step.premises, step.conclusion):
+            assert fact.symbols() <= kb.symhash.keys()
+
+    kb = KnowledgeBase([sentence(f"({antecedent}) -> z")], [sentence("~z")])
+    for a, b in pairs[1:]:
+        kb.tell(sentence(a))
+    assert kb.ask(sentence("~aaa & ~baa"))[0] is True
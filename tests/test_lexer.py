@@ -0,0 +1,70 @@
+import pytest
+
+from infero.lexer import Lexer
+from infero.parser import Parser
+
+SOURCE = """rules:
+  (alpha & ~beta) -> gamma
+  gamma | delta
+end
+
+facts:
+  alpha
+  ~delta
+end
+
+query:
+  gamma
+end
+"""
+
+
+def tokens(data) -> list[tuple[str, str, int, int]]:
+    return [
+        (token.value, token.tag, token.line, token.column)
+        for token in Lexer(data).tokens()
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize("source", [SOURCE, SOURCE.replace("\n", " ")])
+def test_chunks_split_anywhere(source, size):
+    chunks = [source[i : i + size] for i in range(0, len(source), size)]
+    assert tokens(chunks) == tokens(source)
+
+
+def test_single_line_input_is_not_buffered():
+    # Cada bloco "a & " traz dois tokens, lidos sem esperar por uma quebra
+    # de linha que nunca chega
+    pulled = 0
+
+    def chunks():
+        nonlocal pulled
+        for _ in range(10000):
+            pulled += 1
+            yield "a & "
+        yield "b"
+
+    for i, token in enumerate(Lexer(chunks()).tokens()):
+        assert pulled <= i // 2 + 2
+
+
+def test_single_line_program_in_chunks():
+    source = SOURCE.replace("\n", " ")
+    chunks = (source[i : i + 4] for i in range(0, len(source), 4))
+    parser = Parser(chunks)
+    parser.start()
+    assert parser.symhash == {
+        "alpha": True,
+        "beta": None,
+        "gamma": None,
+        "delta": False,
+    }
+
+
+@pytest.mark.parametrize("size", [1, 4, 64])
+def test_error_position_across_chunks(size):
+    source = "rules:\n  a -> b\n  c -> $\nend\n"
+    chunks = [source[i : i + size] for i in range(0, len(source), size)]
+    with pytest.raises(SyntaxError, match=r"L3:8, Unexpected char: \$"):
+        tokens(chunks)
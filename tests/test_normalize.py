@@ -0,0 +1,50 @@
+import pytest
+
+from infero.parser import Parser
+from infero.solver import solve_all
+
+# Regras cuja forma normal é um fato: o antecedente é uma tautologia
+PROGRAMS = [
+    """
+rules:
+  (a | ~a) -> b
+  b -> c
+  c | z
+end
+
+facts:
+  ~z
+end
+
+query:
+  b
+end
+""",
+    """
+rules:
+  (a -> a) -> (b & c)
+  c -> d
+  p | q
+end
+
+facts:
+  ~q
+end
+
+query:
+  d
+end
+""",
+]
+
+
+@pytest.mark.parametrize("source", PROGRAMS, ids=["tautology", "implication"])
+@pytest.mark.parametrize("engine", ["rules", "sat"])
+def test_rules_normalized_to_facts(source, engine):
+    parser = Parser(source)
+    parser.start()
+    program = parser.program
+    (result,) = solve_all(
+        program["rules"], program["query"], parser.symhash, engine=engine
+    )
+    assert result[0] is True
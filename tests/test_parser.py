@@ -0,0 +1,169 @@
+import itertools
+import random
+import re
+
+import pytest
+
+from infero.parser import Parser
+from infero.sentences import And, Implication, Not, Or, Symbol
+
+
+def parse(text: str):
+    return Parser.sentence(text)
+
+
+class Reference:
+    """The recursive descent parser the iterative one replaced, over a list of
+    tokens: "&" and "|" share a precedence and associate to the left, below
+    "~" and above "->"."""
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = [*tokens, ""]
+        self.pos = 0
+
+    def take(self) -> str:
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def expr(self):
+        left = self.term()
+        if self.tokens[self.pos] == "->":
+            self.take()
+            return Implication(left, self.term())
+        return left
+
+    def term(self):
+        left = self.fact()
+        while self.tokens[self.pos] in ("&", "|"):
+            connective = And if self.take() == "&" else Or
+            left = connective(left, self.fact())
+        return left
+
+    def fact(self):
+        token = self.take()
+        if token == "(":
+            expr = self.expr()
+            if self.take() != ")":
+                raise SyntaxError("')' esperado")
+            return expr
+        if token == "~":
+            return Not(self.fact())
+        if not token.isalpha():
+            raise SyntaxError(f"{token} simbolos precisam ser letras")
+        return Symbol(token)
+
+
+def formula(rng: random.Random, depth: int) -> list[str]:
+    if depth == 0 or rng.random() < 0.2:
+        return [rng.choice("abcd")]
+    choice = rng.random()
+    if choice < 0.2:
+        return ["~", *formula(rng, depth - 1)]
+    if choice < 0.4:
+        return ["(", *formula(rng, depth - 1), ")"]
+    operator = rng.choice(["&", "|", "&", "|", "->"])
+    return [*formula(rng, depth - 1), operator, *formula(rng, depth - 1)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("a & b | c", Or(And(Symbol("a"), Symbol("b")), Symbol("c"))),
+        ("a | b & c", And(Or(Symbol("a"), Symbol("b")), Symbol("c"))),
+        ("a & b & c", And(Symbol("a"), Symbol("b"), Symbol("c"))),
+        ("(a & b) & c", And(And(Symbol("a"), Symbol("b")), Symbol("c"))),
+        ("~a & b", And(Not(Symbol("a")), Symbol("b"))),
+        ("~(a & b)", Not(And(Symbol("a"), Symbol("b")))),
+        (
+            "a & b -> c | d",
+            Implication(And(Symbol("a"), Symbol("b")), Or(Symbol("c"), Symbol("d"))),
+        ),
+        (
+            "(a -> b) -> c",
+            Implication(Implication(Symbol("a"), Symbol("b")), Symbol("c")),
+        ),
+    ],
+)
+def test_precedence_and_associativity(text, expected):
+    assert parse(text) is expected
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_the_recursive_parser(seed):
+    rng = random.Random(seed)
+    tokens = formula(rng, rng.randint(1, 6))
+    reference = Reference(tokens)
+    try:
+        expected = reference.expr()
+    except SyntaxError:
+        expected = None
+    if reference.tokens[reference.pos] != "":
+        expected = None
+    text = " ".join(tokens)
+    if expected is None:
+        with pytest.raises(SyntaxError):
+            parse(text)
+        return
+    # Sequências do mesmo operador viram um nó n-ário, então as árvores
+    # diferem, mas não o valor em nenhuma atribuição
+    sentence = parse(text)
+    for values in itertools.product([True, False, None], repeat=4):
+        model = dict(zip("abcd", values))
+        assert sentence.evaluate(model) == expected.evaluate(model), text
+
+
+def test_deep_parentheses():
+    depth = 5000
+    assert parse("(" * depth + "a" + ")" * depth) is Symbol("a")
+    sentence = parse("(~" * depth + "a" + ")" * depth)
+    assert sentence.depth == depth + 1
+    assert sentence.evaluate({"a": True}) is True
+
+
+def test_deep_negations():
+    depth = 5001
+    sentence = parse("~" * depth + "a")
+    assert sentence.depth == depth + 1
+    assert sentence.evaluate({"a": True}) is False
+    assert sentence.formula().count("~") == depth
+
+
+def test_deep_nesting_in_a_program():
+    depth = 5000
+    formula = "a"
+    for i in range(depth):
+        formula = f"(~{formula} {'&' if i % 2 else '|'} b)"
+    parser = Parser(f"rules:\n{formula} -> c\nend\nfacts:\na\nend\nquery:\nc\nend\n")
+    parser.start()
+    (rule,) = parser.program["rules"]
+    assert rule.depth == 2 * depth + 2
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("a & (b | c", "L1, ')' esperado"),
+        ("(a))", "L1, ) inesperado"),
+        ("a -> b -> c", "L1, -> inesperado"),
+        ("a & & b", "L1, & simbolos precisam ser letras"),
+        ("a & 1", "L1:5, Unexpected char: 1"),
+    ],
+)
+def test_errors(text, message):
+    with pytest.raises(SyntaxError, match=re.escape(message)):
+        parse(text)
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        (
+            "rules:\n  a -> b\n  (a & c -> d\nend\nfacts:\nend\nquery:\n  a\nend\n",
+            "L4, ')' esperado",
+        ),
+        ("rules:\n  a -> b\n  c -> $\nend\n", "L3:8, Unexpected char: $"),
+    ],
+)
+def test_error_lines(source, message):
+    with pytest.raises(SyntaxError, match=re.escape(message)):
+        Parser(source).start()
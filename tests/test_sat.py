@@ -0,0 +1,119 @@
+import itertools
+import random
+
+import pytest
+
+from infero import sat
+from infero.cnf import CNF, clausify
+from infero.sentences import And, Implication, Not, Or, Symbol
+
+NAMES = "abcde"
+
+
+def satisfiable(clauses: list[list[int]], variables: int) -> bool:
+    return any(
+        all(
+            any((lit > 0) == values[abs(lit) - 1] for lit in clause)
+            for clause in clauses
+        )
+        for values in itertools.product((False, True), repeat=variables)
+    )
+
+
+def random_cnf(rng: random.Random, variables: int, size: int) -> list[list[int]]:
+    return [
+        [rng.choice((1, -1)) * var for var in rng.sample(range(1, variables + 1), 3)]
+        for _ in range(size)
+    ]
+
+
+def random_sentence(rng: random.Random, depth: int = 3):
+    if depth == 0 or rng.random() < 0.2:
+        return Symbol(rng.choice(NAMES))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return Not(random_sentence(rng, depth - 1))
+    if kind == 3:
+        return Implication(
+            random_sentence(rng, depth - 1), random_sentence(rng, depth - 1)
+        )
+    operands = [random_sentence(rng, depth - 1) for _ in range(rng.randint(2, 3))]
+    return And(*operands) if kind == 1 else Or(*operands)
+
+
+def models():
+    for values in itertools.product((False, True), repeat=len(NAMES)):
+        yield dict(zip(NAMES, values))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cdcl_agrees_with_brute_force(seed):
+    rng = random.Random(seed)
+    # Perto da razão 4.26, onde metade das instâncias é satisfatível
+    clauses = random_cnf(rng, 10, 43)
+    solver = sat.SatSolver(clauses, 10)
+    found = solver.solve()
+    assert found == satisfiable(clauses, 10)
+    if found:
+        model = solver.model
+        assert all(any((lit > 0) == model[abs(lit)] for lit in c) for c in clauses)
+
+
+def test_pigeonhole_is_unsatisfiable():
+    # Quatro pombos em três casas: o pombo i na casa j é a variável 3 * i + j + 1
+    def var(i: int, j: int) -> int:
+        return 3 * i + j + 1
+
+    clauses = [[var(i, j) for j in range(3)] for i in range(4)]
+    for j in range(3):
+        for i, k in itertools.combinations(range(4), 2):
+            clauses.append([-var(i, j), -var(k, j)])
+    assert not sat.SatSolver(clauses, 12).solve()
+
+
+def test_assumptions_do_not_persist():
+    solver = sat.SatSolver([[1, 2], [-1, 3]], 3)
+    assert not solver.solve([1, -3])
+    assert solver.solve([-2, 1])
+    assert solver.model[3]
+    assert solver.solve()
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_tseitin_literal_is_equivalent_to_the_sentence(seed):
+    sentence = random_sentence(random.Random(seed))
+    cnf = CNF()
+    goal = cnf.literal(sentence)
+    solver = sat.SatSolver(cnf.clauses, cnf.variables)
+    for model in models():
+        fixed = [
+            cnf.ids[n] if v else -cnf.ids[n] for n, v in model.items() if n in cnf.ids
+        ]
+        expected = sentence.evaluate(model)
+        assert solver.solve([*fixed, goal]) == expected
+        assert solver.solve([*fixed, -goal]) == (not expected)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_clausify_keeps_the_models(seed):
+    sentence = random_sentence(random.Random(seed))
+    clauses = clausify(sentence)
+    for model in models():
+        holds = all(any(model[n] == value for n, value in c) for c in clauses)
+        assert holds == sentence.evaluate(model)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_entails_decides_by_every_model(seed):
+    rng = random.Random(seed)
+    rules = [random_sentence(rng, 2) for _ in range(3)]
+    query = random_sentence(rng, 2)
+    symhash = dict.fromkeys(NAMES)
+    ((finded, _),) = sat.entails(rules, [query], symhash)
+    kept = [m for m in models() if all(rule.evaluate(m) for rule in rules)]
+    if not any(query.evaluate(m) for m in kept):
+        assert finded is False
+    elif all(query.evaluate(m) for m in kept):
+        assert finded is True
+    else:
+        assert finded is None
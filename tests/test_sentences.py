@@ -0,0 +1,67 @@
+import itertools
+import random
+
+import pytest
+
+from infero.sentences import (
+    MAX_COMPILED_DEPTH,
+    And,
+    Implication,
+    Not,
+    Or,
+    Sentence,
+    SparseModel,
+    Symbol,
+)
+
+NAMES = ["p", "q", "r"]
+
+
+def sentence(rng: random.Random, depth: int) -> Sentence:
+    if depth == 0 or rng.random() < 0.2:
+        return Symbol(rng.choice(NAMES))
+    choice = rng.random()
+    if choice < 0.2:
+        return Not(sentence(rng, depth - 1))
+    if choice < 0.4:
+        return Implication(sentence(rng, depth - 1), sentence(rng, depth - 1))
+    connective = And if choice < 0.7 else Or
+    return connective(*(sentence(rng, depth - 1) for _ in range(rng.randint(2, 4))))
+
+
+def assignments():
+    for values in itertools.product([True, False, None], repeat=len(NAMES)):
+        yield dict(zip(NAMES, values))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_compiled_matches_interpreted(seed):
+    formula = sentence(random.Random(seed), 5)
+    for symhash in assignments():
+        model = Sentence.model(symhash)
+        assert formula.evaluate(model) == formula.interpret(symhash), symhash
+
+
+def test_sparse_model_matches_the_compact_one():
+    formula = sentence(random.Random(0), 6)
+    for symhash in assignments():
+        dense = Sentence.model(symhash)
+        sparse = SparseModel(enumerate(dense))
+        assert formula.evaluate(sparse) == formula.evaluate(dense)
+
+
+def test_deep_sentences_fall_back_to_the_interpreter():
+    formula = Symbol("p")
+    for _ in range(3 * MAX_COMPILED_DEPTH):
+        formula = Or(Not(formula), Symbol("q"))
+    assert formula.compile() == formula.interpret
+    for symhash in assignments():
+        assert formula.evaluate(Sentence.model(symhash)) == formula.interpret(symhash)
+
+
+def test_compiled_function_is_cached():
+    formula = Implication(And(Symbol("p"), Symbol("q")), Symbol("r"))
+    assert formula.compile() is formula.compile()
+    assert Implication(And(Symbol("p"), Symbol("q")), Symbol("r")).compile() is (
+        formula.compile()
+    )
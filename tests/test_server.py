@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+from infero.server import Server
+
+SOURCE = """
+rules:
+  a -> b
+  b -> c
+end
+
+facts:
+end
+
+query:
+  c
+end
+"""
+
+
+def run(server: Server, *requests: dict) -> dict:
+    """Sends the requests as one client, returning the responses by id."""
+    responses = []
+
+    async def lines():
+        for id, request in enumerate(requests):
+            yield json.dumps({"id": id, **request}).encode()
+
+    async def send(text: str):
+        responses.append(json.loads(text))
+
+    asyncio.run(server.session(lines(), send))
+    return {response.pop("id"): response for response in responses}
+
+
+@pytest.fixture
+def server():
+    server = Server(workers=1)
+    yield server
+    server.close()
+
+
+def test_tell_and_retract_update_the_answers(server):
+    responses = run(
+        server,
+        {"op": "load", "kb": "kb", "source": SOURCE},
+        {"op": "tell", "kb": "kb", "fact": "a"},
+        {"op": "ask", "kb": "kb", "query": "c"},
+        {"op": "retract", "kb": "kb", "fact": "a"},
+        {"op": "ask", "kb": "kb", "query": "c"},
+    )
+    assert responses[0]["answers"][0]["result"] == "inconclusive"
+    assert responses[1] == {"ok": True, "consistent": True}
+    assert responses[2]["result"] == "derived"
+    assert responses[4]["result"] == "inconclusive"
+
+
+@pytest.mark.parametrize("engine", ["rules", "sat"])
+def test_workers_follow_tell_and_retract(server, engine):
+    responses = run(
+        server,
+        {"op": "load", "kb": "kb", "source": SOURCE},
+        {"op": "ask", "kb": "kb", "query": "c", "engine": engine},
+    )
+    assert responses[1]["result"] == "inconclusive"
+    responses = run(
+        server,
+        {"op": "tell", "kb": "kb", "fact": "a"},
+        {"op": "ask", "kb": "kb", "query": "c", "engine": engine},
+        {"op": "retract", "kb": "kb", "fact": "a"},
+        {"op": "tell", "kb": "kb", "fact": "~c"},
+        {"op": "ask", "kb": "kb", "query": "~a", "engine": engine},
+    )
+    assert responses[1]["result"] == "derived"
+    assert responses[4]["result"] == "derived"
+
+
+def test_reloaded_base_reaches_the_workers(server):
+    run(
+        server,
+        {"op": "load", "kb": "kb", "source": SOURCE},
+        {"op": "ask", "kb": "kb", "query": "c", "engine": "rules"},
+    )
+    source = SOURCE.replace("facts:\n", "facts:\n  a\n")
+    responses = run(
+        server,
+        {"op": "load", "kb": "kb", "source": source},
+        {"op": "ask", "kb": "kb", "query": "c", "engine": "rules"},
+    )
+    assert responses[1]["result"] == "derived"
+
+
+def test_deep_rule_is_sent_without_recursion(server):
+    depth = 6000
+    rule = "(" * depth + "a" + " -> a)" * depth + " -> b"
+    source = f"rules:\n  {rule}\nend\nfacts:\n  a\nend\nquery:\n  b\nend\n"
+    responses = run(
+        server,
+        {"op": "load", "kb": "deep", "source": source},
+        {"op": "ask", "kb": "deep", "query": "b", "engine": "sat"},
+    )
+    assert responses[1]["ok"]
+    assert responses[1]["result"] == "derived"
+
+
+def test_errors_are_reported_with_the_request_id(server):
+    responses = run(
+        server,
+        {"op": "ask", "kb": "missing", "query": "a"},
+        {"op": "load", "kb": "kb", "source": SOURCE},
+        {"op": "ask", "kb": "kb", "query": "c", "engine": "nope"},
+    )
+    assert responses[0] == {
+        "ok": False,
+        "error": "ValueError: unknown knowledge base: missing",
+    }
+    assert responses[2]["error"] == "ValueError: unknown engine: nope"
+
+
+def test_exited_worker_is_replaced(server):
+    request = {"op": "ask", "kb": "kb", "query": "c", "engine": "rules"}
+    run(server, {"op": "load", "kb": "kb", "source": SOURCE}, request)
+    (worker,) = server.pool
+    worker.process.kill()
+    worker.process.join()
+    responses = run(server, {"op": "tell", "kb": "kb", "fact": "a"}, request)
+    assert responses[1]["result"] == "derived"
+    assert server.pool[0] is not worker
@@ -0,0 +1,489 @@
+import pytest
+
+from infero.budget import EXHAUSTED, FIXPOINT, INCONSISTENT, TIMEOUT, Budget
+from infero.horn import forward_chain
+from infero.implication_graph import ImplicationGraph
+from infero.justification import MODUS_PONENS, Justifications
+from infero.normalize import normalize_rules
+from infero.parser import Parser
+from infero.sentences import DENSITY, Implication, Sentence, Symbol, literal
+from infero.solver import solve_all
+from infero.stats import Stats
+
+
+def solve(source: str, engine: str = "rules"):
+    if engine == "table":
+        pytest.importorskip("numpy")
+    parser = Parser(source)
+    parser.start()
+    program = parser.program
+    return solve_all(program["rules"], program["query"], parser.symhash, engine)
+
+
+# Uma regra que ainda não dispara não pode passar à frente das que disparam
+STARVED = """
+rules:
+  x -> a
+  (a | b | c) -> k
+end
+
+facts:
+  ~k
+end
+
+query:
+  {query}
+end
+"""
+
+
+@pytest.mark.parametrize("query, expected", [("~a", True), ("a", False)])
+@pytest.mark.parametrize("engine", ["rules", "sat"])
+def test_deferred_rules_do_not_starve_the_others(query, expected, engine):
+    ((finded, _),) = solve(STARVED.format(query=query), engine)
+    assert finded is expected
+
+
+# Regras satisfeitas saem da agenda sem que isso encerre a passada
+SHRINKING = """
+rules:
+  (d -> (g & e)) -> a
+  (d -> (d & d)) -> c
+  (f | (~c & a)) -> g
+  ~c -> g
+  b -> ~d
+  d -> (e | b)
+end
+
+facts:
+  c
+  ~d
+end
+
+query:
+  a
+end
+"""
+
+
+def test_fixpoint_only_after_every_rule_was_tried():
+    ((finded, _),) = solve(SHRINKING)
+    assert finded is True
+
+
+UNDECIDED = """
+rules:
+  a -> b
+  b | c
+end
+
+facts:
+end
+
+query:
+  c
+end
+"""
+
+
+def test_fixpoint_when_nothing_can_be_derived():
+    budget = Budget()
+    parser = Parser(UNDECIDED)
+    parser.start()
+    program = parser.program
+    ((finded, _),) = solve_all(
+        program["rules"], program["query"], parser.symhash, budget=budget
+    )
+    assert finded is None
+    assert budget.status == FIXPOINT
+
+
+# A contradição entre c e ~d não tem relação com a query
+CONTRADICTORY = """
+rules:
+  a -> b
+  c -> d
+end
+
+facts:
+  c
+  ~d
+end
+
+query:
+  a
+end
+"""
+
+
+@pytest.mark.parametrize("engine", ["sat", "table"])
+def test_refutation_engines_see_the_whole_base_by_default(engine):
+    ((finded, _),) = solve(CONTRADICTORY, engine)
+    assert finded is not None
+
+
+@pytest.mark.parametrize("engine", ["rules", "sat", "table"])
+def test_pruned_contradiction_does_not_decide_the_query(engine):
+    if engine == "table":
+        pytest.importorskip("numpy")
+    parser = Parser(CONTRADICTORY)
+    parser.start()
+    program = parser.program
+    ((finded, _),) = solve_all(
+        program["rules"], program["query"], parser.symhash, engine, prune=True
+    )
+    assert finded is None
+
+
+def test_timeout_bounds_the_passes_before_the_inference_loop():
+    # Normalizar, podar e encadear para frente esta base leva bem mais que o
+    # prazo, e nenhuma dessas passadas gasta passos
+    def name(prefix, i):
+        letters = prefix
+        while True:
+            letters += chr(65 + i % 26)
+            i //= 26
+            if not i:
+                return letters
+
+    n = 30000
+    rules = "\n".join(
+        f"{name('P', i)} & {name('Q', i)} -> {name('P', i + 1)}" for i in range(n)
+    )
+    facts = "\n".join([name("P", 0), *(name("Q", i) for i in range(n))])
+    query = name("P", n)
+    parser = Parser(
+        f"rules:\n{rules}\nend\nfacts:\n{facts}\nend\nquery:\n{query}\nend\n"
+    )
+    parser.start()
+    program = parser.program
+    budget = Budget(max_steps=None, timeout=0.05)
+    ((finded, _),) = solve_all(
+        program["rules"], program["query"], parser.symhash, budget=budget
+    )
+    # Sem o prazo a query seria derivada
+    assert finded is None
+    assert budget.status == TIMEOUT
+
+
+UNRELATED = """
+rules:
+  zzya -> zzyb
+  zzyb -> zzyc
+end
+
+facts:
+  zzya
+end
+
+query:
+  zzyc
+end
+"""
+
+
+def test_model_size_does_not_depend_on_other_programs():
+    # Ids são globais: símbolos de outros programas afastam os deste, e
+    # poucos bastam para passar da densidade de um modelo contíguo
+    for i in range(DENSITY * 3 + 64):
+        Symbol(f"other{i}")
+    parser = Parser(UNRELATED)
+    parser.start()
+    program = parser.program
+    values = Sentence.model(parser.symhash)
+    assert len(values) == len(parser.symhash)
+    ((finded, _),) = solve_all(program["rules"], program["query"], parser.symhash)
+    assert finded is True
+    assert parser.symhash == {"zzya": True, "zzyb": True, "zzyc": True}
+
+
+def steps(path) -> list[tuple[str, str]]:
+    return [(type(step).__name__, step.premise1.formula()) for step in path]
+
+
+HORN = """
+rules:
+  A & B -> C
+  A -> D
+  C & D -> E
+  B & E & F -> G
+  A & E -> H
+  D & E & H -> I
+  E | J
+end
+
+facts:
+  A
+  B
+  F
+end
+
+query:
+  H
+end
+"""
+
+
+def test_forward_chaining_proves_in_derivation_order():
+    ((finded, path),) = solve(HORN)
+    assert finded is True
+    assert steps(path) == [
+        ("ModusPonens", "A -> D"),
+        ("ModusPonens", "(A & B) -> C"),
+        ("ModusPonens", "(C & D) -> E"),
+        ("ModusPonens", "(A & E) -> H"),
+    ]
+
+
+def test_forward_chaining_leaves_the_other_rules():
+    parser = Parser(HORN)
+    parser.start()
+    rules = normalize_rules(parser.program["rules"])
+    (query,) = parser.program["query"]
+    values = Sentence.model(parser.symhash)
+    log = Justifications()
+    left, decided, conflict = forward_chain(rules, [query], values, log)
+    assert query in decided and query.evaluate(values) is True
+    assert conflict is None
+    # Pára assim que a query é decidida; a disjunção nunca é de Horn
+    assert Parser.sentence("E | J") in left
+    assert all(
+        rule not in left for step in log.proof(query) for rule in [step.premise1]
+    )
+
+
+def test_forward_chaining_stops_at_a_contradiction():
+    parser = Parser(CONTRADICTORY)
+    parser.start()
+    rules = normalize_rules(parser.program["rules"])
+    values = Sentence.model(parser.symhash)
+    log = Justifications()
+    _, decided, conflict = forward_chain(rules, parser.program["query"], values, log)
+    assert decided == {}
+    assert str(log.step(conflict)) == "Modus Ponens\nc -> d\nc\n------\nd\n"
+    # O fato ~d continua com o valor e a justificativa que tinha
+    assert values[Symbol("d").id] == 0 and Symbol("d").id not in log.reasons
+
+
+def test_contradiction_ends_the_run_as_inconsistent():
+    budget = Budget()
+    parser = Parser(CONTRADICTORY)
+    parser.start()
+    program = parser.program
+    ((finded, _),) = solve_all(
+        program["rules"], program["query"], parser.symhash, prune=False, budget=budget
+    )
+    assert finded is None
+    assert budget.status == INCONSISTENT
+    assert parser.symhash["d"] is False
+
+
+MULTIPLE = """
+rules:
+  a -> b
+  b -> c
+  x -> y
+  y -> z
+  z -> ~u
+  u | w
+end
+
+facts:
+  a
+  x
+end
+
+query:
+  c
+  w
+  ~y
+  v
+  c
+end
+"""
+
+
+def test_queries_share_one_derivation():
+    traced = []
+    parser = Parser(MULTIPLE)
+    parser.start()
+    program = parser.program
+    results = solve_all(
+        program["rules"], program["query"], parser.symhash, stats=Stats(traced.append)
+    )
+    assert [finded for finded, _ in results] == [True, True, False, None, True]
+    # Cada regra é aplicada uma vez, embora x -> y esteja em duas provas
+    assert len(traced) == 6
+    assert sum(len(path) for _, path in results) > len(traced)
+    assert steps(results[0][1]) == steps(results[4][1])
+
+
+def test_each_proof_has_only_the_steps_its_query_depends_on():
+    results = solve(MULTIPLE.replace("  v\n", "  v | (c & k)\n"))
+    assert [steps(path) for _, path in results] == [
+        [("ModusPonens", "a -> b"), ("ModusPonens", "b -> c")],
+        [
+            ("ModusPonens", "x -> y"),
+            ("ModusPonens", "y -> z"),
+            ("ModusPonens", "z -> (~u)"),
+            ("DisjunctiveSyllogism", "u | w"),
+        ],
+        [("ModusPonens", "x -> y")],
+        # Indecidida: a derivação parcial sobre os seus símbolos
+        [("ModusPonens", "a -> b"), ("ModusPonens", "b -> c")],
+        [("ModusPonens", "a -> b"), ("ModusPonens", "b -> c")],
+    ]
+    assert results[3][0] is None
+
+
+def test_proof_skips_dead_ends():
+    log = Justifications()
+    a, b, c, d = (Symbol(name) for name in "abcd")
+    # a -> b e a -> d são derivados, mas só o primeiro leva a c
+    first = log.record(MODUS_PONENS, Implication(a, b))
+    log.assign(b.id, first)
+    dead = log.record(MODUS_PONENS, Implication(a, d))
+    log.assign(d.id, dead)
+    last = log.record(MODUS_PONENS, Implication(b, c))
+    log.assign(c.id, last)
+    assert log.support(c.variables()) == [first, last]
+    assert [type(step).__name__ for step in log.proof(c)] == ["ModusPonens"] * 2
+
+
+# Nenhuma regra dispara na agenda, mas ~b alcança b e ~c alcança c no grafo
+# de implicações
+BINARY = """
+rules:
+  a -> b
+  ~a -> b
+  c | d
+  d -> c
+end
+
+facts:
+end
+
+query:
+  b
+  c
+  d
+end
+"""
+
+
+def test_implication_graph_decides_what_the_agenda_cannot():
+    budget = Budget()
+    parser = Parser(BINARY)
+    parser.start()
+    program = parser.program
+    results = solve_all(
+        program["rules"], program["query"], parser.symhash, budget=budget
+    )
+    assert [finded for finded, _ in results] == [True, True, None]
+    assert [[str(step) for step in path] for _, path in results] == [
+        [
+            "Hipotetical Syllogism\n(~b) -> (~a)\n(~a) -> b\n------\n(~b) -> b\n",
+            "Refutation\nrules & facts\n~b\n------\nunsatisfiable\n",
+        ],
+        [
+            "Hipotetical Syllogism\n(~c) -> d\nd -> c\n------\n(~c) -> c\n",
+            "Refutation\nrules & facts\n~c\n------\nunsatisfiable\n",
+        ],
+        [],
+    ]
+    assert parser.symhash == {"a": None, "b": True, "c": True, "d": None}
+    assert budget.status == FIXPOINT
+
+
+def test_implication_graph_is_skipped_once_the_steps_run_out():
+    budget = Budget(max_steps=1)
+    parser = Parser(BINARY)
+    parser.start()
+    program = parser.program
+    results = solve_all(
+        program["rules"], program["query"], parser.symhash, budget=budget
+    )
+    assert [finded for finded, _ in results] == [None, None, None]
+    assert budget.status == EXHAUSTED
+
+
+def test_implication_graph_components_and_consistency():
+    rules = [Parser.sentence(rule) for rule in ("a -> b", "b -> c", "c -> a", "a | d")]
+    a, c, d = (literal(Symbol(name).id, True) for name in "acd")
+    unknown = dict.fromkeys("abcd")
+    graph = ImplicationGraph(rules, Sentence.model(unknown))
+    assert graph.consistent
+    assert graph.equivalent(a, c)
+    assert graph.equivalent(-a, -c)
+    assert not graph.equivalent(a, d)
+    assert graph.decide(Symbol("d")) == (None, [])
+    # Com ~c e ~d, a | d exige a, mas a leva a c
+    values = Sentence.model({**unknown, "c": False, "d": False})
+    assert not ImplicationGraph(rules, values).consistent
+
+
+CYCLE = """
+rules:
+  a -> b
+  b -> c
+  c -> d
+  d -> e
+  e -> f
+  f -> g
+  g -> a
+end
+
+facts:
+end
+
+query:
+  a
+end
+"""
+
+
+def test_each_derived_sentence_is_logged_once():
+    traced = []
+    parser = Parser(CYCLE)
+    parser.start()
+    program = parser.program
+    budget = Budget(max_steps=10000)
+    solve_all(
+        program["rules"],
+        program["query"],
+        parser.symhash,
+        stats=Stats(traced.append),
+        budget=budget,
+    )
+    conclusions = [step.apply() for step in traced]
+    assert len(conclusions) == len(set(conclusions))
+    assert not set(conclusions) & set(program["rules"])
+
+
+PAIR = """
+rules:
+  a -> b
+  b -> a
+end
+
+facts:
+end
+
+query:
+  a
+end
+"""
+
+
+@pytest.mark.parametrize("source", [PAIR, CYCLE])
+def test_cycle_of_implications_reaches_a_fixpoint(source):
+    parser = Parser(source)
+    parser.start()
+    program = parser.program
+    budget = Budget(max_steps=None)
+    ((finded, path),) = solve_all(
+        program["rules"], program["query"], parser.symhash, budget=budget
+    )
+    assert finded is None
+    assert list(path) == []
+    assert budget.status == FIXPOINT
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from infero import sat, truth_table
+from infero.sentences import And, Not, Or, Symbol
+
+pytest.importorskip("numpy")
+
+NAMES = [f"p{chr(97 + i)}" for i in range(8)]
+
+
+def literal(rng: random.Random):
+    symbol = Symbol(rng.choice(NAMES))
+    return symbol if rng.random() < 0.5 else Not(symbol)
+
+
+def random_base(rng: random.Random):
+    rules = [Or(*(literal(rng) for _ in range(3))) for _ in range(rng.randint(8, 30))]
+    symhash = dict.fromkeys(NAMES)
+    for name in rng.sample(NAMES, rng.randint(0, 2)):
+        symhash[name] = rng.random() < 0.5
+    queries = [literal(rng) for _ in range(3)]
+    queries.append(And(literal(rng), literal(rng)))
+    queries.append(Or(literal(rng), literal(rng)))
+    return rules, queries, symhash
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_truth_table_agrees_with_sat_on_random_cnf(seed):
+    rules, queries, symhash = random_base(random.Random(seed))
+    table = truth_table.entails(rules, queries, dict(symhash))
+    cdcl = sat.entails(rules, queries, dict(symhash))
+    assert [finded for finded, _ in table] == [finded for finded, _ in cdcl]
+
+
+def test_counts_the_models_of_the_rules():
+    a, b = Symbol("pa"), Symbol("pb")
+    ((finded, count, counterexamples),) = truth_table.check(
+        [Or(a, b)], [a], {"pa": None, "pb": None}
+    )
+    assert finded is None
+    assert count == 3
+    assert counterexamples == [{"pa": False, "pb": True}]